@@ -0,0 +1,228 @@
+"""
+Command line entry point for offline lead processing
+
+Usage:
+    python -m app.cli qualify leads.csv -o qualified.csv --workers 8
+    python -m app.cli qualify leads.ndjson --output-format ndjson > out.ndjson
+    python -m app.cli build-size-index headcounts.csv -o company_sizes.idx
+"""
+
+import argparse
+import collections
+import contextlib
+import os
+import pathlib
+import sys
+import time
+from collections.abc import Iterator
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import TextIO
+from app.services.company_size_index import (
+    build_company_size_index,
+    read_headcounts,
+)
+from app.services.lead_stream import (
+    FORMATS,
+    ChunkSummary,
+    csv_header,
+    detect_format,
+    init_worker,
+    iter_chunks,
+    output_fields,
+    open_rows,
+    qualify_chunk,
+)
+from app.services.qualification_rules import compile_rules, rule_engine
+
+
+class Progress:
+    """Running totals of a qualification run, reported to stderr."""
+
+    def __init__(self, interval: float, quiet: bool):
+        self.interval = interval
+        self.quiet = quiet
+        self.started = time.monotonic()
+        self.last_report = self.started
+        self.rows = self.qualified = self.invalid = 0
+
+    def add(self, summary: ChunkSummary) -> None:
+        self.rows += summary.rows
+        self.qualified += summary.qualified
+        self.invalid += summary.invalid
+        now = time.monotonic()
+        if not self.quiet and now - self.last_report >= self.interval:
+            self.last_report = now
+            print(
+                f"processed {self.rows:,} rows ({self.rate(now):,.0f} rows/sec)",
+                file=sys.stderr,
+            )
+
+    def rate(self, now: float | None = None) -> float:
+        elapsed = (now or time.monotonic()) - self.started
+        return self.rows / elapsed if elapsed > 0 else 0.0
+
+    def summary(self) -> str:
+        elapsed = time.monotonic() - self.started
+        unqualified = self.rows - self.qualified - self.invalid
+        return (
+            f"rows={self.rows:,} qualified={self.qualified:,} "
+            f"unqualified={unqualified:,} invalid={self.invalid:,} "
+            f"elapsed={elapsed:.2f}s rate={self.rate():,.0f} rows/sec"
+        )
+
+
+def default_workers() -> int:
+    if hasattr(os, "sched_getaffinity"):
+        return len(os.sched_getaffinity(0))
+    return os.cpu_count() or 1
+
+
+def _emit(output: TextIO, progress: Progress, summary: ChunkSummary) -> None:
+    output.write(summary.text)
+    progress.add(summary)
+
+
+def _qualify_in_process(
+    chunks: Iterator[list],
+    output_format: str,
+    fields: list[str],
+    output: TextIO,
+    progress: Progress,
+    rules_path: str,
+) -> None:
+    rules = compile_rules(pathlib.Path(rules_path))
+    for chunk in chunks:
+        _emit(output, progress, qualify_chunk(chunk, output_format, fields, rules))
+
+
+def _qualify_in_pool(
+    chunks: Iterator[list],
+    output_format: str,
+    fields: list[str],
+    output: TextIO,
+    progress: Progress,
+    rules_path: str,
+    workers: int,
+) -> None:
+    """
+    Fan chunks out to a process pool.
+
+    At most two chunks per worker are in flight and results are written in
+    input order, so memory stays bounded whatever the input size.
+    """
+    max_in_flight = workers * 2
+    pending: collections.deque[Future] = collections.deque()
+    with ProcessPoolExecutor(
+        max_workers=workers, initializer=init_worker, initargs=(rules_path,)
+    ) as pool:
+        for chunk in chunks:
+            pending.append(pool.submit(qualify_chunk, chunk, output_format, fields))
+            if len(pending) >= max_in_flight:
+                _emit(output, progress, pending.popleft().result())
+        while pending:
+            _emit(output, progress, pending.popleft().result())
+
+
+def _open_output(path: str | None) -> contextlib.AbstractContextManager[TextIO]:
+    if path is None or path == "-":
+        return contextlib.nullcontext(sys.stdout)
+    return open(path, "w", encoding="utf-8", newline="")
+
+
+def qualify(args: argparse.Namespace) -> int:
+    """Re-qualify every lead of a CSV/NDJSON file into a CSV/NDJSON output."""
+    input_format = detect_format(args.input, args.input_format)
+    output_format = args.output_format or (
+        input_format if args.output in (None, "-") else detect_format(args.output, None)
+    )
+    progress = Progress(args.progress_interval, args.quiet)
+
+    with open(args.input, "r", encoding="utf-8", newline="") as source:
+        input_fields, rows = open_rows(source, input_format)
+        fields = output_fields(input_fields)
+        chunks = iter_chunks(rows, args.chunk_size)
+
+        with _open_output(args.output) as output:
+            if output_format == "csv":
+                output.write(csv_header(fields))
+            if args.workers <= 1:
+                _qualify_in_process(
+                    chunks, output_format, fields, output, progress, args.rules
+                )
+            else:
+                _qualify_in_pool(
+                    chunks,
+                    output_format,
+                    fields,
+                    output,
+                    progress,
+                    args.rules,
+                    args.workers,
+                )
+
+    print(progress.summary(), file=sys.stderr)
+    return 0
+
+
+def build_size_index(args: argparse.Namespace) -> int:
+    """Build the company size index from a domain,headcount CSV file."""
+    started = time.monotonic()
+    try:
+        count = build_company_size_index(read_headcounts(args.input), args.output)
+    except (OSError, ValueError) as exc:
+        print(f"error: {exc}", file=sys.stderr)
+        return 1
+    print(
+        f"indexed {count:,} domains into {args.output} "
+        f"in {time.monotonic() - started:.2f}s",
+        file=sys.stderr,
+    )
+    return 0
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="python -m app.cli", description=__doc__)
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    qualify_parser = commands.add_parser(
+        "qualify", help="Stream a CSV/NDJSON file of leads through qualification"
+    )
+    qualify_parser.add_argument("input", help="CSV or NDJSON file of leads")
+    qualify_parser.add_argument(
+        "-o", "--output", default=None, help="Output file (default: stdout)"
+    )
+    qualify_parser.add_argument("--input-format", choices=FORMATS, default=None)
+    qualify_parser.add_argument("--output-format", choices=FORMATS, default=None)
+    qualify_parser.add_argument("--chunk-size", type=int, default=5000)
+    qualify_parser.add_argument(
+        "--workers",
+        type=int,
+        default=default_workers(),
+        help="Worker processes (1 qualifies in-process)",
+    )
+    qualify_parser.add_argument(
+        "--rules", default=str(rule_engine.path), help="Qualification rules file"
+    )
+    qualify_parser.add_argument("--progress-interval", type=float, default=2.0)
+    qualify_parser.add_argument("--quiet", action="store_true")
+    qualify_parser.set_defaults(handler=qualify)
+
+    index_parser = commands.add_parser(
+        "build-size-index",
+        help="Build the company size index from a domain,headcount CSV file",
+    )
+    index_parser.add_argument("input", help="CSV file with domain and headcount")
+    index_parser.add_argument(
+        "-o", "--output", required=True, help="Index file to (re)write"
+    )
+    index_parser.set_defaults(handler=build_size_index)
+    return parser
+
+
+def main(argv: list[str] | None = None) -> int:
+    args = build_parser().parse_args(argv)
+    return args.handler(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,198 @@
+"""Dependency injection functions for FastAPI."""
+
+import os
+from fastapi import Depends, Header, HTTPException
+from app.services.idempotency import IdempotencyCache, SharedIdempotencyStore
+from app.services.lead_dedup import LeadDeduplicator
+from app.services.lead_dispatch import LeadDispatcher
+from app.services.lead_store import LeadStore
+from app.services.qualification_rules import (
+    CompiledRules,
+    RulesFileError,
+    TenantRules,
+    UnknownTenantError,
+    rule_engine,
+)
+from app.services.rate_limit import RateLimiter, RateLimitTable
+
+LEAD_STORE_DIR = os.getenv("LEAD_STORE_DIR", "data/leads")
+DEDUP_CAPACITY = int(os.getenv("DEDUP_CAPACITY", "1000000"))
+DEDUP_ERROR_RATE = float(os.getenv("DEDUP_ERROR_RATE", "0.001"))
+# Seconds between reads of the leads other workers stored, for duplicate checks
+DEDUP_REFRESH_INTERVAL = float(os.getenv("DEDUP_REFRESH_INTERVAL", "1.0"))
+IDEMPOTENCY_MAX_KEYS = int(os.getenv("IDEMPOTENCY_MAX_KEYS", "100000"))
+IDEMPOTENCY_TTL = float(os.getenv("IDEMPOTENCY_TTL", "86400"))
+# SQLite file shared by all workers; empty keeps keys in each worker's memory
+IDEMPOTENCY_DB_PATH = os.getenv("IDEMPOTENCY_DB_PATH", "")
+# Comma-separated URLs that qualified leads are POSTed to; empty disables fan-out
+LEAD_SINK_URLS = [
+    url.strip() for url in os.getenv("LEAD_SINK_URLS", "").split(",") if url.strip()
+]
+LEAD_DISPATCH_QUEUE_SIZE = int(os.getenv("LEAD_DISPATCH_QUEUE_SIZE", "10000"))
+LEAD_DISPATCH_BATCH_SIZE = int(os.getenv("LEAD_DISPATCH_BATCH_SIZE", "100"))
+LEAD_DISPATCH_BATCH_WINDOW = float(os.getenv("LEAD_DISPATCH_BATCH_WINDOW", "0.05"))
+# Directory of per-tenant rules files (<tenant>.json/.yaml), selected by the
+# X-Tenant-ID header; empty serves every request with the default rules
+QUALIFICATION_TENANTS_DIR = os.getenv("QUALIFICATION_TENANTS_DIR", "")
+TENANT_RULES_CACHE_SIZE = int(os.getenv("TENANT_RULES_CACHE_SIZE", "64"))
+TENANT_ID_PATTERN = r"^[A-Za-z0-9][A-Za-z0-9_-]{0,63}$"
+# Token-bucket limits on lead ingestion per API key, client IP or email domain
+RATE_LIMIT_ENABLED = os.getenv("RATE_LIMIT_ENABLED", "false").lower() == "true"
+RATE_LIMIT_KEY = os.getenv("RATE_LIMIT_KEY", "api_key")
+RATE_LIMIT_RATE = float(os.getenv("RATE_LIMIT_RATE", "50"))
+RATE_LIMIT_BURST = float(os.getenv("RATE_LIMIT_BURST", "100"))
+RATE_LIMIT_SLOTS = int(os.getenv("RATE_LIMIT_SLOTS", "1048576"))
+# File mapped by all workers to share buckets; empty keeps them per worker
+RATE_LIMIT_SHARED_PATH = os.getenv("RATE_LIMIT_SHARED_PATH", "")
+
+# Created on first use so importing the app does not touch the filesystem
+_lead_store: LeadStore | None = None
+_lead_deduplicator: LeadDeduplicator | None = None
+_idempotency_cache: IdempotencyCache | None = None
+_lead_dispatcher: LeadDispatcher | None = None
+_tenant_rules: TenantRules | None = None
+_rate_limiter: RateLimiter | None = None
+
+
+def get_lead_store() -> LeadStore:
+    """Dependency to provide the lead store to routers."""
+    global _lead_store
+    if _lead_store is None:
+        _lead_store = LeadStore(LEAD_STORE_DIR)
+    return _lead_store
+
+
+def get_lead_deduplicator(
+    lead_store: LeadStore = Depends(get_lead_store),
+) -> LeadDeduplicator:
+    """Dependency to provide the duplicate detector of the current lead store."""
+    global _lead_deduplicator
+    if _lead_deduplicator is None or _lead_deduplicator.store is not lead_store:
+        if _lead_deduplicator is not None:
+            _lead_deduplicator.close()
+        _lead_deduplicator = LeadDeduplicator(
+            lead_store, DEDUP_CAPACITY, DEDUP_ERROR_RATE, DEDUP_REFRESH_INTERVAL
+        )
+    return _lead_deduplicator
+
+
+def open_lead_deduplicator() -> None:
+    """Rebuild the duplicate filter from the lead store before serving."""
+    get_lead_deduplicator(get_lead_store())
+
+
+def get_idempotency_cache() -> IdempotencyCache:
+    """Dependency to provide the Idempotency-Key response cache to routers."""
+    global _idempotency_cache
+    if _idempotency_cache is None:
+        shared = (
+            SharedIdempotencyStore(
+                IDEMPOTENCY_DB_PATH,
+                IDEMPOTENCY_TTL,
+                max_entries=IDEMPOTENCY_MAX_KEYS,
+            )
+            if IDEMPOTENCY_DB_PATH
+            else None
+        )
+        _idempotency_cache = IdempotencyCache(
+            IDEMPOTENCY_MAX_KEYS, IDEMPOTENCY_TTL, shared=shared
+        )
+    return _idempotency_cache
+
+
+def get_lead_dispatcher() -> LeadDispatcher | None:
+    """Dependency to provide the downstream lead dispatcher, if sinks are set."""
+    global _lead_dispatcher
+    if _lead_dispatcher is None and LEAD_SINK_URLS:
+        _lead_dispatcher = LeadDispatcher(
+            LEAD_SINK_URLS,
+            max_queue_size=LEAD_DISPATCH_QUEUE_SIZE,
+            batch_size=LEAD_DISPATCH_BATCH_SIZE,
+            batch_window=LEAD_DISPATCH_BATCH_WINDOW,
+        )
+    return _lead_dispatcher
+
+
+async def get_tenant_rules() -> TenantRules | None:
+    """Dependency to provide the per-tenant rule engines, if configured."""
+    global _tenant_rules
+    if _tenant_rules is None and QUALIFICATION_TENANTS_DIR:
+        _tenant_rules = TenantRules(
+            QUALIFICATION_TENANTS_DIR,
+            max_tenants=TENANT_RULES_CACHE_SIZE,
+            reload_interval=rule_engine.reload_interval,
+        )
+    return _tenant_rules
+
+
+async def get_qualification_rules(
+    tenant_id: str | None = Header(
+        default=None, alias="X-Tenant-ID", pattern=TENANT_ID_PATTERN
+    ),
+    tenant_rules: TenantRules | None = Depends(get_tenant_rules),
+) -> CompiledRules:
+    """
+    Dependency to provide the rules of the request's tenant.
+
+    Requests without an X-Tenant-ID header get the default rules. Both rules
+    dependencies are async, so selecting the rules costs no threadpool hop.
+    """
+    if tenant_id is None:
+        return rule_engine.current()
+    if tenant_rules is None:
+        raise HTTPException(status_code=404, detail=f"Unknown tenant: {tenant_id}")
+    try:
+        return tenant_rules.current(tenant_id)
+    except UnknownTenantError as e:
+        raise HTTPException(status_code=404, detail=str(e)) from e
+    except RulesFileError as e:
+        raise HTTPException(status_code=500, detail=str(e)) from e
+
+
+async def get_rate_limiter() -> RateLimiter | None:
+    """Dependency to provide the ingestion rate limiter, if enabled."""
+    global _rate_limiter
+    if _rate_limiter is None and RATE_LIMIT_ENABLED:
+        table = RateLimitTable(
+            RATE_LIMIT_RATE,
+            RATE_LIMIT_BURST,
+            slots=RATE_LIMIT_SLOTS,
+            path=RATE_LIMIT_SHARED_PATH or None,
+        )
+        _rate_limiter = RateLimiter(table, RATE_LIMIT_KEY)
+    return _rate_limiter
+
+
+def close_lead_dispatcher() -> None:
+    """Deliver queued leads and stop the dispatcher on shutdown."""
+    global _lead_dispatcher
+    if _lead_dispatcher is not None:
+        _lead_dispatcher.close()
+        _lead_dispatcher = None
+
+
+def close_idempotency_cache() -> None:
+    """Close the shared idempotency store on shutdown."""
+    global _idempotency_cache
+    if _idempotency_cache is not None:
+        _idempotency_cache.close()
+        _idempotency_cache = None
+
+
+def close_lead_store() -> None:
+    """Flush and close the lead store on shutdown."""
+    global _lead_store, _lead_deduplicator
+    if _lead_deduplicator is not None:
+        _lead_deduplicator.close()
+        _lead_deduplicator = None
+    if _lead_store is not None:
+        _lead_store.close()
+        _lead_store = None
+
+
+def close_rate_limiter() -> None:
+    """Unmap the rate limit table on shutdown."""
+    global _rate_limiter
+    if _rate_limiter is not None:
+        _rate_limiter.close()
+        _rate_limiter = None
@@ -3,8 +3,36 @@ Main FastAPI application entry point
 Creates and configures the FastAPI app with all routes and middleware
 """
 
+import os
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
+from fastapi.responses import PlainTextResponse
+from app.dependencies import (
+    close_idempotency_cache,
+    close_lead_dispatcher,
+    close_lead_store,
+    close_rate_limiter,
+    open_lead_deduplicator,
+)
 from app.routers import leads
+from app.services.metrics import METRICS_ENABLED, PhaseTimer, registry
+from app.startup import FirstRequestTimer, warm_up
+
+# Warm each worker up before it accepts traffic
+WARMUP_ON_STARTUP = os.getenv("WARMUP_ON_STARTUP", "true").lower() == "true"
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Warm the worker up on startup; flush writes and dispatches on shutdown."""
+    if WARMUP_ON_STARTUP:
+        warm_up(app)
+    open_lead_deduplicator()
+    yield
+    close_lead_dispatcher()
+    close_lead_store()
+    close_idempotency_cache()
+    close_rate_limiter()
 
 
 # Import routers
@@ -17,8 +45,13 @@ app = FastAPI(
     version="1.0.0",
     docs_url="/docs",
     redoc_url="/redoc",
+    lifespan=lifespan,
 )
 
+app.add_middleware(FirstRequestTimer)
+if METRICS_ENABLED:
+    app.add_middleware(PhaseTimer)
+
 # Add CORS middleware
 """ app.add_middleware(
     CORSMiddleware,
@@ -39,5 +72,14 @@ async def health_check():
     return {"status": "healthy", "service": "lead-ingestion-api"}
 
 
+# Prometheus metrics, aggregated across workers
+@app.get("/metrics", response_class=PlainTextResponse, include_in_schema=False)
+async def metrics():
+    """Metrics endpoint in Prometheus text format"""
+    return PlainTextResponse(
+        registry.render(), media_type="text/plain; version=0.0.4; charset=utf-8"
+    )
+
+
 # Include routers
 app.include_router(leads.router, tags=["leads"])
@@ -0,0 +1,73 @@
+# Email address type for leads: EmailStr semantics with cached domain checks
+
+import functools
+import re
+from typing import Annotated
+from email_validator import EmailNotValidError
+from email_validator.rfc_constants import (
+    CASE_INSENSITIVE_MAILBOX_NAMES,
+    EMAIL_MAX_LENGTH,
+    LOCAL_PART_MAX_LENGTH,
+)
+from email_validator.syntax import validate_email_domain_name
+from pydantic import AfterValidator, WithJsonSchema
+from pydantic.networks import validate_email
+
+# Distinct domains whose validation is remembered
+DOMAIN_CACHE_SIZE = 10_000
+
+# An unquoted ASCII local part (RFC 5322 dot-atom) and an unbracketed domain
+_ATEXT = r"[A-Za-z0-9!#$%&'*+/=?^_`{|}~-]+"
+_SIMPLE_EMAIL = re.compile(rf"({_ATEXT}(?:\.{_ATEXT})*)@([^\s@\"<>\[\]\\]+)")
+_CASE_INSENSITIVE_NAMES = frozenset(CASE_INSENSITIVE_MAILBOX_NAMES)
+
+
+@functools.lru_cache(maxsize=DOMAIN_CACHE_SIZE)
+def _validate_domain(domain_part: str) -> tuple[str, int] | None:
+    """Normalized domain and its longest encoded length, or None if invalid."""
+    try:
+        info = validate_email_domain_name(domain_part)
+    except EmailNotValidError:
+        return None
+    domain = info["domain"]
+    longest = max(
+        len(domain_part.encode()), len(domain.encode()), len(info["ascii_domain"])
+    )
+    return domain, longest
+
+
+def validate_lead_email(value: str) -> str:
+    """
+    Validate and normalize an email address exactly like pydantic's EmailStr.
+
+    The domain part (IDNA conversion, normalization and syntax) is the costly
+    part of email-validator and repeats across leads, so it is cached per
+    domain; a plain dot-atom local part then only needs a regex match. Any
+    other address (display names, quoting, Unicode local parts) and every
+    invalid one goes through EmailStr's full validation, so the results and
+    error messages are unchanged.
+    """
+    match = _SIMPLE_EMAIL.fullmatch(value)
+    if match is not None:
+        local_part, domain_part = match.groups()
+        domain = _validate_domain(domain_part)
+        if (
+            domain is not None
+            and len(local_part) <= LOCAL_PART_MAX_LENGTH
+            and len(local_part) + 1 + domain[1] <= EMAIL_MAX_LENGTH
+        ):
+            if local_part.lower() in _CASE_INSENSITIVE_NAMES:
+                local_part = local_part.lower()
+            return f"{local_part}@{domain[0]}"
+    return validate_email(value)[1]
+
+
+def domain_cache_info() -> functools._CacheInfo:
+    return _validate_domain.cache_info()
+
+
+LeadEmail = Annotated[
+    str,
+    AfterValidator(validate_lead_email),
+    WithJsonSchema({"type": "string", "format": "email"}),
+]
@@ -1,19 +1,20 @@
 # Pydantic models for lead data validation
 """first_name: str
 last_name: str
-email: pydantic.EmailStr (leverage Pydantic's built-in email validation)
+email: LeadEmail (pydantic.EmailStr validation with per-domain caching)
 company_name: str
 company_size: int (must be a positive integer)
 role: str"""
 
 from typing import Annotated
-from pydantic import BaseModel, EmailStr, Field, field_validator
+from pydantic import BaseModel, Field, field_validator
+from app.models.email import LeadEmail
 
 
 class Lead(BaseModel):
     first_name: str
     last_name: str
-    email: EmailStr
+    email: LeadEmail
     company_name: str
     company_size: Annotated[int, Field(gt=0)]
     role: str
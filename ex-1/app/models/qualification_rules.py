@@ -0,0 +1,53 @@
+# Pydantic models for the lead qualification rules file
+
+from typing import Annotated
+from pydantic import BaseModel, Field, model_validator
+
+
+class LeadScoringConfig(BaseModel):
+    """Feature weights of the numeric lead score; a lead's score is their sum."""
+
+    # Ascending lower bounds of the company size buckets. There is one more
+    # weight than edges: the first weight applies below the first edge.
+    company_size_edges: list[int]
+    company_size_weights: list[float]
+    # Weights of canonical roles; a title naming several roles gets the highest
+    role_weights: dict[str, float] = {}
+    default_role_weight: float = 0.0
+    # Email domains in the forbidden domain index count as free providers
+    free_domain_weight: float = 0.0
+    business_domain_weight: float = 0.0
+
+    @model_validator(mode="after")
+    def check_company_size_buckets(self) -> "LeadScoringConfig":
+        if len(self.company_size_weights) != len(self.company_size_edges) + 1:
+            raise ValueError("company_size_weights needs one more entry than edges")
+        if self.company_size_edges != sorted(self.company_size_edges):
+            raise ValueError("company_size_edges must be ascending")
+        return self
+
+
+class QualificationRulesConfig(BaseModel):
+    """Qualification rules as written in the rules file (JSON or YAML)."""
+
+    min_company_size: Annotated[int, Field(ge=0)]
+    decision_maker_roles: list[str]
+    forbidden_domains: list[str]
+    # Domain list files, one domain per line, relative to the rules file
+    forbidden_domain_lists: list[str] = []
+    # Role synonyms file, relative to the rules file
+    role_synonyms_file: str | None = None
+    # Company size index built by `python -m app.cli build-size-index`, relative
+    # to the rules file; when a lead's email domain is listed, its headcount is
+    # used instead of the self-reported company_size
+    company_size_index: str | None = None
+    # Optional numeric score reported alongside the Qualified/Unqualified status
+    scoring: LeadScoringConfig | None = None
+
+
+class RoleSynonymsConfig(BaseModel):
+    """Job title aliases of each canonical role, as written in the synonyms file."""
+
+    roles: dict[str, list[str]]
+    # Tokens that make a title not count as the role it mentions ("former CEO")
+    disqualifying_tokens: list[str] = []
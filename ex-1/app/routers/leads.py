@@ -1,19 +1,478 @@
 # API routes for lead management
-from fastapi import APIRouter, HTTPException
+import asyncio
+import hashlib
+import os
+import json
+from collections.abc import AsyncIterator, Callable
+from datetime import datetime
+from typing import Literal
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Request, Response
+from fastapi.responses import StreamingResponse
+from starlette.concurrency import run_in_threadpool
+from starlette.requests import ClientDisconnect
+from starlette.types import Receive, Scope, Send
+from app.dependencies import (
+    get_idempotency_cache,
+    get_lead_deduplicator,
+    get_lead_dispatcher,
+    get_lead_store,
+    get_qualification_rules,
+    get_rate_limiter,
+)
 from app.models.lead import Lead
-from app.services.lead_qualification import LeadQualification
+from app.services.idempotency import (
+    IdempotencyCache,
+    IdempotencyKeyReusedError,
+    IdempotencyRecord,
+)
+from app.services.lead_batch import (
+    LeadBatchFormatError,
+    LeadBatchItem,
+    LeadBatchResult,
+    LeadBatchTooLargeError,
+    ingest_lead_batch,
+)
+from app.services.lead_dedup import LeadDeduplicator
+from app.services.lead_import import (
+    LeadImportFormatError,
+    MultipartCsvReader,
+    qualify_rows,
+)
+from app.services.lead_dispatch import LeadDispatcher
+from app.services.lead_export import iter_export
+from app.services.lead_qualification import LeadQualification, LeadQualificationResult
+from app.services.lead_store import LeadStore
+from app.services.qualification_rules import CompiledRules
+from app.services.rate_limit import RateLimiter, retry_after_header
+from app.services.metrics import handler_finished, handler_started, record_results
 
 router = APIRouter()
 
+MAX_BATCH_SIZE = int(os.getenv("MAX_BATCH_SIZE", "50000"))
+# Seconds a request waits, or is told to wait, for room in the dispatch queue
+DISPATCH_RETRY_AFTER = 1.0
+
+BATCH_REQUEST_BODY = {
+    "required": True,
+    "content": {
+        "application/json": {
+            "schema": {"type": "array", "items": {"$ref": "#/components/schemas/Lead"}}
+        },
+        "application/x-ndjson": {
+            "schema": {"type": "string", "description": "One lead JSON object per line"}
+        },
+    },
+}
+
+IMPORT_REQUEST_BODY = {
+    "required": True,
+    "content": {
+        "multipart/form-data": {
+            "schema": {
+                "type": "object",
+                "properties": {
+                    "file": {
+                        "type": "string",
+                        "format": "binary",
+                        "description": "CSV file with a header row of lead fields",
+                    }
+                },
+                "required": ["file"],
+            }
+        }
+    },
+}
+
+
+class UploadStreamingResponse(StreamingResponse):
+    """
+    A StreamingResponse whose body iterator is still reading the request body.
+
+    StreamingResponse watches for client disconnects by consuming receive(),
+    which would steal the upload's body chunks from the iterator; here the
+    iterator is the only reader, and request.stream() reports disconnects.
+    """
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        await self.stream_response(send)
+        if self.background is not None:
+            await self.background()
+
+
+def _enforce_rate_limit(limiter: RateLimiter | None, key: str, cost: int = 1) -> None:
+    """Take `cost` tokens from the key's bucket, or reject with 429."""
+    if limiter is None or cost <= 0:
+        return
+    retry_after = limiter.acquire(key, cost)
+    if retry_after:
+        raise HTTPException(
+            status_code=429,
+            detail="Rate limit exceeded",
+            headers={"Retry-After": retry_after_header(retry_after)},
+        )
+
+
+async def _reserve_dispatch(
+    dispatcher: LeadDispatcher | None,
+    results: list[LeadQualificationResult],
+    wait: bool = False,
+) -> list[LeadQualificationResult]:
+    """
+    Hold dispatch queue room for the qualified results before they are stored.
+
+    When the queue is full the request gets 503 with Retry-After and nothing
+    is stored, or with `wait` it is paused until the queue has drained, so a
+    stored lead always gets a place in the queue. A sink that still fails
+    after the dispatcher's retries loses it; the dispatcher counts the drop.
+
+    Returns:
+        The results to submit once they are stored
+    """
+    qualified = [result for result in results if result.status == "Qualified"]
+    if dispatcher is None or not qualified:
+        return []
+    while not dispatcher.reserve(len(qualified)):
+        if not wait:
+            raise HTTPException(
+                status_code=503,
+                detail="Lead dispatch queue is full",
+                headers={"Retry-After": retry_after_header(DISPATCH_RETRY_AFTER)},
+            )
+        await asyncio.sleep(DISPATCH_RETRY_AFTER)
+    return qualified
+
+
+async def _create_lead(
+    lead: Lead,
+    rules: CompiledRules,
+    lead_store: LeadStore,
+    deduplicator: LeadDeduplicator,
+    dispatcher: LeadDispatcher | None,
+) -> tuple[int, LeadQualificationResult]:
+    """Qualify and store a lead; returns 200 and the original for a duplicate."""
+    original = deduplicator.find_original(lead)
+    if original is not None:
+        return 200, original
+
+    qualification_service = LeadQualification(lead, rules=rules)
+    result = qualification_service.save()
+    dispatching = await _reserve_dispatch(dispatcher, [result])
+    deduplicator.claim(result)
+    try:
+        await lead_store.append(result)
+    except BaseException:
+        if dispatching:
+            dispatcher.release(len(dispatching))
+        raise
+    finally:
+        deduplicator.release(result)
+    if dispatching:
+        dispatcher.submit_many(dispatching, reserved=True)
+    return 201, result
+
+
+async def _store_batch_items(
+    items: list[LeadBatchItem],
+    lead_store: LeadStore,
+    deduplicator: LeadDeduplicator,
+    dispatcher: LeadDispatcher | None,
+    render: Callable[[], str],
+    wait_for_dispatch: bool = False,
+) -> str:
+    """
+    Store the new leads of batch items and return the response from `render`.
+
+    Duplicates get the original result. The response is rendered before
+    anything is stored, so a batch whose response cannot be serialized is
+    neither stored nor dispatched. Qualified leads are dispatched once stored;
+    when the dispatch queue is full nothing is stored and the batch gets 503,
+    or with `wait_for_dispatch` waits for room.
+    """
+    accepted = [item for item in items if item.result is not None]
+    qualified = [item.result for item in accepted]
+    resolved, duplicate_flags = deduplicator.resolve(qualified)
+    new_results = []
+    for item, result, is_duplicate in zip(accepted, resolved, duplicate_flags):
+        item.result, item.duplicate = result, is_duplicate
+        if not is_duplicate:
+            new_results.append(result)
+    try:
+        dispatching = await _reserve_dispatch(
+            dispatcher, new_results, wait_for_dispatch
+        )
+        try:
+            content = await run_in_threadpool(render)
+            await lead_store.append_many(new_results)
+        except BaseException:
+            if dispatching:
+                dispatcher.release(len(dispatching))
+            raise
+    finally:
+        for result in new_results:
+            deduplicator.release(result)
+    record_results(qualified)
+    if dispatching:
+        dispatcher.submit_many(dispatching, reserved=True)
+    return content
+
 
 @router.post("/leads", status_code=201)
-async def create_lead(lead: Lead):
-    """Create a new lead and return the qualification result."""
+async def create_lead(
+    lead: Lead,
+    request: Request,
+    response: Response,
+    idempotency_key: str | None = Header(
+        default=None, alias="Idempotency-Key", max_length=255
+    ),
+    lead_store: LeadStore = Depends(get_lead_store),
+    deduplicator: LeadDeduplicator = Depends(get_lead_deduplicator),
+    idempotency_cache: IdempotencyCache = Depends(get_idempotency_cache),
+    dispatcher: LeadDispatcher | None = Depends(get_lead_dispatcher),
+    rules: CompiledRules = Depends(get_qualification_rules),
+    limiter: RateLimiter | None = Depends(get_rate_limiter),
+):
+    """
+    Create a new lead and return the qualification result.
+
+    A lead already ingested (same email and company) returns 200 with the
+    original lead_id and status instead of creating a new lead. Requests with
+    an Idempotency-Key replay the first response for that key. An X-Tenant-ID
+    header qualifies the lead with that tenant's rules. A source over its rate
+    limit gets 429 with Retry-After, unless the request replays a stored
+    response, and a qualified lead that finds the dispatch queue full gets 503
+    with Retry-After without being stored.
+    """
+    handler_started(request)
+    # A replayed response does no work, so it costs no rate limit token
+    if limiter is not None and (
+        idempotency_key is None or await idempotency_cache.find(idempotency_key) is None
+    ):
+        _enforce_rate_limit(limiter, limiter.key(request, lead.email))
     try:
-        qualification_service = LeadQualification(lead)
-        result = qualification_service.save()
-        return result
+        if idempotency_key is None:
+            response.status_code, result = await _create_lead(
+                lead, rules, lead_store, deduplicator, dispatcher
+            )
+            handler_finished(request)
+            return result
+
+        async def compute() -> IdempotencyRecord:
+            status_code, result = await _create_lead(
+                lead, rules, lead_store, deduplicator, dispatcher
+            )
+            return IdempotencyRecord(
+                status_code, result.model_dump_json().encode(), fingerprint
+            )
+
+        fingerprint = hashlib.blake2b(
+            lead.model_dump_json().encode(), digest_size=16
+        ).hexdigest()
+        record, replayed = await idempotency_cache.run(
+            idempotency_key, fingerprint, compute
+        )
+    except IdempotencyKeyReusedError as e:
+        raise HTTPException(status_code=422, detail=str(e)) from e
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=500, detail=f"Internal server error: {str(e)}"
         ) from e
+
+    handler_finished(request)
+    return Response(
+        content=record.body,
+        status_code=record.status_code,
+        media_type="application/json",
+        headers={"Idempotent-Replayed": "true" if replayed else "false"},
+    )
+
+
+@router.post(
+    "/leads/batch",
+    response_model=LeadBatchResult,
+    openapi_extra={"requestBody": BATCH_REQUEST_BODY},
+)
+async def create_leads_batch(
+    request: Request,
+    lead_store: LeadStore = Depends(get_lead_store),
+    deduplicator: LeadDeduplicator = Depends(get_lead_deduplicator),
+    dispatcher: LeadDispatcher | None = Depends(get_lead_dispatcher),
+    rules: CompiledRules = Depends(get_qualification_rules),
+    limiter: RateLimiter | None = Depends(get_rate_limiter),
+) -> Response:
+    """
+    Create many leads from a JSON array or an NDJSON body.
+
+    Invalid rows are reported per item instead of failing the whole batch, and
+    duplicates are flagged and carry the original result. Each row costs a
+    rate limit token: one is taken before the body is read, so a throttled
+    source is turned away without parsing, and the rest once it is parsed.
+    When the dispatch queue has no room for the batch's qualified leads the
+    batch gets 503 with Retry-After and none of it is stored.
+    """
+    if limiter is not None:
+        rate_limit_key = limiter.key(request)
+        _enforce_rate_limit(limiter, rate_limit_key)
+    body = await request.body()
+    try:
+        batch = await run_in_threadpool(
+            ingest_lead_batch,
+            body,
+            request.headers.get("content-type", ""),
+            MAX_BATCH_SIZE,
+            rules,
+        )
+    except LeadBatchFormatError as e:
+        raise HTTPException(status_code=422, detail=str(e)) from e
+    except LeadBatchTooLargeError as e:
+        raise HTTPException(status_code=413, detail=str(e)) from e
+    if limiter is not None:
+        _enforce_rate_limit(limiter, rate_limit_key, len(batch.items) - 1)
+
+    content = await _store_batch_items(
+        batch.items, lead_store, deduplicator, dispatcher, batch.model_dump_json
+    )
+    return Response(content=content, media_type="application/json")
+
+
+async def _import_results(
+    request: Request,
+    reader: MultipartCsvReader,
+    rules: CompiledRules,
+    lead_store: LeadStore,
+    deduplicator: LeadDeduplicator,
+    dispatcher: LeadDispatcher | None,
+    limiter: RateLimiter | None,
+) -> AsyncIterator[str]:
+    """
+    Qualify and store the rows of each body chunk, yielding NDJSON items.
+
+    Rows beyond the first cost a rate limit token each; a source out of
+    tokens is slowed down by pausing the upload until its bucket refills.
+    """
+    index = 0
+    rate_limit_key = limiter.key(request) if limiter is not None else ""
+    try:
+        async for chunk in request.stream():
+            rows = reader.feed(chunk)
+            if not rows:
+                continue
+            if limiter is not None:
+                cost = len(rows) - (index == 0)
+                while cost > 0 and (wait := limiter.acquire(rate_limit_key, cost)):
+                    await asyncio.sleep(wait)
+            items = await run_in_threadpool(qualify_rows, rows, index, rules)
+            index += len(rows)
+            yield await _store_batch_items(
+                items,
+                lead_store,
+                deduplicator,
+                dispatcher,
+                lambda: "".join(item.model_dump_json() + "\n" for item in items),
+                wait_for_dispatch=True,
+            )
+        reader.close()
+    except LeadImportFormatError as e:
+        # The response has started, so the error becomes the last line
+        yield json.dumps({"error": str(e)}) + "\n"
+    except ClientDisconnect:
+        return
+
+
+@router.post(
+    "/leads/import",
+    response_class=StreamingResponse,
+    openapi_extra={"requestBody": IMPORT_REQUEST_BODY},
+)
+async def import_leads(
+    request: Request,
+    lead_store: LeadStore = Depends(get_lead_store),
+    deduplicator: LeadDeduplicator = Depends(get_lead_deduplicator),
+    dispatcher: LeadDispatcher | None = Depends(get_lead_dispatcher),
+    rules: CompiledRules = Depends(get_qualification_rules),
+    limiter: RateLimiter | None = Depends(get_rate_limiter),
+) -> StreamingResponse:
+    """
+    Import leads from a CSV file uploaded as the multipart field `file`.
+
+    The upload is parsed as it arrives and every row is validated, qualified
+    and stored like a batch item; results stream back as NDJSON batch items
+    while the upload is still in flight. A malformed upload ends the stream
+    with an `{"error": ...}` line. A source over its rate limit gets 429 up
+    front, and an import that runs out of tokens is paused, not cut off.
+    """
+    try:
+        reader = MultipartCsvReader(request.headers.get("content-type", ""))
+    except LeadImportFormatError as e:
+        raise HTTPException(status_code=415, detail=str(e)) from e
+    if limiter is not None:
+        _enforce_rate_limit(limiter, limiter.key(request))
+    return UploadStreamingResponse(
+        _import_results(
+            request, reader, rules, lead_store, deduplicator, dispatcher, limiter
+        ),
+        media_type="application/x-ndjson",
+    )
+
+
+@router.get("/leads/dedup/stats")
+async def get_dedup_stats(
+    deduplicator: LeadDeduplicator = Depends(get_lead_deduplicator),
+) -> dict:
+    """Bloom filter sizing, memory and false-positive statistics."""
+    return deduplicator.stats()
+
+
+@router.get("/leads/dispatch/stats")
+async def get_dispatch_stats(
+    dispatcher: LeadDispatcher | None = Depends(get_lead_dispatcher),
+) -> dict:
+    """Downstream dispatch queue depth, throughput and batch latency."""
+    if dispatcher is None:
+        raise HTTPException(status_code=404, detail="No lead sinks configured")
+    return dispatcher.stats()
+
+
+@router.get("/leads/idempotency/stats")
+async def get_idempotency_stats(
+    idempotency_cache: IdempotencyCache = Depends(get_idempotency_cache),
+) -> dict:
+    """Idempotency-Key cache size, hit rate and shared table purges."""
+    return idempotency_cache.stats()
+
+
+@router.get("/leads/export", response_class=StreamingResponse)
+async def export_leads(
+    since: datetime | None = Query(
+        default=None, description="Only leads created at or after this time"
+    ),
+    status: Literal["Qualified", "Unqualified"] | None = None,
+    domain: str | None = Query(
+        default=None, description="Email domain, subdomains included"
+    ),
+    format: Literal["ndjson", "csv"] = "ndjson",
+    lead_store: LeadStore = Depends(get_lead_store),
+) -> StreamingResponse:
+    """
+    Stream stored leads, oldest first, as NDJSON records or CSV rows.
+
+    Leads are read straight from storage a chunk at a time on a worker thread,
+    so memory stays constant whatever the export size. Times without a zone
+    are UTC.
+    """
+    return StreamingResponse(
+        iter_export(lead_store, since, status, domain, format),
+        media_type="text/csv" if format == "csv" else "application/x-ndjson",
+    )
+
+
+@router.get("/leads/{lead_id}")
+async def get_lead(
+    lead_id: str, lead_store: LeadStore = Depends(get_lead_store)
+) -> LeadQualificationResult:
+    """Get a stored lead and its qualification result."""
+    result = lead_store.get(lead_id)
+    if result is None:
+        raise HTTPException(status_code=404, detail="Lead not found")
+    return result
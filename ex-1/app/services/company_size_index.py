@@ -0,0 +1,161 @@
+# Company size lookup: domain -> headcount in a sorted, memory-mapped file
+
+import bisect
+import csv
+import mmap
+import os
+import pathlib
+import struct
+import sys
+from collections.abc import Iterable, Iterator
+import numpy as np
+from app.services.domain_index import normalize_domain
+
+MAGIC = b"LCSIDX01"
+# Magic and number of domains
+HEADER = struct.Struct("<8sQ")
+MAX_HEADCOUNT = 2**32 - 1
+# One key in this many is kept in memory to narrow down the search in the file
+FENCE_STRIDE = 128
+
+
+def read_headcounts(path: pathlib.Path) -> Iterator[tuple[str, int]]:
+    """Read (domain, headcount) pairs from a CSV file with those two columns."""
+    with open(path, "r", encoding="utf-8", newline="") as f:
+        reader = csv.DictReader(f)
+        if not {"domain", "headcount"} <= set(reader.fieldnames or []):
+            raise ValueError(f"{path} needs 'domain' and 'headcount' columns")
+        for row in reader:
+            try:
+                headcount = int(row["headcount"])
+            except (TypeError, ValueError):
+                raise ValueError(
+                    f"{path}:{reader.line_num}: invalid headcount {row['headcount']!r}"
+                ) from None
+            yield row["domain"], headcount
+
+
+def build_company_size_index(
+    entries: Iterable[tuple[str, int]], path: str | pathlib.Path
+) -> int:
+    """
+    Write domain headcounts into an index file and return the domain count.
+
+    Layout (little-endian): the header, count + 1 uint64 offsets of the keys
+    in the key blob, count uint32 headcounts, then the key blob itself, which
+    holds the normalized domains in ascending byte order. The file is written
+    next to the target and renamed over it, so workers that still map the old
+    file keep reading a complete index.
+    """
+    headcounts: dict[bytes, int] = {}
+    for domain, headcount in entries:
+        key = normalize_domain(domain).encode()
+        if key and 0 < headcount <= MAX_HEADCOUNT:
+            headcounts[key] = headcount
+    keys = sorted(headcounts)
+
+    offsets = np.zeros(len(keys) + 1, dtype="<u8")
+    np.cumsum([len(key) for key in keys], out=offsets[1:])
+    counts = np.fromiter((headcounts[key] for key in keys), "<u4", len(keys))
+
+    path = pathlib.Path(path)
+    temporary = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    try:
+        with open(temporary, "wb") as f:
+            f.write(HEADER.pack(MAGIC, len(keys)))
+            f.write(offsets.tobytes())
+            f.write(counts.tobytes())
+            for key in keys:
+                f.write(key)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temporary, path)
+    finally:
+        temporary.unlink(missing_ok=True)
+    return len(keys)
+
+
+class CompanySizeIndex:
+    """
+    Domain -> headcount lookups in a file written by build_company_size_index.
+
+    The file is memory-mapped and searched in place, so opening it parses
+    nothing and every worker process mapping it shares the same page cache
+    pages. Only every FENCE_STRIDE-th key is copied into memory; a lookup
+    bisects those fence keys in C, then binary-searches the one block of the
+    file they bound. A lookup probes the domain and then its parent domains
+    down to two labels ("eu.acme.com", then "acme.com").
+    """
+
+    __slots__ = (
+        "path",
+        "_mmap",
+        "_count",
+        "_offsets",
+        "_headcounts",
+        "_keys_start",
+        "_fences",
+    )
+
+    def __init__(self, path: str | pathlib.Path):
+        self.path = pathlib.Path(path)
+        with open(self.path, "rb") as f:
+            if os.fstat(f.fileno()).st_size < HEADER.size:
+                raise ValueError(f"{self.path} is not a company size index")
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, count = HEADER.unpack_from(self._mmap)
+        if magic != MAGIC:
+            raise ValueError(f"{self.path} is not a company size index")
+        self._count = count
+        headcounts_start = HEADER.size + 8 * (count + 1)
+        self._keys_start = headcounts_start + 4 * count
+        if len(self._mmap) < self._keys_start:
+            raise ValueError(f"{self.path} is truncated")
+        if sys.byteorder == "little":
+            # Native views index faster than NumPy arrays in the search loop
+            view = memoryview(self._mmap)
+            self._offsets = view[HEADER.size : headcounts_start].cast("Q")
+            self._headcounts = view[headcounts_start : self._keys_start].cast("I")
+        else:
+            self._offsets = np.frombuffer(self._mmap, "<u8", count + 1, HEADER.size)
+            self._headcounts = np.frombuffer(self._mmap, "<u4", count, headcounts_start)
+        if self._keys_start + int(self._offsets[-1]) != len(self._mmap):
+            raise ValueError(f"{self.path} is truncated")
+        self._fences = [self._key(i) for i in range(0, count, FENCE_STRIDE)]
+
+    def _key(self, position: int) -> bytes:
+        base, offsets = self._keys_start, self._offsets
+        return self._mmap[base + offsets[position] : base + offsets[position + 1]]
+
+    def _find(self, key: bytes) -> int | None:
+        block = bisect.bisect_right(self._fences, key) - 1
+        if block < 0:
+            return None
+        data, offsets, base = self._mmap, self._offsets, self._keys_start
+        low = block * FENCE_STRIDE
+        high = min(low + FENCE_STRIDE, self._count)
+        while low < high:
+            middle = (low + high) // 2
+            probe = data[base + offsets[middle] : base + offsets[middle + 1]]
+            if probe < key:
+                low = middle + 1
+            elif probe > key:
+                high = middle
+            else:
+                return int(self._headcounts[middle])
+        return None
+
+    def get(self, domain: str) -> int | None:
+        """Headcount of the domain or its closest listed parent, if any."""
+        domain = normalize_domain(domain)
+        while True:
+            headcount = self._find(domain.encode())
+            if headcount is not None:
+                return headcount
+            dot = domain.find(".")
+            if dot == -1 or domain.find(".", dot + 1) == -1:
+                return None
+            domain = domain[dot + 1 :]
+
+    def __len__(self) -> int:
+        return self._count
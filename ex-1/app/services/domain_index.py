@@ -0,0 +1,71 @@
+# Domain index for blocked email providers with parent-domain suffix matching
+
+import pathlib
+import sys
+from collections.abc import Iterable
+
+
+def normalize_domain(domain: str) -> str:
+    return domain.strip().strip(".").lower()
+
+
+def read_domain_list(path: pathlib.Path) -> list[str]:
+    """Read one domain per line, skipping blank lines and # comments."""
+    with open(path, "r", encoding="utf-8") as f:
+        return [
+            line.strip()
+            for line in f
+            if line.strip() and not line.lstrip().startswith("#")
+        ]
+
+
+class DomainIndex:
+    """
+    Set of blocked domains, matched exactly or through any parent domain.
+
+    Domains are kept in one frozenset and a lookup probes the domain and each of
+    its label suffixes ("a.mail.yahoo.com", "mail.yahoo.com", "yahoo.com",
+    "com"), so it costs one hash probe per label whatever the list size.
+    """
+
+    __slots__ = ("_domains",)
+
+    def __init__(self, domains: Iterable[str]):
+        self._domains = frozenset(
+            normalized for domain in domains if (normalized := normalize_domain(domain))
+        )
+
+    @classmethod
+    def from_files(
+        cls, paths: Iterable[pathlib.Path], extra: Iterable[str] = ()
+    ) -> "DomainIndex":
+        domains = list(extra)
+        for path in paths:
+            domains.extend(read_domain_list(path))
+        return cls(domains)
+
+    def match(self, domain: str) -> str | None:
+        """Return the listed domain that blocks `domain`, if any."""
+        domains = self._domains
+        domain = domain.lower()
+        if domain in domains:
+            return domain
+        dot = domain.find(".")
+        while dot != -1:
+            suffix = domain[dot + 1 :]
+            if suffix in domains:
+                return suffix
+            dot = domain.find(".", dot + 1)
+        return None
+
+    def __contains__(self, domain: str) -> bool:
+        return self.match(domain) is not None
+
+    def __len__(self) -> int:
+        return len(self._domains)
+
+    def memory_bytes(self) -> int:
+        """Approximate bytes held by the index (the set plus its strings)."""
+        return sys.getsizeof(self._domains) + sum(
+            sys.getsizeof(domain) for domain in self._domains
+        )
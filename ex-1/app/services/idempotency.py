@@ -0,0 +1,327 @@
+# Idempotency-Key support: bounded TTL cache of responses, optionally shared via SQLite
+
+import asyncio
+import logging
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Awaitable, Callable
+from concurrent.futures import Future
+
+# How often a worker polls SQLite while another worker computes the response
+SHARED_POLL_INTERVAL = 0.05
+# Responses a worker stores between two purges of the shared table
+SHARED_PURGE_INTERVAL = 1000
+
+
+class IdempotencyKeyReusedError(Exception):
+    """Raised when an Idempotency-Key is reused with a different request body"""
+
+    def __init__(self, key: str):
+        self.key = key
+        super().__init__(
+            f"Idempotency-Key {key!r} was already used with a different request"
+        )
+
+
+class IdempotencyRecord:
+    """A stored response: status code, JSON body and the request fingerprint."""
+
+    __slots__ = ("status_code", "body", "fingerprint")
+
+    def __init__(self, status_code: int, body: bytes, fingerprint: str):
+        self.status_code = status_code
+        self.body = body
+        self.fingerprint = fingerprint
+
+
+class SharedIdempotencyStore:
+    """
+    Idempotency records in a SQLite file shared by every worker process.
+
+    A worker claims a key by inserting a pending row (NULL body); the other
+    workers see the claim and poll until the response is stored. Pending rows
+    expire after `lock_timeout` so a crashed worker does not block a key.
+
+    The table is bounded: the store purges it when opened and then once every
+    `purge_interval` of its puts, deleting expired rows and then the oldest
+    responses beyond `max_entries`. Between purges each worker can add up to
+    `purge_interval` rows over the cap.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        ttl: float,
+        lock_timeout: float = 30.0,
+        max_entries: int = 100_000,
+        purge_interval: int = SHARED_PURGE_INTERVAL,
+    ):
+        self.path = path
+        self.ttl = ttl
+        self.lock_timeout = lock_timeout
+        self.max_entries = max_entries
+        self.purge_interval = purge_interval
+        self.purged = 0
+        self._puts = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=5.0)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS idempotency ("
+            " key TEXT PRIMARY KEY,"
+            " fingerprint TEXT NOT NULL,"
+            " status_code INTEGER,"
+            " body BLOB,"
+            " expires_at REAL NOT NULL)"
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS idempotency_expires_at"
+            " ON idempotency (expires_at)"
+        )
+        self._conn.commit()
+        self.purge()
+
+    def claim(self, key: str, fingerprint: str) -> IdempotencyRecord | None | bool:
+        """
+        Claim a key for computing its response.
+
+        Returns True if claimed, the stored record if the response exists, or
+        None if another worker holds the claim.
+        """
+        now = time.time()
+        with self._lock, self._conn:
+            self._conn.execute(
+                "DELETE FROM idempotency WHERE key = ? AND expires_at <= ?", (key, now)
+            )
+            inserted = self._conn.execute(
+                "INSERT OR IGNORE INTO idempotency (key, fingerprint, expires_at)"
+                " VALUES (?, ?, ?)",
+                (key, fingerprint, now + self.lock_timeout),
+            ).rowcount
+            if inserted:
+                return True
+            row = self._conn.execute(
+                "SELECT fingerprint, status_code, body FROM idempotency WHERE key = ?",
+                (key,),
+            ).fetchone()
+        if row is None or row[2] is None:
+            return None
+        return IdempotencyRecord(row[1], row[2], row[0])
+
+    def get(self, key: str) -> IdempotencyRecord | None:
+        """The stored response for a key, if there is one and it has not expired."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT fingerprint, status_code, body FROM idempotency"
+                " WHERE key = ? AND body IS NOT NULL AND expires_at > ?",
+                (key, time.time()),
+            ).fetchone()
+        return IdempotencyRecord(row[1], row[2], row[0]) if row else None
+
+    def put(self, key: str, record: IdempotencyRecord) -> None:
+        with self._lock, self._conn:
+            self._conn.execute(
+                "REPLACE INTO idempotency VALUES (?, ?, ?, ?, ?)",
+                (
+                    key,
+                    record.fingerprint,
+                    record.status_code,
+                    record.body,
+                    time.time() + self.ttl,
+                ),
+            )
+            self._puts += 1
+        if self._puts % self.purge_interval == 0:
+            self.purge()
+
+    def release(self, key: str) -> None:
+        """Drop a claim whose response was not stored."""
+        with self._lock, self._conn:
+            self._conn.execute(
+                "DELETE FROM idempotency WHERE key = ? AND body IS NULL", (key,)
+            )
+
+    def purge(self) -> int:
+        """Delete expired rows, then the oldest responses over `max_entries`."""
+        with self._lock, self._conn:
+            deleted = self._conn.execute(
+                "DELETE FROM idempotency WHERE expires_at <= ?", (time.time(),)
+            ).rowcount
+            (rows,) = self._conn.execute("SELECT COUNT(*) FROM idempotency").fetchone()
+            if rows > self.max_entries:
+                # Every response has the same TTL, so expiry order is age order
+                deleted += self._conn.execute(
+                    "DELETE FROM idempotency WHERE key IN (SELECT key FROM"
+                    " idempotency WHERE body IS NOT NULL ORDER BY expires_at"
+                    " LIMIT ?)",
+                    (rows - self.max_entries,),
+                ).rowcount
+        self.purged += deleted
+        return deleted
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+class IdempotencyCache:
+    """
+    Responses keyed by Idempotency-Key, replayed for repeated requests.
+
+    Entries live in an OrderedDict in insertion order. Every entry has the same
+    TTL, so insertion order is also expiry order: expired entries are popped
+    from the front and, once `max_entries` is reached, the oldest entry is
+    evicted, both in O(1). A request whose key is being computed waits on the
+    first request's future instead of recomputing. With a SharedIdempotencyStore
+    the same keys are honored across worker processes.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 100_000,
+        ttl: float = 86_400.0,
+        shared: SharedIdempotencyStore | None = None,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.shared = shared
+        self.clock = clock
+        self._entries: OrderedDict[str, tuple[float, IdempotencyRecord]] = OrderedDict()
+        self._inflight: dict[str, Future] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def _evict_expired(self, now: float) -> None:
+        entries = self._entries
+        while entries:
+            expires_at, _ = next(iter(entries.values()))
+            if expires_at > now:
+                break
+            entries.popitem(last=False)
+
+    def get(self, key: str) -> IdempotencyRecord | None:
+        with self._lock:
+            self._evict_expired(self.clock())
+            entry = self._entries.get(key)
+        return entry[1] if entry else None
+
+    def put(self, key: str, record: IdempotencyRecord) -> None:
+        with self._lock:
+            now = self.clock()
+            self._evict_expired(now)
+            self._entries.pop(key, None)
+            self._entries[key] = (now + self.ttl, record)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    async def find(self, key: str) -> IdempotencyRecord | None:
+        """The stored response for `key`, from this worker or the shared store."""
+        record = self.get(key)
+        if record is None and self.shared is not None:
+            record = await asyncio.to_thread(self.shared.get, key)
+        return record
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @staticmethod
+    def _check(key: str, record: IdempotencyRecord, fingerprint: str) -> None:
+        if record.fingerprint != fingerprint:
+            raise IdempotencyKeyReusedError(key)
+
+    async def run(
+        self,
+        key: str,
+        fingerprint: str,
+        compute: Callable[[], Awaitable[IdempotencyRecord]],
+    ) -> tuple[IdempotencyRecord, bool]:
+        """
+        Return the response for `key`, computing it only for the first request.
+
+        Returns:
+            The record and whether it was replayed from an earlier request
+
+        Raises:
+            IdempotencyKeyReusedError: If the key was used with another body
+        """
+        while True:
+            with self._lock:
+                self._evict_expired(self.clock())
+                entry = self._entries.get(key)
+                waiting = self._inflight.get(key) if entry is None else None
+                if entry is None and waiting is None:
+                    leader: Future = Future()
+                    self._inflight[key] = leader
+            if entry is not None:
+                self.hits += 1
+                self._check(key, entry[1], fingerprint)
+                return entry[1], True
+            if waiting is None:
+                break
+            # Once the first request finishes its response is cached; if it
+            # failed nothing is cached and this request computes it instead
+            await asyncio.wrap_future(waiting)
+
+        try:
+            record, replayed = await self._compute(key, fingerprint, compute)
+            self.put(key, record)
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+            leader.set_result(None)
+        if replayed:
+            self.hits += 1
+            self._check(key, record, fingerprint)
+        else:
+            self.misses += 1
+        return record, replayed
+
+    async def _compute(
+        self,
+        key: str,
+        fingerprint: str,
+        compute: Callable[[], Awaitable[IdempotencyRecord]],
+    ) -> tuple[IdempotencyRecord, bool]:
+        if self.shared is None:
+            return await compute(), False
+
+        deadline = time.monotonic() + self.shared.lock_timeout
+        while True:
+            claim = await asyncio.to_thread(self.shared.claim, key, fingerprint)
+            if isinstance(claim, IdempotencyRecord):
+                return claim, True
+            if claim is True:
+                break
+            if time.monotonic() >= deadline:
+                logging.warning("Idempotency key %r claim timed out", key)
+                break
+            await asyncio.sleep(SHARED_POLL_INTERVAL)
+
+        try:
+            record = await compute()
+        except BaseException:
+            await asyncio.to_thread(self.shared.release, key)
+            raise
+        await asyncio.to_thread(self.shared.put, key, record)
+        return record, False
+
+    def stats(self) -> dict:
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "ttl_seconds": self.ttl,
+            "in_flight": len(self._inflight),
+            "hits": self.hits,
+            "misses": self.misses,
+            "shared": self.shared is not None,
+            "shared_purged": self.shared.purged if self.shared is not None else 0,
+        }
+
+    def close(self) -> None:
+        if self.shared is not None:
+            self.shared.close()
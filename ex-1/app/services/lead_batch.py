@@ -0,0 +1,159 @@
+# Batch lead ingestion: validate and qualify many leads in a single pass
+
+import json
+from typing import Any
+from pydantic import BaseModel, TypeAdapter, ValidationError
+from app.models.lead import Lead
+from app.services.lead_qualification import LeadQualificationResult, qualify_leads
+from app.services.qualification_rules import CompiledRules
+
+NDJSON_CONTENT_TYPES = (
+    "application/x-ndjson",
+    "application/ndjson",
+    "application/jsonl",
+)
+
+LEAD_ADAPTER = TypeAdapter(Lead)
+LEAD_LIST_ADAPTER = TypeAdapter(list[Lead])
+
+
+class LeadBatchFormatError(Exception):
+    """Raised when a batch body is neither a JSON array nor NDJSON"""
+
+    def __init__(self, reason: str):
+        self.reason = reason
+        super().__init__(f"Invalid batch body: {reason}")
+
+
+class LeadBatchTooLargeError(Exception):
+    """Raised when a batch holds more leads than allowed"""
+
+    def __init__(self, max_size: int):
+        self.max_size = max_size
+        super().__init__(f"Batch size must be less than or equal to {max_size}")
+
+
+class LeadBatchItem(BaseModel):
+    """Outcome of a single row of a batch: a qualification result or its errors."""
+
+    index: int
+    result: LeadQualificationResult | None = None
+    errors: list[dict[str, Any]] | None = None
+    # True when the lead was already ingested and result is the original
+    duplicate: bool = False
+
+
+class LeadBatchResult(BaseModel):
+    """Per-item results of a batch ingestion."""
+
+    total: int
+    accepted: int
+    rejected: int
+    items: list[LeadBatchItem]
+
+
+def is_ndjson(content_type: str) -> bool:
+    return content_type.split(";")[0].strip().lower() in NDJSON_CONTENT_TYPES
+
+
+def _ndjson_lines(body: bytes) -> list[bytes]:
+    return [line for line in body.splitlines() if line.strip()]
+
+
+def row_errors(error: ValidationError) -> list[dict[str, Any]]:
+    """
+    Errors of a rejected row, without the row's input.
+
+    The input can be bytes that are not valid UTF-8, which would make the
+    response impossible to serialize.
+    """
+    return error.errors(include_url=False, include_context=False, include_input=False)
+
+
+def _check_size(count: int, max_size: int) -> None:
+    if count > max_size:
+        raise LeadBatchTooLargeError(max_size)
+
+
+def validate_lead_rows(
+    body: bytes, ndjson: bool, max_size: int
+) -> tuple[list[tuple[int, Lead]], list[LeadBatchItem]]:
+    """
+    Validate a batch body into leads, keeping per-row errors.
+
+    The whole batch is validated in one strict-mode TypeAdapter pass, which
+    skips type coercion; only when that fails are rows re-validated one by one
+    in lax mode, so valid rows survive invalid neighbours and coercible values
+    (such as a numeric string company_size) are still accepted.
+
+    NDJSON lines are joined into one array for the fast path, which is only
+    kept when it yields exactly one lead per line; a line holding several
+    comma-separated objects is otherwise rejected on its own by the slow path.
+
+    Returns:
+        (index, lead) pairs for valid rows and error items for invalid rows
+    """
+    lines = _ndjson_lines(body) if ndjson else None
+    if lines is not None:
+        _check_size(len(lines), max_size)
+        payload = b"[" + b",".join(lines) + b"]"
+    else:
+        payload = body
+
+    try:
+        leads = LEAD_LIST_ADAPTER.validate_json(payload, strict=True)
+        if lines is None or len(leads) == len(lines):
+            _check_size(len(leads), max_size)
+            return list(enumerate(leads)), []
+    except ValidationError:
+        pass
+
+    if lines is None:
+        try:
+            rows = json.loads(body)
+        except ValueError as exc:
+            raise LeadBatchFormatError("body is not valid JSON") from exc
+        if not isinstance(rows, list):
+            raise LeadBatchFormatError("expected a JSON array of leads")
+        _check_size(len(rows), max_size)
+        validate_row = LEAD_ADAPTER.validate_python
+    else:
+        rows = lines
+        validate_row = LEAD_ADAPTER.validate_json
+
+    valid: list[tuple[int, Lead]] = []
+    invalid: list[LeadBatchItem] = []
+    for index, row in enumerate(rows):
+        try:
+            valid.append((index, validate_row(row)))
+        except ValidationError as exc:
+            invalid.append(LeadBatchItem(index=index, errors=row_errors(exc)))
+    return valid, invalid
+
+
+def ingest_lead_batch(
+    body: bytes,
+    content_type: str,
+    max_size: int,
+    rules: CompiledRules | None = None,
+) -> LeadBatchResult:
+    """Validate and qualify a JSON array or NDJSON batch of leads."""
+    valid, invalid = validate_lead_rows(body, is_ndjson(content_type), max_size)
+    results = qualify_leads((lead for _, lead in valid), rules)
+
+    items = [
+        LeadBatchItem.model_construct(
+            index=index, result=result, errors=None, duplicate=False
+        )
+        for (index, _), result in zip(valid, results)
+    ]
+    if invalid:
+        items.extend(invalid)
+        items.sort(key=lambda item: item.index)
+
+    return LeadBatchResult.model_construct(
+        total=len(items),
+        accepted=len(valid),
+        rejected=len(invalid),
+        items=items,
+    )
@@ -0,0 +1,217 @@
+# Duplicate lead detection: Bloom filter in front of the lead store's exact index
+
+import hashlib
+import json
+import logging
+import math
+import threading
+from collections import deque
+from app.models.lead import Lead
+from app.services.lead_qualification import LeadQualificationResult
+from app.services.lead_store import LeadStore
+
+
+def dedup_key(email: str, company_name: str) -> str:
+    """Normalized identity of a lead: email plus whitespace-collapsed company."""
+    company = " ".join(company_name.lower().split())
+    return f"{email.strip().lower()}\x1f{company}"
+
+
+def bloom_sizing(capacity: int, error_rate: float) -> tuple[int, int]:
+    """Return the (bits, hash count) that hold `capacity` keys at `error_rate`."""
+    size_bits = math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2)
+    hash_count = max(1, round(size_bits / capacity * math.log(2)))
+    return size_bits, hash_count
+
+
+class BloomFilter:
+    """
+    Fixed-size Bloom filter over a bytearray.
+
+    Bit positions come from one 128-bit BLAKE2b digest split into two 64-bit
+    hashes and combined by double hashing (h1 + i * h2).
+    """
+
+    __slots__ = ("capacity", "error_rate", "size_bits", "hash_count", "count", "_bits")
+
+    def __init__(self, capacity: int, error_rate: float):
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.size_bits, self.hash_count = bloom_sizing(capacity, error_rate)
+        self.count = 0
+        self._bits = bytearray((self.size_bits + 7) // 8)
+
+    def _positions(self, key: str) -> list[int]:
+        digest = hashlib.blake2b(key.encode(), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        size = self.size_bits
+        return [(h1 + i * h2) % size for i in range(self.hash_count)]
+
+    def add(self, key: str) -> None:
+        bits = self._bits
+        for position in self._positions(key):
+            bits[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+
+    def __contains__(self, key: str) -> bool:
+        bits = self._bits
+        for position in self._positions(key):
+            if not bits[position >> 3] & (1 << (position & 7)):
+                return False
+        return True
+
+    def memory_bytes(self) -> int:
+        return len(self._bits)
+
+    def false_positive_rate(self) -> float:
+        """Expected false-positive rate at the current fill."""
+        return (1 - math.exp(-self.hash_count * self.count / self.size_bits)) ** (
+            self.hash_count
+        )
+
+
+class LeadDeduplicator:
+    """
+    Finds leads already ingested, keyed on normalized email and company.
+
+    The Bloom filter answers "definitely new" without touching storage; only
+    possible hits are confirmed against the lead store's email index. Leads
+    whose write is still in flight are tracked in `_pending` so concurrent
+    resubmits are caught before the first one is durable.
+
+    The filter is rebuilt from the raw records of the store when it is
+    created, which the app does at startup. Leads stored by other workers
+    sharing the store directory are added to it as the store indexes them:
+    a background thread refreshes the store every `refresh_interval` seconds
+    (None starts no thread), and a Bloom hit refreshes it before the index is
+    read. A lead is a duplicate on every worker within one interval of its
+    original becoming durable.
+    """
+
+    def __init__(
+        self,
+        store: LeadStore,
+        capacity: int,
+        error_rate: float,
+        refresh_interval: float | None = None,
+    ):
+        self.store = store
+        self.bloom = BloomFilter(capacity, error_rate)
+        self.refresh_interval = refresh_interval
+        self._pending: dict[str, LeadQualificationResult] = {}
+        # Keys of other workers' leads, added to the filter by the next check
+        self._observed: deque[str] = deque()
+        self.checks = 0
+        self.bloom_hits = 0
+        self.duplicates = 0
+        # Registered first, so a record indexed during the rebuild is not
+        # missed; the filter absorbs one added twice
+        store.add_listener(self._observe)
+        for line in store.raw_records():
+            lead = json.loads(line)["lead"]
+            self.bloom.add(dedup_key(lead["email"], lead["company_name"]))
+        self._stopped = threading.Event()
+        self._refresher: threading.Thread | None = None
+        if refresh_interval is not None:
+            self._refresher = threading.Thread(
+                target=self._refresh_periodically,
+                name="lead-dedup-refresh",
+                daemon=True,
+            )
+            self._refresher.start()
+
+    def _observe(self, record: dict) -> None:
+        """Queue the key of a lead stored by another worker for the filter."""
+        self._observed.append(
+            dedup_key(record["lead"]["email"], record["lead"]["company_name"])
+        )
+
+    def _refresh_periodically(self) -> None:
+        while not self._stopped.wait(self.refresh_interval):
+            try:
+                self.store.refresh()
+            except Exception:
+                logging.exception("Refreshing the lead store failed")
+
+    def find_original(self, lead: Lead) -> LeadQualificationResult | None:
+        """Return the first result stored for this lead, if it is a duplicate."""
+        self.checks += 1
+        observed = self._observed
+        while observed:
+            self.bloom.add(observed.popleft())
+        key = dedup_key(lead.email, lead.company_name)
+        if key not in self.bloom:
+            return None
+        self.bloom_hits += 1
+
+        original = self._pending.get(key)
+        if original is None:
+            # Reading the email index refreshes the store first
+            original = next(
+                (
+                    result
+                    for result in self.store.find_by_email(lead.email)
+                    if dedup_key(result.lead.email, result.lead.company_name) == key
+                ),
+                None,
+            )
+        if original is not None:
+            self.duplicates += 1
+        return original
+
+    def claim(self, result: LeadQualificationResult) -> None:
+        """Register a new lead before it is written."""
+        key = dedup_key(result.lead.email, result.lead.company_name)
+        self.bloom.add(key)
+        self._pending[key] = result
+
+    def release(self, result: LeadQualificationResult) -> None:
+        """Forget an in-flight lead once its write has settled."""
+        self._pending.pop(dedup_key(result.lead.email, result.lead.company_name), None)
+
+    def resolve(
+        self, results: list[LeadQualificationResult]
+    ) -> tuple[list[LeadQualificationResult], list[bool]]:
+        """
+        Replace duplicates in a batch by their originals and claim the rest.
+
+        Returns:
+            The resolved results and, for each, whether it is a duplicate
+        """
+        resolved, duplicate_flags = [], []
+        for result in results:
+            original = self.find_original(result.lead)
+            if original is None:
+                self.claim(result)
+            resolved.append(original or result)
+            duplicate_flags.append(original is not None)
+        return resolved, duplicate_flags
+
+    def close(self) -> None:
+        """Stop the background refresh."""
+        self._stopped.set()
+        if self._refresher is not None:
+            self._refresher.join()
+            self._refresher = None
+
+    def stats(self) -> dict:
+        false_positives = self.bloom_hits - self.duplicates
+        return {
+            "capacity": self.bloom.capacity,
+            "target_false_positive_rate": self.bloom.error_rate,
+            "size_bits": self.bloom.size_bits,
+            "hash_count": self.bloom.hash_count,
+            "memory_bytes": self.bloom.memory_bytes(),
+            "keys": self.bloom.count,
+            "estimated_false_positive_rate": self.bloom.false_positive_rate(),
+            "checks": self.checks,
+            "bloom_hits": self.bloom_hits,
+            "duplicates": self.duplicates,
+            "observed_false_positives": false_positives,
+            "observed_false_positive_rate": (
+                false_positives / (self.checks - self.duplicates)
+                if self.checks > self.duplicates
+                else 0.0
+            ),
+        }
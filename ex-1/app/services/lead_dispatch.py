@@ -0,0 +1,262 @@
+# Asynchronous fan-out of qualified leads to downstream sinks (CRM, Slack bot)
+
+import asyncio
+import collections
+import logging
+import statistics
+import threading
+import time
+from collections.abc import Iterable
+import httpx
+from pydantic import TypeAdapter
+from app.services.lead_qualification import LeadQualificationResult
+from app.services.metrics import record_dispatch_drops
+
+RESULTS_ADAPTER = TypeAdapter(list[LeadQualificationResult])
+
+# Number of recent batch latencies kept for the stats percentiles
+LATENCY_WINDOW = 1024
+
+
+class LeadDispatcher:
+    """
+    Pushes qualified leads to HTTP sinks in micro-batches, off the request path.
+
+    `submit` only enqueues, so request handlers never wait on the sinks. A
+    background thread runs its own event loop that collects up to `batch_size`
+    leads, or whatever arrived within `batch_window` seconds of the first one,
+    and POSTs them as one JSON array to every sink concurrently, each through
+    its own pooled httpx.AsyncClient. The queue is bounded: when it is full
+    `submit` returns False and the lead is counted as rejected, so callers see
+    backpressure instead of unbounded memory growth. A caller that must not
+    lose a lead first holds queue room with `reserve`, stores the lead, and
+    then submits it with `reserved=True` (or gives the room back with
+    `release` if storing failed). A batch a sink still refuses after
+    `max_retries` is logged and its leads are counted as dropped for that
+    sink, in the stats and the lead_dispatch_dropped_total metric.
+    """
+
+    def __init__(
+        self,
+        sink_urls: Iterable[str],
+        max_queue_size: int = 10_000,
+        batch_size: int = 100,
+        batch_window: float = 0.05,
+        timeout: float = 5.0,
+        max_retries: int = 2,
+    ):
+        self.sink_urls = list(sink_urls)
+        self.max_queue_size = max_queue_size
+        self.batch_size = batch_size
+        self.batch_window = batch_window
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.submitted = 0
+        self.rejected = 0
+        self.batches_sent = 0
+        self.leads_sent = 0
+        self.failed_deliveries = 0
+        self.dropped_leads = 0
+        self._latencies: collections.deque[float] = collections.deque(
+            maxlen=LATENCY_WINDOW
+        )
+        self._depth = 0
+        self._lock = threading.Lock()
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._queue: asyncio.Queue | None = None
+        self._thread: threading.Thread | None = None
+        self._closed = False
+
+    def _start(self) -> None:
+        with self._lock:
+            if self._thread is not None:
+                return
+            # Created here so submits can schedule onto the loop right away,
+            # without waiting on the event loop thread to come up
+            self._loop = asyncio.new_event_loop()
+            self._queue = asyncio.Queue()
+            self._thread = threading.Thread(
+                target=self._run, name="lead-dispatcher", daemon=True
+            )
+            self._thread.start()
+
+    def _run(self) -> None:
+        loop = self._loop
+        asyncio.set_event_loop(loop)
+        # One pooled client per sink, so a slow sink cannot starve the others
+        clients = {
+            url: httpx.AsyncClient(timeout=self.timeout) for url in self.sink_urls
+        }
+        consumer = loop.create_task(self._consume(clients))
+        try:
+            loop.run_forever()
+        finally:
+            consumer.cancel()
+            loop.run_until_complete(asyncio.gather(consumer, return_exceptions=True))
+            for client in clients.values():
+                loop.run_until_complete(client.aclose())
+            loop.close()
+
+    def submit(self, result: LeadQualificationResult) -> bool:
+        """Queue a result for delivery. Returns False if the queue is full."""
+        return self.submit_many([result]) == 1
+
+    def reserve(self, count: int) -> bool:
+        """
+        Hold queue room for `count` leads that will be submitted later.
+
+        Returns False if the room is not there; the caller holds on to its
+        leads, so they are not counted as rejected. An empty queue takes any
+        count, so a batch larger than the queue is not refused forever.
+        """
+        with self._lock:
+            if self._closed or (
+                self._depth and self._depth + count > self.max_queue_size
+            ):
+                return False
+            self._depth += count
+            return True
+
+    def release(self, count: int) -> None:
+        """Give back queue room reserved for leads that will not be submitted."""
+        with self._lock:
+            self._depth -= count
+
+    def submit_many(
+        self, results: Iterable[LeadQualificationResult], reserved: bool = False
+    ) -> int:
+        """
+        Queue results for delivery and return how many fitted in the queue.
+
+        With `reserved=True` the room was taken by `reserve`, and every result
+        is queued.
+        """
+        results = list(results)
+        if not results:
+            return 0
+        if self._closed:
+            if reserved:
+                self.release(len(results))
+            return 0
+        if self._thread is None:
+            self._start()
+        with self._lock:
+            if reserved:
+                accepted = results
+            else:
+                accepted = results[: max(0, self.max_queue_size - self._depth)]
+                self._depth += len(accepted)
+                self.rejected += len(results) - len(accepted)
+            self.submitted += len(accepted)
+        if len(accepted) < len(results):
+            logging.warning(
+                "Lead dispatch queue full, rejected %d leads",
+                len(results) - len(accepted),
+            )
+        if accepted:
+            self._loop.call_soon_threadsafe(self._enqueue, accepted)
+        return len(accepted)
+
+    def _enqueue(self, results: list[LeadQualificationResult]) -> None:
+        for result in results:
+            self._queue.put_nowait(result)
+
+    async def _consume(self, clients: dict[str, httpx.AsyncClient]) -> None:
+        queue = self._queue
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await queue.get()]
+            deadline = loop.time() + self.batch_window
+            while len(batch) < self.batch_size:
+                if not queue.empty():
+                    batch.append(queue.get_nowait())
+                    continue
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(queue.get(), remaining))
+                except TimeoutError:
+                    break
+            try:
+                await self._send(clients, batch)
+            finally:
+                with self._lock:
+                    self._depth -= len(batch)
+                for _ in batch:
+                    queue.task_done()
+
+    async def _send(
+        self,
+        clients: dict[str, httpx.AsyncClient],
+        batch: list[LeadQualificationResult],
+    ) -> None:
+        started = time.perf_counter()
+        payload = RESULTS_ADAPTER.dump_json(batch)
+        outcomes = await asyncio.gather(
+            *(self._post(client, url, payload) for url, client in clients.items())
+        )
+        self._latencies.append(time.perf_counter() - started)
+        self.batches_sent += 1
+        self.leads_sent += len(batch)
+        failures = outcomes.count(False)
+        self.failed_deliveries += failures
+        if failures:
+            self.dropped_leads += failures * len(batch)
+            record_dispatch_drops(failures * len(batch))
+
+    async def _post(self, client: httpx.AsyncClient, url: str, payload: bytes) -> bool:
+        for attempt in range(self.max_retries + 1):
+            try:
+                response = await client.post(
+                    url, content=payload, headers={"Content-Type": "application/json"}
+                )
+                response.raise_for_status()
+                return True
+            except httpx.HTTPError as exc:
+                if attempt == self.max_retries:
+                    logging.error("Lead dispatch to %s failed: %s", url, exc)
+                    return False
+                await asyncio.sleep(0.1 * 2**attempt)
+        return False
+
+    def flush(self, timeout: float | None = None) -> None:
+        """Block until every queued lead has been delivered (or given up on)."""
+        if self._thread is None:
+            return
+        asyncio.run_coroutine_threadsafe(self._queue.join(), self._loop).result(timeout)
+
+    def stats(self) -> dict:
+        latencies = sorted(self._latencies)
+        return {
+            "sinks": len(self.sink_urls),
+            "queue_depth": self._depth,
+            "max_queue_size": self.max_queue_size,
+            "submitted": self.submitted,
+            "rejected": self.rejected,
+            "batches_sent": self.batches_sent,
+            "leads_sent": self.leads_sent,
+            "failed_deliveries": self.failed_deliveries,
+            "dropped_leads": self.dropped_leads,
+            "batch_latency_ms": {
+                "p50": statistics.median(latencies) * 1000 if latencies else None,
+                "p95": (
+                    latencies[int(len(latencies) * 0.95)] * 1000 if latencies else None
+                ),
+                "max": latencies[-1] * 1000 if latencies else None,
+            },
+        }
+
+    def close(self, timeout: float = 10.0) -> None:
+        """Deliver what is queued, then stop the dispatcher thread."""
+        if self._closed:
+            return
+        self._closed = True
+        if self._thread is None:
+            return
+        try:
+            self.flush(timeout)
+        except TimeoutError:
+            logging.warning("Lead dispatcher closed with %d leads queued", self._depth)
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
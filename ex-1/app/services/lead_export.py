@@ -0,0 +1,110 @@
+# Streaming export of stored leads as NDJSON or CSV, oldest first
+
+import csv
+import io
+from collections.abc import Iterator
+from datetime import datetime, timezone
+from typing import Any
+from pydantic_core import from_json
+from app.models.lead import Lead
+from app.services.lead_ids import is_uuid7, uuid7_floor
+from app.services.lead_store import LeadStore
+
+LEAD_FIELDS = tuple(Lead.model_fields)
+EXPORT_FIELDS = [
+    "lead_id",
+    *LEAD_FIELDS,
+    "status",
+    "qualification_notes",
+    "score",
+    "company_size_source",
+]
+# Records serialized per yielded piece of the response
+EXPORT_CHUNK_SIZE = 1000
+
+
+def _matches_domain(record: dict[str, Any], domain: str) -> bool:
+    email_domain = record["lead"]["email"].rpartition("@")[2].lower()
+    return email_domain == domain or email_domain.endswith("." + domain)
+
+
+def _csv_rows(records: list[dict[str, Any]]) -> str:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    for record in records:
+        lead = record["lead"]
+        writer.writerow(
+            [
+                record["lead_id"],
+                *(lead.get(field) for field in LEAD_FIELDS),
+                record["status"],
+                "; ".join(record.get("qualification_notes") or []),
+                record.get("score"),
+                record.get("company_size_source"),
+            ]
+        )
+    return buffer.getvalue()
+
+
+def _serialize(lines: list[bytes], domain: str | None, fmt: str) -> bytes:
+    if domain is None and fmt == "ndjson":
+        return b"".join(lines)
+    records = [from_json(line) for line in lines]
+    if domain is not None:
+        matches = [
+            (line, record)
+            for line, record in zip(lines, records)
+            if _matches_domain(record, domain)
+        ]
+        lines = [line for line, _ in matches]
+        records = [record for _, record in matches]
+    if fmt == "csv":
+        return _csv_rows(records).encode()
+    return b"".join(lines)
+
+
+def iter_export(
+    store: LeadStore,
+    since: datetime | None = None,
+    status: str | None = None,
+    domain: str | None = None,
+    fmt: str = "ndjson",
+    chunk_size: int = EXPORT_CHUNK_SIZE,
+) -> Iterator[bytes]:
+    """
+    Yield the stored leads matching the filters, serialized in chunks.
+
+    Leads are read in lead_id order, which is creation order for time-ordered
+    ids, so `since` starts a range scan at the first id of that instant;
+    leads stored with older random ids carry no time and are left out of
+    "since" exports. NDJSON lines are the stored records as they are, and
+    records are only parsed when a domain filter or CSV output needs them.
+    Domains match the email domain and its subdomains. Only one chunk is
+    held at a time.
+    """
+    start = None
+    if since is not None:
+        if since.tzinfo is None:
+            since = since.replace(tzinfo=timezone.utc)
+        start = str(uuid7_floor(since.timestamp()))
+    status_marker = f'"status":"{status}"'.encode() if status else None
+    domain = domain.lower().strip(".") if domain else None
+
+    if fmt == "csv":
+        header = io.StringIO()
+        csv.writer(header).writerow(EXPORT_FIELDS)
+        yield header.getvalue().encode()
+
+    lines: list[bytes] = []
+    for lead_id, line in store.records(start, chunk_size):
+        if start is not None and not is_uuid7(lead_id):
+            continue
+        # Records are compact JSON, where unescaped quotes only delimit strings
+        if status_marker is not None and status_marker not in line:
+            continue
+        lines.append(line)
+        if len(lines) >= chunk_size:
+            yield _serialize(lines, domain, fmt)
+            lines = []
+    if lines:
+        yield _serialize(lines, domain, fmt)
@@ -0,0 +1,53 @@
+# Time-ordered lead ids: UUIDv7 (RFC 9562) with a monotonic per-process counter
+
+import os
+import threading
+import time
+import uuid
+
+# 12 bits of rand_a and 62 bits of rand_b, used together as a counter
+_COUNTER_BITS = 74
+_COUNTER_MAX = (1 << _COUNTER_BITS) - 1
+_VERSION_VARIANT = (0x7 << 76) | (0b10 << 62)
+
+_lock = threading.Lock()
+_last_millis = 0
+_last_counter = 0
+
+
+def _pack(millis: int, counter: int) -> uuid.UUID:
+    rand_a = counter >> 62
+    rand_b = counter & ((1 << 62) - 1)
+    return uuid.UUID(int=(millis << 80) | _VERSION_VARIANT | (rand_a << 64) | rand_b)
+
+
+def uuid7() -> uuid.UUID:
+    """
+    A new UUIDv7: the Unix time in milliseconds, then 74 random bits.
+
+    Ids sort by creation time. Within one millisecond (or if the clock steps
+    back) the random bits are incremented instead of redrawn, so ids from one
+    process are strictly increasing.
+    """
+    global _last_millis, _last_counter
+    millis = time.time_ns() // 1_000_000
+    with _lock:
+        if millis > _last_millis:
+            counter = int.from_bytes(os.urandom(10)) & _COUNTER_MAX
+        else:
+            millis = _last_millis
+            counter = _last_counter + 1
+            if counter > _COUNTER_MAX:
+                millis, counter = millis + 1, 0
+        _last_millis, _last_counter = millis, counter
+    return _pack(millis, counter)
+
+
+def uuid7_floor(timestamp: float) -> uuid.UUID:
+    """The smallest UUIDv7 that can be generated at or after a Unix timestamp."""
+    return _pack(max(0, int(timestamp * 1000)), 0)
+
+
+def is_uuid7(lead_id: str) -> bool:
+    """Whether a canonical UUID string is a version 7 (time-ordered) id."""
+    return lead_id[14:15] == "7"
@@ -0,0 +1,205 @@
+# Streaming CSV import: parse a multipart upload as it arrives, row by row
+
+import codecs
+import csv
+from typing import Any
+from pydantic import ValidationError
+from python_multipart.multipart import MultipartParser, parse_options_header
+from app.services.lead_batch import LEAD_ADAPTER, LeadBatchItem, row_errors
+from app.services.lead_qualification import qualify_leads
+from app.services.qualification_rules import CompiledRules
+
+# Form field that carries the CSV file
+FILE_FIELD = "file"
+# Longest CSV record (one row, including quoted newlines) kept in memory
+MAX_RECORD_SIZE = 64 * 1024
+
+
+class LeadImportFormatError(Exception):
+    """Raised when an upload is not a multipart form with a readable CSV file"""
+
+    def __init__(self, reason: str):
+        self.reason = reason
+        super().__init__(f"Invalid lead import: {reason}")
+
+
+class CsvRowReader:
+    """
+    Turns CSV text fed in arbitrary pieces into row dicts keyed by the header.
+
+    Only complete records are parsed: a record ends at a newline outside of a
+    quoted field, which is where the count of quote characters seen so far in
+    the record is even (an escaped quote adds two). At most one incomplete
+    record is buffered, and it may not grow past `max_record_size`.
+    """
+
+    def __init__(self, max_record_size: int = MAX_RECORD_SIZE):
+        self.max_record_size = max_record_size
+        self.fieldnames: list[str] | None = None
+        self._tail = ""
+        self._record: list[str] = []
+        self._record_size = 0
+        self._quotes = 0
+
+    def feed(self, text: str) -> list[dict[str, str]]:
+        end = text.rfind("\n") + 1
+        if not end:
+            self._tail += text
+            self._check_size(len(self._tail))
+            return []
+        lines = (self._tail + text[:end]).split("\n")[:-1]
+        self._tail = text[end:]
+        records = []
+        for line in lines:
+            self._record.append(line)
+            self._record_size += len(line) + 1
+            self._quotes += line.count('"')
+            if self._quotes % 2 == 0:
+                records.append("\n".join(self._record) + "\n")
+                self._record, self._record_size, self._quotes = [], 0, 0
+        self._check_size(len(self._tail))
+        return self._rows(records)
+
+    def close(self) -> list[dict[str, str]]:
+        """Parse what is left after the last newline."""
+        if self._tail:
+            rows = self.feed("\n")
+        else:
+            rows = []
+        if self._record:
+            raise LeadImportFormatError("unterminated quoted field")
+        if self.fieldnames is None:
+            raise LeadImportFormatError("the CSV file has no header row")
+        return rows
+
+    def _check_size(self, tail_size: int) -> None:
+        if self._record_size + tail_size > self.max_record_size:
+            raise LeadImportFormatError(
+                f"a CSV record is longer than {self.max_record_size} characters"
+            )
+
+    def _rows(self, records: list[str]) -> list[dict[str, str]]:
+        rows = []
+        for values in csv.reader(records):
+            if not values:
+                continue
+            if self.fieldnames is None:
+                self.fieldnames = [name.strip() for name in values]
+            else:
+                rows.append(dict(zip(self.fieldnames, values)))
+        return rows
+
+
+class MultipartCsvReader:
+    """
+    Incremental parser of a multipart/form-data upload holding a CSV file.
+
+    Body chunks go in through `feed` as they are received and come out as the
+    rows they completed, so neither the body nor the file is ever held whole.
+    Parts other than the `file` field are skipped.
+    """
+
+    def __init__(self, content_type: str, max_record_size: int = MAX_RECORD_SIZE):
+        media_type, params = parse_options_header(content_type)
+        if media_type != b"multipart/form-data" or b"boundary" not in params:
+            raise LeadImportFormatError("expected a multipart/form-data upload")
+        self.csv = CsvRowReader(max_record_size)
+        self._decoder = codecs.getincrementaldecoder("utf-8-sig")()
+        self._header_field = b""
+        self._header_value = b""
+        self._headers: dict[bytes, bytes] = {}
+        self._in_file = False
+        self._found_file = False
+        self._finished = False
+        self._rows: list[dict[str, str]] = []
+        self._parser = MultipartParser(
+            params[b"boundary"],
+            {
+                "on_part_begin": self._on_part_begin,
+                "on_header_field": self._on_header_field,
+                "on_header_value": self._on_header_value,
+                "on_header_end": self._on_header_end,
+                "on_headers_finished": self._on_headers_finished,
+                "on_part_data": self._on_part_data,
+                "on_part_end": self._on_part_end,
+                "on_end": self._on_end,
+            },
+        )
+
+    def feed(self, chunk: bytes) -> list[dict[str, str]]:
+        try:
+            self._parser.write(chunk)
+        except UnicodeDecodeError as exc:
+            raise LeadImportFormatError("the CSV file is not UTF-8") from exc
+        except LeadImportFormatError:
+            raise
+        except Exception as exc:
+            # python-multipart reports malformed bodies with several error types
+            raise LeadImportFormatError(f"malformed multipart body: {exc}") from exc
+        rows, self._rows = self._rows, []
+        return rows
+
+    def close(self) -> None:
+        """Check that the upload was complete and contained a CSV file."""
+        if not self._finished:
+            raise LeadImportFormatError("the upload ended before its last part")
+        if not self._found_file:
+            raise LeadImportFormatError(f"no {FILE_FIELD!r} file in the upload")
+
+    def _on_part_begin(self) -> None:
+        self._headers = {}
+
+    def _on_header_field(self, data: bytes, start: int, end: int) -> None:
+        self._header_field += data[start:end]
+
+    def _on_header_value(self, data: bytes, start: int, end: int) -> None:
+        self._header_value += data[start:end]
+
+    def _on_header_end(self) -> None:
+        self._headers[self._header_field.lower()] = self._header_value
+        self._header_field, self._header_value = b"", b""
+
+    def _on_headers_finished(self) -> None:
+        _, options = parse_options_header(self._headers.get(b"content-disposition"))
+        self._in_file = (
+            not self._found_file and options.get(b"name") == FILE_FIELD.encode()
+        )
+        self._found_file = self._found_file or self._in_file
+
+    def _on_part_data(self, data: bytes, start: int, end: int) -> None:
+        if self._in_file:
+            text = self._decoder.decode(data[start:end])
+            self._rows.extend(self.csv.feed(text))
+
+    def _on_part_end(self) -> None:
+        if self._in_file:
+            self._rows.extend(self.csv.feed(self._decoder.decode(b"", final=True)))
+            self._rows.extend(self.csv.close())
+            self._in_file = False
+
+    def _on_end(self) -> None:
+        self._finished = True
+
+
+def qualify_rows(
+    rows: list[dict[str, Any]],
+    first_index: int,
+    rules: CompiledRules | None = None,
+) -> list[LeadBatchItem]:
+    """Validate and qualify consecutive rows, numbering them from first_index."""
+    valid_indexes, leads = [], []
+    items: list[LeadBatchItem] = []
+    for index, row in enumerate(rows, first_index):
+        try:
+            leads.append(LEAD_ADAPTER.validate_python(row))
+            valid_indexes.append(index)
+        except ValidationError as exc:
+            items.append(LeadBatchItem(index=index, errors=row_errors(exc)))
+    items.extend(
+        LeadBatchItem.model_construct(
+            index=index, result=result, errors=None, duplicate=False
+        )
+        for index, result in zip(valid_indexes, qualify_leads(leads, rules))
+    )
+    items.sort(key=lambda item: item.index)
+    return items
@@ -1,8 +1,17 @@
 # Business logic for lead qualification
 
+import time
+from collections.abc import Iterable
 from app.models.lead import Lead
 import uuid
 from pydantic import BaseModel
+from app.services.lead_ids import uuid7
+from app.services.metrics import record_qualification
+from app.services.qualification_rules import (
+    SIZE_FROM_FORM,
+    CompiledRules,
+    rule_engine,
+)
 
 
 class LeadQualificationResult(BaseModel):
@@ -11,55 +20,83 @@ class LeadQualificationResult(BaseModel):
     lead_id: uuid.UUID
     status: str
     qualification_notes: list[str] | None = None
+    # Weighted lead score, when the rules configure scoring
+    score: float | None = None
+    # "form" when the self-reported company_size was used, "index" when the
+    # headcount came from the company size index
+    company_size_source: str = SIZE_FROM_FORM
     lead: Lead
 
 
 class LeadQualification:
     """Service for qualifying leads based on company size, role, and email domain."""
 
-    def __init__(self, lead: Lead):
-        self.forbidden_domains = ["gmail.com", "yahoo.com", "outlook.com"]
-        self.decision_maker_roles = ["ceo", "cto", "founder", "vp of engineering"]
-        self.min_company_size = 10
+    def __init__(
+        self,
+        lead: Lead,
+        rules: CompiledRules | None = None,
+    ):
+        self.rules = rules or rule_engine.current()
         self.lead = lead
 
-    def _qualify_lead(self) -> bool:
-        return (
-            self._qualify_by_company_size()
-            and self._qualify_by_role()
-            and self._qualify_by_email()
-        )
-
-    def _qualify_by_company_size(self) -> bool:
-        return self.lead.company_size > self.min_company_size
-
-    def _qualify_by_role(self) -> bool:
-        return self.lead.role.lower().strip() in self.decision_maker_roles
-
-    def _qualify_by_email(self) -> bool:
-        email_domain = self.lead.email.split("@")[1]
-        return email_domain not in self.forbidden_domains
-
-    def _get_qualification_notes(self) -> list[str]:
-        qualification_notes = []
-        if not self._qualify_by_company_size():
-            qualification_notes.append("Company size is too small")
-        if not self._qualify_by_role():
-            qualification_notes.append("Role is not a decision-maker")
-        if not self._qualify_by_email():
-            qualification_notes.append("Email domain is forbidden")
-        return qualification_notes
+    def save(self, record: bool = True) -> LeadQualificationResult:
+        """
+        Save qualified lead and return UUID.
 
-    def save(self) -> LeadQualificationResult:
-        """Save qualified lead and return UUID."""
-        qualification_notes = self._get_qualification_notes()
-        is_qualified = self._qualify_lead()
+        Args:
+            record: Count the outcome in the qualification metrics; warm-up
+                runs pass False so synthetic leads are not counted
+        """
+        started = time.perf_counter()
+        company_size, size_source = self.rules.company_size(self.lead)
+        is_qualified, qualification_notes = self.rules.evaluate(self.lead, company_size)
+        scoring = self.rules.scoring
+        score = scoring.score(self.lead, company_size) if scoring else None
+        status = "Qualified" if is_qualified else "Unqualified"
+        if record:
+            record_qualification(
+                status, qualification_notes, time.perf_counter() - started
+            )
 
         result = LeadQualificationResult(
-            lead_id=uuid.uuid4(),
-            status="Qualified" if is_qualified else "Unqualified",
+            lead_id=uuid7(),
+            status=status,
             qualification_notes=qualification_notes if not is_qualified else None,
+            score=score,
+            company_size_source=size_source,
             lead=self.lead,
         )
 
         return result
+
+
+def qualify_leads(
+    leads: Iterable[Lead], rules: CompiledRules | None = None
+) -> list[LeadQualificationResult]:
+    """
+    Qualify many leads in one loop against a single snapshot of the rules.
+
+    Scores, when configured, are computed for the whole batch at once.
+    """
+    rules = rules or rule_engine.current()
+    evaluate = rules.evaluate
+    leads = list(leads)
+    sizes = [rules.company_size(lead) for lead in leads]
+    if rules.scoring and leads:
+        scores = rules.scoring.score_many(leads, [size for size, _ in sizes]).tolist()
+    else:
+        scores = [None] * len(leads)
+    results = []
+    for lead, (company_size, size_source), score in zip(leads, sizes, scores):
+        is_qualified, qualification_notes = evaluate(lead, company_size)
+        results.append(
+            LeadQualificationResult.model_construct(
+                lead_id=uuid7(),
+                status="Qualified" if is_qualified else "Unqualified",
+                qualification_notes=None if is_qualified else qualification_notes,
+                score=score,
+                company_size_source=size_source,
+                lead=lead,
+            )
+        )
+    return results
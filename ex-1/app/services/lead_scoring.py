@@ -0,0 +1,126 @@
+# Numeric lead scoring: weighted company size, role seniority and domain class
+
+import bisect
+from collections.abc import Hashable, Iterable, Sequence
+import numpy as np
+from app.models.lead import Lead
+from app.models.qualification_rules import LeadScoringConfig
+from app.services.domain_index import DomainIndex
+from app.services.role_normalizer import RoleNormalizer
+
+
+def factorize(values: Iterable[Hashable], count: int) -> tuple[np.ndarray, list]:
+    """Encode values as integer codes into their list of distinct values."""
+    index: dict = {}
+    codes = np.fromiter(
+        (index.setdefault(value, len(index)) for value in values), np.intp, count
+    )
+    return codes, list(index)
+
+
+class CompiledScoring:
+    """
+    Lead scoring weights compiled for per-lead and column-wise evaluation.
+
+    A score is the sum of three feature weights: the company size bucket, the
+    most senior role named by the title, and the email domain class (free
+    provider or business). `score` evaluates one lead with tuple and dict
+    lookups only. `score_many` turns a batch into feature columns: titles and
+    email domains are factorized so each distinct value is weighted once, and
+    the gathering, bucketing and summing happen in NumPy.
+    """
+
+    __slots__ = (
+        "size_edges",
+        "size_weights",
+        "role_weights",
+        "default_role_weight",
+        "free_domain_weight",
+        "business_domain_weight",
+        "_role_normalizer",
+        "_forbidden_domains",
+        "_role_set_weights",
+        "_size_edges_array",
+        "_size_weights_array",
+    )
+
+    def __init__(
+        self,
+        config: LeadScoringConfig,
+        role_normalizer: RoleNormalizer,
+        forbidden_domains: DomainIndex,
+    ):
+        self.size_edges = tuple(config.company_size_edges)
+        self.size_weights = tuple(float(w) for w in config.company_size_weights)
+        self.role_weights = {
+            role.lower().strip(): float(weight)
+            for role, weight in config.role_weights.items()
+        }
+        self.default_role_weight = float(config.default_role_weight)
+        self.free_domain_weight = float(config.free_domain_weight)
+        self.business_domain_weight = float(config.business_domain_weight)
+        self._role_normalizer = role_normalizer
+        self._forbidden_domains = forbidden_domains
+        # Weight per normalized role set; the normalizer returns cached
+        # frozensets, so this stays as small as the set of distinct role combos
+        self._role_set_weights: dict[frozenset[str], float] = {}
+        self._size_edges_array = np.asarray(self.size_edges, dtype=np.int64)
+        self._size_weights_array = np.asarray(self.size_weights, dtype=np.float64)
+
+    def role_weight(self, title: str) -> float:
+        roles = self._role_normalizer.normalize(title)
+        weight = self._role_set_weights.get(roles)
+        if weight is None:
+            weight = max(
+                (
+                    self.role_weights.get(role, self.default_role_weight)
+                    for role in roles
+                ),
+                default=self.default_role_weight,
+            )
+            self._role_set_weights[roles] = weight
+        return weight
+
+    def domain_weight(self, domain: str) -> float:
+        if domain.lower() in self._forbidden_domains:
+            return self.free_domain_weight
+        return self.business_domain_weight
+
+    def score(self, lead: Lead, company_size: int | None = None) -> float:
+        """Score a single lead, optionally with a resolved company size."""
+        if company_size is None:
+            company_size = lead.company_size
+        return (
+            self.size_weights[bisect.bisect_right(self.size_edges, company_size)]
+            + self.role_weight(lead.role)
+            + self.domain_weight(lead.email.rpartition("@")[2])
+        )
+
+    def score_columns(
+        self,
+        company_sizes: np.ndarray,
+        role_weights: np.ndarray,
+        domain_weights: np.ndarray,
+    ) -> np.ndarray:
+        """Score whole feature columns at once."""
+        buckets = np.searchsorted(self._size_edges_array, company_sizes, side="right")
+        return self._size_weights_array[buckets] + role_weights + domain_weights
+
+    def score_many(
+        self, leads: Sequence[Lead], company_sizes: Sequence[int] | None = None
+    ) -> np.ndarray:
+        """Score a batch of leads, returning one float64 score per lead."""
+        count = len(leads)
+        if company_sizes is None:
+            company_sizes = [lead.company_size for lead in leads]
+        role_codes, titles = factorize((lead.role for lead in leads), count)
+        domain_codes, domains = factorize(
+            (lead.email.rpartition("@")[2] for lead in leads), count
+        )
+        role_weights = np.array([self.role_weight(title) for title in titles])
+        domain_weights = np.array([self.domain_weight(domain) for domain in domains])
+        return self.score_columns(
+            np.fromiter(company_sizes, np.int64, count),
+            role_weights[role_codes],
+            domain_weights[domain_codes],
+        )
@@ -0,0 +1,415 @@
+# Persistent, append-only lead store with group-commit fsync
+
+import asyncio
+import bisect
+import fcntl
+import json
+import logging
+import os
+import pathlib
+import queue
+import threading
+from collections.abc import Callable, Iterable, Iterator
+from concurrent.futures import Future
+from app.services.lead_qualification import LeadQualificationResult
+
+SEGMENT_PREFIX = "segment-"
+SEGMENT_SUFFIX = ".log"
+WRITER_LOCK = "writer-{}.lock"
+
+# Sentinel put on the write queue to stop the writer thread
+_STOP = object()
+
+
+class LeadStoreClosedError(Exception):
+    """Raised when writing to a lead store that has been closed"""
+
+    def __init__(self):
+        super().__init__("Lead store is closed")
+
+
+class LeadStoreWriterError(Exception):
+    """Raised when writing to a lead store whose writer thread has stopped"""
+
+    def __init__(self, cause: BaseException):
+        super().__init__(f"Lead store writer stopped: {cause!r}")
+
+
+class RecordLocation:
+    """Where a record lives: writer, segment number, byte offset and length."""
+
+    __slots__ = ("writer", "segment", "offset", "length")
+
+    def __init__(self, writer: int, segment: int, offset: int, length: int):
+        self.writer = writer
+        self.segment = segment
+        self.offset = offset
+        self.length = length
+
+
+class LeadStore:
+    """
+    Log-structured store of qualification results.
+
+    Records are JSON lines appended to numbered segment files. Appends from
+    any number of concurrent requests are queued to a single writer thread,
+    which writes everything queued so far and makes it durable with one fsync
+    (group commit), so requests never serialize behind individual fsyncs.
+    Records become visible to reads only once they are durable. An in-memory
+    index maps lead_id to the record location and email to lead_ids, and keeps
+    the lead_ids sorted so that time-ordered ids can be read as a range; it is
+    rebuilt from the segments when the store is opened.
+
+    Several processes, such as uvicorn workers, can open the same directory.
+    Each takes a writer slot, held with an exclusive flock for as long as the
+    store is open, and appends only to that slot's segments, so offsets never
+    collide. Records of other writers are indexed by `refresh()`, which reads
+    their segments from where it last stopped; reads refresh when they could
+    miss a record, and `add_listener` callbacks see every record indexed this
+    way. A slot freed by a process that exited is reused by the next one.
+    """
+
+    def __init__(
+        self,
+        directory: str | pathlib.Path,
+        segment_max_bytes: int = 64 * 1024 * 1024,
+        max_batch: int = 4096,
+    ):
+        self.directory = pathlib.Path(directory)
+        self.segment_max_bytes = segment_max_bytes
+        self.max_batch = max_batch
+        self.fsync_count = 0
+        self._by_id: dict[str, RecordLocation] = {}
+        self._by_email: dict[str, list[str]] = {}
+        # Every lead_id in ascending order; ids arrive nearly sorted
+        self._ordered_ids: list[str] = []
+        self._read_fds: dict[tuple[int, int], int] = {}
+        # Bytes indexed so far of each segment of another writer
+        self._positions: dict[tuple[int, int], int] = {}
+        self._listeners: list[Callable[[dict], None]] = []
+        # The writer thread indexes its records while readers refresh
+        self._index_lock = threading.Lock()
+        self._queue: queue.SimpleQueue = queue.SimpleQueue()
+        self._start_lock = threading.Lock()
+        self._writer: threading.Thread | None = None
+        self._submit_lock = threading.Lock()
+        # Set when the writer thread stopped on an unexpected error
+        self._failure: LeadStoreWriterError | None = None
+        self._closed = False
+
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.writer, self._lock_fd = self._claim_writer()
+        self._segment = self._load()
+        self._file = open(self._segment_path(self.writer, self._segment), "ab")
+        self._segment_size = self._file.tell()
+
+    def _claim_writer(self) -> tuple[int, int]:
+        """Lock the lowest writer slot no open store holds."""
+        writer = 0
+        while True:
+            path = self.directory / WRITER_LOCK.format(writer)
+            fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o644)
+            try:
+                fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                os.close(fd)
+                writer += 1
+                continue
+            return writer, fd
+
+    def _segment_path(self, writer: int, segment: int) -> pathlib.Path:
+        # Writer 0 keeps the single-writer file names
+        name = f"{segment:06d}" if writer == 0 else f"{writer}-{segment:06d}"
+        return self.directory / f"{SEGMENT_PREFIX}{name}{SEGMENT_SUFFIX}"
+
+    def _segments(self) -> list[tuple[int, int]]:
+        """Every (writer, segment) in the directory, in order."""
+        segments = []
+        for name in os.listdir(self.directory):
+            if name.startswith(SEGMENT_PREFIX) and name.endswith(SEGMENT_SUFFIX):
+                parts = name[len(SEGMENT_PREFIX) : -len(SEGMENT_SUFFIX)].split("-")
+                writer = int(parts[0]) if len(parts) == 2 else 0
+                segments.append((writer, int(parts[-1])))
+        return sorted(segments)
+
+    def _index(self, lead_id: str, email: str, location: RecordLocation) -> None:
+        self._by_id[lead_id] = location
+        self._by_email.setdefault(email.lower(), []).append(lead_id)
+        ordered = self._ordered_ids
+        if not ordered or lead_id > ordered[-1]:
+            ordered.append(lead_id)
+        else:
+            bisect.insort(ordered, lead_id)
+
+    def _scan(self, writer: int, segment: int, offset: int) -> int:
+        """Index the complete records of a segment from offset; return the end."""
+        path = self._segment_path(writer, segment)
+        with open(path, "rb") as f:
+            f.seek(offset)
+            for line in f:
+                if not line.endswith(b"\n"):
+                    if writer == self.writer:
+                        # Torn write from a crash: drop the partial record
+                        logging.warning("Truncating partial record in %s", path)
+                        os.truncate(path, offset)
+                    # Otherwise the other writer is still writing it
+                    break
+                record = json.loads(line)
+                location = RecordLocation(writer, segment, offset, len(line))
+                self._index(record["lead_id"], record["lead"]["email"], location)
+                if writer != self.writer:
+                    for listener in self._listeners:
+                        listener(record)
+                offset += len(line)
+        return offset
+
+    def _load(self) -> int:
+        """Rebuild the index from every segment and return the active segment."""
+        own = [1]
+        for writer, segment in self._segments():
+            offset = self._scan(writer, segment, 0)
+            if writer == self.writer:
+                own.append(segment)
+            else:
+                self._positions[writer, segment] = offset
+        return max(own)
+
+    def refresh(self) -> None:
+        """Index the records other writers appended since the last refresh."""
+        with self._index_lock:
+            for writer, segment in self._segments():
+                if writer == self.writer:
+                    continue
+                offset = self._positions.get((writer, segment), 0)
+                size = os.stat(self._segment_path(writer, segment)).st_size
+                if size > offset:
+                    self._positions[writer, segment] = self._scan(
+                        writer, segment, offset
+                    )
+
+    def raw_records(self) -> Iterator[bytes]:
+        """
+        Yield the JSON line of every record of this writer, and of those of
+        other writers indexed so far, in file order.
+
+        Segments are read sequentially rather than record by record, and
+        nothing is parsed, for callers that rebuild state from every record.
+        """
+        with self._index_lock:
+            ends = dict(self._positions)
+        for writer, segment in self._segments():
+            # Other writers' segments only up to where they were indexed
+            end = ends.get((writer, segment), 0 if writer != self.writer else None)
+            offset = 0
+            with open(self._segment_path(writer, segment), "rb") as f:
+                for line in f:
+                    if not line.endswith(b"\n") or (end is not None and offset >= end):
+                        break
+                    offset += len(line)
+                    yield line
+
+    def add_listener(self, listener: Callable[[dict], None]) -> None:
+        """Call listener with each raw record indexed from another writer."""
+        self._listeners.append(listener)
+
+    def _start_writer(self) -> None:
+        with self._start_lock:
+            if self._writer is not None:
+                return
+            self._writer = threading.Thread(
+                target=self._write_loop, name="lead-store-writer", daemon=True
+            )
+            self._writer.start()
+
+    def _write_loop(self) -> None:
+        batch = []
+        try:
+            stopping = False
+            while not stopping:
+                item = self._queue.get()
+                if item is _STOP:
+                    return
+                batch = [item]
+                while len(batch) < self.max_batch:
+                    try:
+                        item = self._queue.get_nowait()
+                    except queue.Empty:
+                        break
+                    if item is _STOP:
+                        stopping = True
+                        break
+                    batch.append(item)
+                self._commit(batch)
+        except BaseException as exc:
+            logging.exception("Lead store writer stopped")
+            self._stop_writes(batch, exc)
+
+    def _stop_writes(
+        self,
+        batch: list[tuple[list[LeadQualificationResult], Future]],
+        cause: BaseException,
+    ) -> None:
+        """Fail the appends in flight or queued, and every later one."""
+        error = LeadStoreWriterError(cause)
+        with self._submit_lock:
+            self._failure = error
+        pending = list(batch)
+        while True:
+            try:
+                item = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is not _STOP:
+                pending.append(item)
+        for _, future in pending:
+            if not future.done():
+                future.set_exception(error)
+
+    def _rotate(self) -> None:
+        self._file.close()
+        self._segment += 1
+        self._file = open(self._segment_path(self.writer, self._segment), "ab")
+        self._segment_size = 0
+
+    def _commit(
+        self, batch: list[tuple[list[LeadQualificationResult], Future]]
+    ) -> None:
+        """Write a group of appends, fsync once, then index and acknowledge them."""
+        # Serialized before anything is written, so an append that cannot be
+        # fails alone and leaves no record behind
+        appends = []
+        for results, future in batch:
+            try:
+                lines = [
+                    result.model_dump_json().encode() + b"\n" for result in results
+                ]
+            except Exception as exc:
+                logging.error("Lead store serialization failed: %s", exc)
+                future.set_exception(exc)
+                continue
+            appends.append((results, lines, future))
+        try:
+            written = []
+            for results, lines, _ in appends:
+                for result, line in zip(results, lines):
+                    if self._segment_size and (
+                        self._segment_size + len(line) > self.segment_max_bytes
+                    ):
+                        self._file.flush()
+                        os.fsync(self._file.fileno())
+                        self._rotate()
+                    self._file.write(line)
+                    location = RecordLocation(
+                        self.writer, self._segment, self._segment_size, len(line)
+                    )
+                    written.append((result, location))
+                    self._segment_size += len(line)
+            self._file.flush()
+            os.fsync(self._file.fileno())
+            self.fsync_count += 1
+        except Exception as exc:
+            logging.error("Lead store write failed: %s", exc)
+            for _, _, future in appends:
+                future.set_exception(exc)
+            return
+
+        with self._index_lock:
+            for result, location in written:
+                self._index(str(result.lead_id), result.lead.email, location)
+        for _, _, future in appends:
+            future.set_result(None)
+
+    def submit(self, results: list[LeadQualificationResult]) -> Future:
+        """Queue results for the next group commit; the future resolves once durable."""
+        if self._closed:
+            raise LeadStoreClosedError()
+        if self._writer is None:
+            self._start_writer()
+        future: Future = Future()
+        # A writer that stopped fails what is queued under this lock
+        with self._submit_lock:
+            if self._failure is not None:
+                raise self._failure
+            self._queue.put((results, future))
+        return future
+
+    async def append(self, result: LeadQualificationResult) -> None:
+        """Durably store a single result."""
+        await asyncio.wrap_future(self.submit([result]))
+
+    async def append_many(self, results: Iterable[LeadQualificationResult]) -> None:
+        """Durably store many results as part of one group commit."""
+        results = list(results)
+        if results:
+            await asyncio.wrap_future(self.submit(results))
+
+    def _read(self, location: RecordLocation) -> bytes:
+        key = (location.writer, location.segment)
+        fd = self._read_fds.get(key)
+        if fd is None:
+            fd = os.open(self._segment_path(*key), os.O_RDONLY)
+            # Exports read from a worker thread while requests read here
+            opened, fd = fd, self._read_fds.setdefault(key, fd)
+            if opened != fd:
+                os.close(opened)
+        return os.pread(fd, location.length, location.offset)
+
+    def get(self, lead_id: str) -> LeadQualificationResult | None:
+        """Return a stored result by lead_id, or None if unknown."""
+        location = self._by_id.get(lead_id)
+        if location is None:
+            self.refresh()
+            location = self._by_id.get(lead_id)
+        if location is None:
+            return None
+        return LeadQualificationResult.model_validate_json(self._read(location))
+
+    def find_by_email(self, email: str) -> list[LeadQualificationResult]:
+        """Return every stored result for an email, oldest first."""
+        self.refresh()
+        lead_ids = self._by_email.get(email.lower(), [])
+        return [self.get(lead_id) for lead_id in lead_ids]
+
+    def scan(self) -> Iterator[LeadQualificationResult]:
+        """Yield every durable result in append order."""
+        self.refresh()
+        for location in list(self._by_id.values()):
+            yield LeadQualificationResult.model_validate_json(self._read(location))
+
+    def records(
+        self, start: str | None = None, chunk_size: int = 1000
+    ) -> Iterator[tuple[str, bytes]]:
+        """
+        Yield (lead_id, raw JSON record) pairs in lead_id order.
+
+        Starts at the first lead_id >= start, which for time-ordered ids is a
+        range scan from a point in time. The ids are read chunk_size at a time
+        and the position is found again from the last one, so records stored
+        meanwhile are picked up and memory use does not depend on store size.
+        """
+        self.refresh()
+        ordered = self._ordered_ids
+        position = bisect.bisect_left(ordered, start) if start else 0
+        while chunk := ordered[position : position + chunk_size]:
+            for lead_id in chunk:
+                yield lead_id, self._read(self._by_id[lead_id])
+            position = bisect.bisect_right(ordered, chunk[-1])
+
+    def __len__(self) -> int:
+        self.refresh()
+        return len(self._by_id)
+
+    def close(self) -> None:
+        """Flush pending appends, stop the writer and release file handles."""
+        if self._closed:
+            return
+        self._closed = True
+        if self._writer is not None:
+            self._queue.put(_STOP)
+            self._writer.join()
+        self._file.close()
+        for fd in self._read_fds.values():
+            os.close(fd)
+        self._read_fds.clear()
+        # Releases the writer slot
+        os.close(self._lock_fd)
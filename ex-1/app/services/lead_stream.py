@@ -0,0 +1,167 @@
+# Streaming bulk qualification: read, qualify and write leads chunk by chunk
+
+import csv
+import io
+import itertools
+import json
+import pathlib
+from collections.abc import Iterable, Iterator
+from typing import Any, TextIO
+from pydantic import ValidationError
+from app.models.lead import Lead
+from app.services.lead_batch import LEAD_ADAPTER
+from app.services.qualification_rules import CompiledRules, compile_rules
+
+FORMATS = ("csv", "ndjson")
+RESULT_FIELDS = [
+    "status",
+    "qualification_notes",
+    "score",
+    "company_size_source",
+    "errors",
+]
+LEAD_FIELDS = list(Lead.model_fields)
+
+# Rules compiled once per worker process by init_worker
+_worker_rules: CompiledRules | None = None
+
+
+class ChunkSummary:
+    """Serialized output of a chunk plus its counters."""
+
+    __slots__ = ("text", "rows", "qualified", "invalid")
+
+    def __init__(self, text: str, rows: int, qualified: int, invalid: int):
+        self.text = text
+        self.rows = rows
+        self.qualified = qualified
+        self.invalid = invalid
+
+
+def detect_format(path: str, fmt: str | None) -> str:
+    if fmt:
+        return fmt
+    return "ndjson" if pathlib.Path(path).suffix in (".ndjson", ".jsonl") else "csv"
+
+
+def open_rows(
+    stream: TextIO, fmt: str
+) -> tuple[list[str] | None, Iterator[dict[str, Any] | str]]:
+    """
+    Return the input header (CSV only) and a lazy iterator over the rows.
+
+    CSV rows are yielded as dicts and NDJSON rows as raw lines, so JSON parsing
+    happens in the workers rather than in the reading process.
+    """
+    if fmt == "csv":
+        reader = csv.DictReader(stream)
+        return list(reader.fieldnames or []), reader
+    return None, (line for line in stream if line.strip())
+
+
+def csv_header(fields: list[str]) -> str:
+    buffer = io.StringIO()
+    csv.writer(buffer).writerow(fields)
+    return buffer.getvalue()
+
+
+def iter_chunks(rows: Iterable[Any], size: int) -> Iterator[list[Any]]:
+    iterator = iter(rows)
+    while chunk := list(itertools.islice(iterator, size)):
+        yield chunk
+
+
+def output_fields(input_fields: list[str] | None) -> list[str]:
+    base = input_fields or LEAD_FIELDS
+    return base + [field for field in RESULT_FIELDS if field not in base]
+
+
+def _format_errors(error: ValidationError) -> list[str]:
+    return [
+        f"{'.'.join(str(part) for part in item['loc']) or 'row'}: {item['msg']}"
+        for item in error.errors(include_url=False, include_context=False)
+    ]
+
+
+def _qualify_row(
+    row: dict[str, Any] | str, rules: CompiledRules
+) -> tuple[dict[str, Any], Lead | None, int]:
+    """
+    Return the output record of a row, its lead and the company size used.
+
+    The lead is None (and the size 0) when the row is invalid.
+    """
+    try:
+        record = json.loads(row) if isinstance(row, str) else row
+        if not isinstance(record, dict):
+            raise ValueError("row is not a JSON object")
+        lead = LEAD_ADAPTER.validate_python(record)
+    except ValidationError as exc:
+        return {**record, "status": None, "errors": _format_errors(exc)}, None, 0
+    except ValueError as exc:
+        return {"status": None, "errors": [f"row: {exc}"]}, None, 0
+
+    company_size, size_source = rules.company_size(lead)
+    is_qualified, notes = rules.evaluate(lead, company_size)
+    status = "Qualified" if is_qualified else "Unqualified"
+    record = {
+        **record,
+        "status": status,
+        "qualification_notes": notes,
+        "company_size_source": size_source,
+    }
+    return record, lead, company_size
+
+
+def _write_csv(records: list[dict[str, Any]], fields: list[str]) -> str:
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=fields, extrasaction="ignore")
+    for record in records:
+        record["qualification_notes"] = "; ".join(
+            record.get("qualification_notes") or []
+        )
+        record["errors"] = "; ".join(record.get("errors") or [])
+        writer.writerow(record)
+    return buffer.getvalue()
+
+
+def _write_ndjson(records: list[dict[str, Any]]) -> str:
+    return "".join(json.dumps(record, default=str) + "\n" for record in records)
+
+
+def qualify_chunk(
+    rows: list[dict[str, Any] | str],
+    output_format: str,
+    fields: list[str],
+    rules: CompiledRules | None = None,
+) -> ChunkSummary:
+    """Validate, qualify and serialize a chunk of rows."""
+    rules = rules or _worker_rules
+    records = []
+    valid_records, leads, sizes = [], [], []
+    qualified = 0
+    for row in rows:
+        record, lead, company_size = _qualify_row(row, rules)
+        records.append(record)
+        if lead is not None:
+            valid_records.append(record)
+            leads.append(lead)
+            sizes.append(company_size)
+            qualified += record["status"] == "Qualified"
+    if rules.scoring and leads:
+        for record, score in zip(
+            valid_records, rules.scoring.score_many(leads, sizes).tolist()
+        ):
+            record["score"] = score
+
+    if output_format == "csv":
+        text = _write_csv(records, fields)
+    else:
+        text = _write_ndjson(records)
+    return ChunkSummary(text, len(rows), qualified, len(rows) - len(leads))
+
+
+def init_worker(rules_path: str) -> None:
+    """Process pool initializer: compile the rules once per worker."""
+    global _worker_rules
+    _worker_rules = compile_rules(pathlib.Path(rules_path))
@@ -0,0 +1,358 @@
+# Prometheus metrics in per-worker memory-mapped files, aggregated on scrape
+
+import array
+import bisect
+import mmap
+import os
+import pathlib
+import time
+from collections.abc import Iterable, Sequence
+from typing import TYPE_CHECKING
+from starlette.requests import Request
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from app.services.qualification_rules import COMPANY_SIZE_NOTE, EMAIL_NOTE, ROLE_NOTE
+
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "true").lower() == "true"
+# Directory shared by all workers; unset keeps metrics in this process only
+METRICS_DIR = os.getenv("METRICS_DIR", "")
+
+FILE_PREFIX = "metrics-"
+FILE_SUFFIX = ".db"
+SLOT_SIZE = 8
+
+LATENCY_BUCKETS = (
+    0.0001,
+    0.00025,
+    0.0005,
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+)
+
+PHASES = ("request", "validation", "qualification", "serialization")
+RULE_NOTES = {
+    "company_size": COMPANY_SIZE_NOTE,
+    "role": ROLE_NOTE,
+    "email_domain": EMAIL_NOTE,
+}
+STATUSES = ("Qualified", "Unqualified")
+
+if TYPE_CHECKING:
+    from app.services.lead_qualification import LeadQualificationResult
+
+# Key of the phase timestamps in the ASGI scope of an instrumented request
+TIMING_SCOPE_KEY = "lead_metrics_timing"
+
+
+def _labels(names: Sequence[str], values: Sequence[str], **extra: str) -> str:
+    pairs = [*zip(names, values), *extra.items()]
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{name}="{value}"' for name, value in pairs) + "}"
+
+
+class Counter:
+    """A counter family with a fixed set of label values, one slot each."""
+
+    kind = "counter"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        label_names: Sequence[str],
+        label_values: Sequence[Sequence[str]],
+        offset: int,
+    ):
+        self.name = name
+        self.documentation = documentation
+        self.label_names = tuple(label_names)
+        self.children = [tuple(values) for values in label_values]
+        self.offset = offset
+        self.size = len(self.children)
+
+    def slot(self, *label_values: str) -> int:
+        return self.offset + self.children.index(label_values)
+
+    def render(self, values: Sequence[float]) -> list[str]:
+        return [
+            f"{self.name}{_labels(self.label_names, labels)} {values[self.offset + i]}"
+            for i, labels in enumerate(self.children)
+        ]
+
+
+class Histogram:
+    """
+    A fixed-bucket histogram family.
+
+    Each child has one slot per bucket plus +Inf, holding non-cumulative counts,
+    and one slot for the sum; cumulative counts and _count are derived on render.
+    """
+
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        buckets: Sequence[float],
+        label_names: Sequence[str],
+        label_values: Sequence[Sequence[str]],
+        offset: int,
+    ):
+        self.name = name
+        self.documentation = documentation
+        self.buckets = tuple(buckets)
+        self.label_names = tuple(label_names)
+        self.children = [tuple(values) for values in label_values]
+        self.offset = offset
+        self.stride = len(self.buckets) + 2
+        self.size = self.stride * len(self.children)
+
+    def slot(self, *label_values: str) -> int:
+        return self.offset + self.children.index(label_values) * self.stride
+
+    def render(self, values: Sequence[float]) -> list[str]:
+        lines = []
+        for i, labels in enumerate(self.children):
+            base = self.offset + i * self.stride
+            cumulative = 0.0
+            for j, bound in enumerate((*self.buckets, "+Inf")):
+                cumulative += values[base + j]
+                le = _labels(self.label_names, labels, le=str(bound))
+                lines.append(f"{self.name}_bucket{le} {cumulative}")
+            label_text = _labels(self.label_names, labels)
+            lines.append(
+                f"{self.name}_sum{label_text} {values[base + self.stride - 1]}"
+            )
+            lines.append(f"{self.name}_count{label_text} {cumulative}")
+        return lines
+
+
+class MetricsRegistry:
+    """
+    Metric values stored as float64 slots in one memory-mapped file per worker.
+
+    The layout is fixed when metrics are declared, so every worker's file has
+    the same shape. A worker only ever writes its own file, so updates need no
+    locks and cost a slot read-modify-write; a scrape sums the slots of every
+    worker file in the directory, including workers that have since exited, so
+    counters stay monotonic across worker restarts. Without a directory the
+    slots live in anonymous memory and only this process is reported.
+    """
+
+    def __init__(self):
+        self.metrics: list[Counter | Histogram] = []
+        self.size = 0
+        self.directory: pathlib.Path | None = None
+        self.path: pathlib.Path | None = None
+        self.values: memoryview | None = None
+        self._mmap: mmap.mmap | None = None
+
+    def counter(
+        self,
+        name: str,
+        documentation: str,
+        label_names: Sequence[str] = (),
+        label_values: Sequence[Sequence[str]] = ((),),
+    ) -> Counter:
+        metric = Counter(name, documentation, label_names, label_values, self.size)
+        return self._register(metric)
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        buckets: Sequence[float],
+        label_names: Sequence[str] = (),
+        label_values: Sequence[Sequence[str]] = ((),),
+    ) -> Histogram:
+        metric = Histogram(
+            name, documentation, buckets, label_names, label_values, self.size
+        )
+        return self._register(metric)
+
+    def _register(self, metric):
+        if self.values is not None:
+            raise RuntimeError("Metrics must be declared before the registry opens")
+        self.metrics.append(metric)
+        self.size += metric.size
+        return metric
+
+    def open(self, directory: str | None = None, worker_id: str | None = None) -> None:
+        """Map this worker's slots, continuing from its file if it exists."""
+        length = self.size * SLOT_SIZE
+        if directory:
+            worker_id = worker_id or str(os.getpid())
+            self.directory = pathlib.Path(directory)
+            self.directory.mkdir(parents=True, exist_ok=True)
+            self.path = self.directory / f"{FILE_PREFIX}{worker_id}{FILE_SUFFIX}"
+            fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+            try:
+                if os.fstat(fd).st_size != length:
+                    os.ftruncate(fd, 0)
+                    os.ftruncate(fd, length)
+                self._mmap = mmap.mmap(fd, length)
+            finally:
+                os.close(fd)
+        else:
+            self._mmap = mmap.mmap(-1, length)
+        self.values = memoryview(self._mmap).cast("d")
+
+    def inc(self, slot: int, amount: float = 1.0) -> None:
+        self.values[slot] += amount
+
+    def observe(self, histogram: Histogram, slot: int, seconds: float) -> None:
+        values = self.values
+        values[slot + bisect.bisect_left(histogram.buckets, seconds)] += 1
+        values[slot + histogram.stride - 1] += seconds
+
+    def collect(self) -> array.array:
+        """Sum the slots of every worker file (or this process's slots)."""
+        if self.directory is None:
+            return array.array("d", self.values)
+        totals = array.array("d", bytes(self.size * SLOT_SIZE))
+        for path in self.directory.glob(f"{FILE_PREFIX}*{FILE_SUFFIX}"):
+            data = path.read_bytes()
+            if len(data) != self.size * SLOT_SIZE:
+                # Written by a different metrics layout
+                continue
+            for i, value in enumerate(array.array("d", data)):
+                totals[i] += value
+        return totals
+
+    def render(self) -> str:
+        """Prometheus text exposition format (version 0.0.4)."""
+        values = self.collect()
+        lines = []
+        for metric in self.metrics:
+            lines.append(f"# HELP {metric.name} {metric.documentation}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            lines.extend(metric.render(values))
+        return "\n".join(lines) + "\n"
+
+
+registry = MetricsRegistry()
+
+PHASE_SECONDS = registry.histogram(
+    "lead_request_phase_seconds",
+    "Time spent in each phase of lead creation requests.",
+    LATENCY_BUCKETS,
+    ("phase",),
+    [(phase,) for phase in PHASES],
+)
+RULE_RESULTS = registry.counter(
+    "lead_qualification_rule_total",
+    "Qualification rule evaluations by rule and outcome.",
+    ("rule", "outcome"),
+    [(rule, outcome) for rule in RULE_NOTES for outcome in ("pass", "fail")],
+)
+STATUS_RESULTS = registry.counter(
+    "lead_qualification_status_total",
+    "Qualified and unqualified leads.",
+    ("status",),
+    [(status,) for status in STATUSES],
+)
+DISPATCH_DROPPED = registry.counter(
+    "lead_dispatch_dropped_total",
+    "Qualified leads a sink still refused after every retry.",
+)
+
+registry.open(METRICS_DIR or None)
+
+_PHASE_SLOTS = {phase: PHASE_SECONDS.slot(phase) for phase in PHASES}
+_RULE_SLOTS = tuple(
+    (note, RULE_RESULTS.slot(rule, "pass"), RULE_RESULTS.slot(rule, "fail"))
+    for rule, note in RULE_NOTES.items()
+)
+_STATUS_SLOTS = {status: STATUS_RESULTS.slot(status) for status in STATUSES}
+
+
+def observe_phase(phase: str, seconds: float) -> None:
+    registry.observe(PHASE_SECONDS, _PHASE_SLOTS[phase], seconds)
+
+
+def record_qualification(
+    status: str, qualification_notes: list[str] | None, seconds: float | None = None
+) -> None:
+    """Count the outcome of every rule for one lead, and its qualification time."""
+    if not METRICS_ENABLED:
+        return
+    values = registry.values
+    for note, pass_slot, fail_slot in _RULE_SLOTS:
+        if qualification_notes and note in qualification_notes:
+            values[fail_slot] += 1
+        else:
+            values[pass_slot] += 1
+    values[_STATUS_SLOTS[status]] += 1
+    if seconds is not None:
+        observe_phase("qualification", seconds)
+
+
+def record_results(results: Iterable["LeadQualificationResult"]) -> None:
+    for result in results:
+        record_qualification(result.status, result.qualification_notes)
+
+
+def record_dispatch_drops(count: int) -> None:
+    if METRICS_ENABLED:
+        registry.inc(DISPATCH_DROPPED.slot(), count)
+
+
+def handler_started(request: Request) -> None:
+    """Mark the end of body parsing and validation of an instrumented request."""
+    timing = request.scope.get(TIMING_SCOPE_KEY)
+    if timing is not None:
+        timing[1] = time.perf_counter()
+
+
+def handler_finished(request: Request) -> None:
+    """Mark the start of response serialization of an instrumented request."""
+    timing = request.scope.get(TIMING_SCOPE_KEY)
+    if timing is not None:
+        timing[2] = time.perf_counter()
+
+
+class PhaseTimer:
+    """
+    ASGI middleware timing the request, validation and serialization phases.
+
+    Handlers that call handler_started/handler_finished split the request into
+    validation (body read, parsing, validation and dependencies, up to the
+    handler), the handler itself, and serialization (from the handler's return
+    to the response start). Other requests only record the request phase.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        # request start, handler start, handler end, response start
+        timing = [time.perf_counter(), 0.0, 0.0, 0.0]
+        scope[TIMING_SCOPE_KEY] = timing
+
+        async def send_timed(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                timing[3] = time.perf_counter()
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_timed)
+        finally:
+            started, handler_start, handler_end, response_start = timing
+            observe_phase("request", time.perf_counter() - started)
+            if handler_start:
+                observe_phase("validation", handler_start - started)
+            if handler_end and response_start:
+                observe_phase("serialization", response_start - handler_end)
@@ -0,0 +1,304 @@
+# Rule engine for lead qualification: rules are compiled once and hot-swapped
+
+import collections
+import json
+import logging
+import os
+import pathlib
+import threading
+import time
+from pydantic import ValidationError
+from app.models.lead import Lead
+from app.models.qualification_rules import QualificationRulesConfig
+from app.services.company_size_index import CompanySizeIndex
+from app.services.domain_index import DomainIndex
+from app.services.lead_scoring import CompiledScoring
+from app.services.role_normalizer import RoleNormalizer
+
+BASE_DIR = pathlib.Path(__file__).parent.parent
+DEFAULT_RULES_PATH = BASE_DIR / "data" / "qualification_rules.json"
+
+COMPANY_SIZE_NOTE = "Company size is too small"
+# Where the company size a lead was qualified with came from
+SIZE_FROM_FORM = "form"
+SIZE_FROM_INDEX = "index"
+
+RULES_FILE_SUFFIXES = (".json", ".yaml", ".yml")
+ROLE_NOTE = "Role is not a decision-maker"
+EMAIL_NOTE = "Email domain is forbidden"
+
+
+class RulesFileError(Exception):
+    """Raised when a rules file cannot be read, parsed or validated"""
+
+    def __init__(self, path: pathlib.Path, reason: str):
+        self.path = path
+        super().__init__(f"Invalid rules file {path}: {reason}")
+
+
+class UnknownTenantError(Exception):
+    """Raised when a tenant has no rules file"""
+
+    def __init__(self, tenant: str):
+        self.tenant = tenant
+        super().__init__(f"Unknown tenant: {tenant}")
+
+
+class CompiledRules:
+    """Qualification rules compiled into frozenset lookups, evaluated in one pass."""
+
+    __slots__ = (
+        "min_company_size",
+        "company_sizes",
+        "decision_maker_roles",
+        "forbidden_domains",
+        "role_normalizer",
+        "scoring",
+        "sources",
+    )
+
+    def __init__(
+        self,
+        config: QualificationRulesConfig,
+        base_dir: pathlib.Path = BASE_DIR / "data",
+    ):
+        domain_lists = tuple(base_dir / name for name in config.forbidden_domain_lists)
+        self.min_company_size = config.min_company_size
+        self.decision_maker_roles = frozenset(
+            role.lower().strip() for role in config.decision_maker_roles
+        )
+        self.forbidden_domains = DomainIndex.from_files(
+            domain_lists, extra=config.forbidden_domains
+        )
+        if config.role_synonyms_file:
+            self.role_normalizer = RoleNormalizer.from_file(
+                base_dir / config.role_synonyms_file,
+                extra_roles=config.decision_maker_roles,
+            )
+        else:
+            self.role_normalizer = RoleNormalizer(
+                {role: [] for role in config.decision_maker_roles}
+            )
+        if config.company_size_index:
+            self.company_sizes = CompanySizeIndex(base_dir / config.company_size_index)
+        else:
+            self.company_sizes = None
+        self.scoring = (
+            CompiledScoring(
+                config.scoring, self.role_normalizer, self.forbidden_domains
+            )
+            if config.scoring
+            else None
+        )
+        # Files the rules were compiled from, watched for hot-swapping
+        self.sources = rule_sources(config, base_dir)
+
+    def company_size(self, lead: Lead) -> tuple[int, str]:
+        """The company size to qualify a lead with, and where it came from."""
+        if self.company_sizes is not None:
+            headcount = self.company_sizes.get(lead.email.rpartition("@")[2])
+            if headcount is not None:
+                return headcount, SIZE_FROM_INDEX
+        return lead.company_size, SIZE_FROM_FORM
+
+    def evaluate(
+        self, lead: Lead, company_size: int | None = None
+    ) -> tuple[bool, list[str]]:
+        """
+        Return the verdict and the notes of every failed rule.
+
+        Callers that already resolved the lead's company size pass it in.
+        """
+        if company_size is None:
+            company_size = self.company_size(lead)[0]
+        notes = []
+        if company_size <= self.min_company_size:
+            notes.append(COMPANY_SIZE_NOTE)
+        if self.decision_maker_roles.isdisjoint(
+            self.role_normalizer.normalize(lead.role)
+        ):
+            notes.append(ROLE_NOTE)
+        if lead.email.rpartition("@")[2].lower() in self.forbidden_domains:
+            notes.append(EMAIL_NOTE)
+        return not notes, notes
+
+
+def rule_sources(
+    config: QualificationRulesConfig, base_dir: pathlib.Path
+) -> tuple[pathlib.Path, ...]:
+    """The files besides the rules file that rules compiled from config read."""
+    sources = tuple(base_dir / name for name in config.forbidden_domain_lists)
+    if config.role_synonyms_file:
+        sources += (base_dir / config.role_synonyms_file,)
+    if config.company_size_index:
+        sources += (base_dir / config.company_size_index,)
+    return sources
+
+
+def load_rules_config(path: pathlib.Path) -> QualificationRulesConfig:
+    """Read a JSON or YAML rules file into a validated config."""
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            if path.suffix in (".yaml", ".yml"):
+                import yaml
+
+                raw = yaml.safe_load(f)
+            else:
+                raw = json.load(f)
+        return QualificationRulesConfig.model_validate(raw)
+    except (OSError, ValueError, ValidationError) as exc:
+        raise RulesFileError(path, str(exc)) from exc
+
+
+def compile_rules(path: pathlib.Path) -> CompiledRules:
+    config = load_rules_config(path)
+    try:
+        return CompiledRules(config, base_dir=path.parent)
+    except (OSError, ValueError) as exc:
+        raise RulesFileError(path, str(exc)) from exc
+
+
+class RuleEngine:
+    """
+    Holds the compiled rules of a rules file and hot-swaps them when it changes.
+
+    The rules file and the domain lists it references are stat'ed at most once
+    per reload_interval seconds. Changed rules are compiled off to the side and
+    swapped in with a single reference assignment, so concurrent evaluations
+    always see a complete rule set. Rules that fail to compile are logged and
+    the previous rules stay active.
+    """
+
+    def __init__(self, path: pathlib.Path, reload_interval: float = 1.0):
+        self.path = pathlib.Path(path)
+        self.reload_interval = reload_interval
+        self._rules, self._signature = self._compile()
+        self._next_check = time.monotonic() + reload_interval
+
+    def _file_signature(
+        self, paths: tuple[pathlib.Path, ...]
+    ) -> tuple[tuple[int, int], ...] | None:
+        signature = []
+        for path in paths:
+            try:
+                stat = os.stat(path)
+            except OSError:
+                return None
+            signature.append((stat.st_mtime_ns, stat.st_size))
+        return tuple(signature)
+
+    def _compile(self) -> tuple[CompiledRules, tuple[tuple[int, int], ...] | None]:
+        """
+        Compile the rules, along with the signature of the files they read.
+
+        Each file is stat'ed before it is read, so a file edited while the
+        rules compile no longer matches the signature at the next check.
+        """
+        signature = self._file_signature((self.path,))
+        config = load_rules_config(self.path)
+        sources = self._file_signature(rule_sources(config, self.path.parent))
+        rules = compile_rules(self.path)
+        if signature is None or sources is None:
+            return rules, None
+        return rules, signature + sources
+
+    def current(self) -> CompiledRules:
+        """Return the active rules, reloading them first if the file changed."""
+        now = time.monotonic()
+        if now >= self._next_check:
+            self._next_check = now + self.reload_interval
+            self.reload()
+        return self._rules
+
+    def reload(self, force: bool = False) -> bool:
+        """
+        Recompile the rules file if it changed.
+
+        Returns:
+            True if the rules were swapped
+        """
+        signature = self._file_signature((self.path, *self._rules.sources))
+        if signature is None or (signature == self._signature and not force):
+            return False
+        try:
+            rules, signature = self._compile()
+        except RulesFileError as exc:
+            logging.error("Keeping previous qualification rules: %s", exc)
+            return False
+        self._rules, self._signature = rules, signature
+        logging.info("Reloaded qualification rules from %s", self.path)
+        return True
+
+
+class TenantRules:
+    """
+    Rule engines of the tenants whose rules files live in one directory.
+
+    A tenant's rules file is `<tenant>.json` (or .yaml/.yml). Its RuleEngine
+    is created, compiling the rules, on the tenant's first request and then
+    kept in an LRU of at most `max_tenants` engines, so a lookup is one dict
+    probe however many tenants exist. Each engine hot-swaps its rules when
+    its files change, like the default engine. Concurrent first requests for
+    a tenant wait for a single compilation.
+    """
+
+    def __init__(
+        self,
+        directory: str | pathlib.Path,
+        max_tenants: int = 64,
+        reload_interval: float = 1.0,
+    ):
+        self.directory = pathlib.Path(directory)
+        self.max_tenants = max_tenants
+        self.reload_interval = reload_interval
+        self._engines: collections.OrderedDict[str, RuleEngine] = (
+            collections.OrderedDict()
+        )
+        self._lock = threading.Lock()
+        self._loading: dict[str, threading.Lock] = {}
+
+    def rules_path(self, tenant: str) -> pathlib.Path:
+        for suffix in RULES_FILE_SUFFIXES:
+            path = self.directory / f"{tenant}{suffix}"
+            if path.is_file():
+                return path
+        raise UnknownTenantError(tenant)
+
+    def engine(self, tenant: str) -> RuleEngine:
+        """Return the tenant's rule engine, compiling its rules on first use."""
+        with self._lock:
+            engine = self._engines.get(tenant)
+            if engine is not None:
+                self._engines.move_to_end(tenant)
+                return engine
+            loading = self._loading.setdefault(tenant, threading.Lock())
+        with loading:
+            with self._lock:
+                engine = self._engines.get(tenant)
+            if engine is not None:
+                return engine
+            try:
+                engine = RuleEngine(self.rules_path(tenant), self.reload_interval)
+            except Exception:
+                with self._lock:
+                    self._loading.pop(tenant, None)
+                raise
+            with self._lock:
+                self._engines[tenant] = engine
+                self._loading.pop(tenant, None)
+                while len(self._engines) > self.max_tenants:
+                    self._engines.popitem(last=False)
+        return engine
+
+    def current(self, tenant: str) -> CompiledRules:
+        """Return the tenant's active rules."""
+        return self.engine(tenant).current()
+
+    def __len__(self) -> int:
+        return len(self._engines)
+
+
+rule_engine = RuleEngine(
+    pathlib.Path(os.getenv("QUALIFICATION_RULES_PATH", DEFAULT_RULES_PATH)),
+    reload_interval=float(os.getenv("QUALIFICATION_RULES_RELOAD_INTERVAL", "1.0")),
+)
@@ -0,0 +1,174 @@
+# Token-bucket rate limiting in a compact, fixed-size table shareable by workers
+
+import fcntl
+import hashlib
+import math
+import mmap
+import os
+import time
+from collections.abc import Callable
+from starlette.requests import Request
+
+# Slots a key may occupy, starting from the one its hash points at
+SLOT_PROBES = 4
+# Fingerprint (uint64), token level (float64) and last update time (float64)
+SLOT_SIZE = 24
+# What a request's bucket is keyed by
+RATE_LIMIT_KEYS = ("api_key", "ip", "email_domain")
+API_KEY_HEADER = "X-API-Key"
+
+
+def fingerprint(key: str) -> int:
+    """Nonzero 64-bit hash of a key, identical in every process."""
+    digest = hashlib.blake2b(key.encode(), digest_size=8).digest()
+    return int.from_bytes(digest, "little") or 1
+
+
+class RateLimitTable:
+    """
+    Token buckets for any number of keys in a fixed number of slots.
+
+    Each key refills at `rate` tokens per second up to `burst`. A key hashes
+    to a fingerprint and a run of SLOT_PROBES slots, and its bucket lives in
+    the slot of that run holding its fingerprint. A bucket that has refilled
+    completely is the same as a new one, so its slot is free for reuse with
+    no expiry pass; when every slot of the run holds another key's partial
+    bucket, the fullest one is taken over, which at worst lets that key
+    start over with a full bucket. Memory stays at SLOT_SIZE bytes per slot
+    however many keys are seen.
+
+    With a path the table is a memory-mapped file, so every worker opening it
+    shares the buckets, and a check holds an fcntl lock on its run of slots.
+    Without one it lives in this process's anonymous memory. Checks are not
+    thread-safe; they are made from the event loop.
+    """
+
+    def __init__(
+        self,
+        rate: float,
+        burst: float,
+        slots: int = 1 << 20,
+        path: str | None = None,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        if rate <= 0 or burst < 1:
+            raise ValueError("rate must be positive and burst at least 1")
+        self.rate = rate
+        self.burst = burst
+        self.slots = max(slots, SLOT_PROBES)
+        self.path = path
+        self.clock = clock
+        self._runs = self.slots - SLOT_PROBES + 1
+        length = self.slots * SLOT_SIZE
+        self._fd: int | None = None
+        if path:
+            self._fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o644)
+            if os.fstat(self._fd).st_size != length:
+                os.ftruncate(self._fd, length)
+            self._mmap = mmap.mmap(self._fd, length)
+        else:
+            self._mmap = mmap.mmap(-1, length)
+        view = memoryview(self._mmap)
+        self._fingerprints = view[: self.slots * 8].cast("Q")
+        self._tokens = view[self.slots * 8 : self.slots * 16].cast("d")
+        self._updated = view[self.slots * 16 :].cast("d")
+
+    def _level(self, slot: int, now: float) -> float:
+        elapsed = now - self._updated[slot]
+        if elapsed < 0:
+            # Written under an earlier boot's monotonic clock
+            return self.burst
+        return min(self.burst, self._tokens[slot] + elapsed * self.rate)
+
+    def acquire(self, key: str, cost: float = 1.0) -> float:
+        """
+        Take `cost` tokens from the key's bucket.
+
+        Returns 0.0 when the tokens were taken, otherwise the seconds until
+        enough tokens will be available. A cost above the burst size is taken
+        from a full bucket, which then stays in debt until it refills.
+        """
+        now = self.clock()
+        key_fingerprint = fingerprint(key)
+        start = key_fingerprint % self._runs
+        if self._fd is not None:
+            fcntl.lockf(self._fd, fcntl.LOCK_EX, SLOT_PROBES * 8, start * 8)
+        try:
+            return self._take(key_fingerprint, start, cost, now)
+        finally:
+            if self._fd is not None:
+                fcntl.lockf(self._fd, fcntl.LOCK_UN, SLOT_PROBES * 8, start * 8)
+
+    def _take(self, key_fingerprint: int, start: int, cost: float, now: float) -> float:
+        fingerprints = self._fingerprints
+        slot = -1
+        reuse, reuse_level = start, -1.0
+        for probe in range(start, start + SLOT_PROBES):
+            probe_fingerprint = fingerprints[probe]
+            if probe_fingerprint == key_fingerprint:
+                slot = probe
+                break
+            level = self.burst if probe_fingerprint == 0 else self._level(probe, now)
+            if level > reuse_level:
+                reuse, reuse_level = probe, level
+        if slot == -1:
+            slot = reuse
+            fingerprints[slot] = key_fingerprint
+            level = self.burst
+        else:
+            level = self._level(slot, now)
+
+        self._updated[slot] = now
+        required = min(cost, self.burst)
+        if level >= required:
+            self._tokens[slot] = level - cost
+            return 0.0
+        self._tokens[slot] = level
+        return (required - level) / self.rate
+
+    def close(self) -> None:
+        for view in (self._fingerprints, self._tokens, self._updated):
+            view.release()
+        self._mmap.close()
+        if self._fd is not None:
+            os.close(self._fd)
+            self._fd = None
+
+
+class RateLimiter:
+    """
+    Charges lead ingestion requests to the token bucket of their source.
+
+    The source is the email domain of a single lead, the X-API-Key header or
+    the client IP, as chosen by `key_by`; when the chosen one is missing the
+    next one down the list is used.
+    """
+
+    def __init__(self, table: RateLimitTable, key_by: str = "api_key"):
+        if key_by not in RATE_LIMIT_KEYS:
+            raise ValueError(
+                f"Unknown rate limit key {key_by!r}, expected one of {RATE_LIMIT_KEYS}"
+            )
+        self.table = table
+        self.key_by = key_by
+
+    def key(self, request: Request, email: str | None = None) -> str:
+        if self.key_by == "email_domain" and email:
+            return "domain:" + email.rpartition("@")[2].lower()
+        if self.key_by != "ip":
+            api_key = request.headers.get(API_KEY_HEADER)
+            if api_key:
+                return "key:" + api_key
+        client = request.client
+        return "ip:" + (client.host if client else "unknown")
+
+    def acquire(self, key: str, cost: float = 1.0) -> float:
+        return self.table.acquire(key, cost)
+
+    def close(self) -> None:
+        self.table.close()
+
+
+def retry_after_header(seconds: float) -> str:
+    """Retry-After value: whole seconds, rounded up, at least 1."""
+    return str(max(1, math.ceil(seconds)))
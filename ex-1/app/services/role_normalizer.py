@@ -0,0 +1,94 @@
+# Job title normalization: free-text titles mapped to canonical roles
+
+import functools
+import json
+import pathlib
+import re
+from collections.abc import Iterable
+from pydantic import ValidationError
+from app.models.qualification_rules import RoleSynonymsConfig
+
+DEFAULT_CACHE_SIZE = 65536
+
+# Separators between title words; "@" is deliberately not one, so
+# "CEO@Company" stays a single token and is not read as a title
+_SEPARATORS = re.compile(r"[\s&,/()|;.\-]+")
+_STOPWORDS = frozenset({"of", "and", "the", "for", "at"})
+
+
+def tokenize_title(title: str) -> tuple[str, ...]:
+    """Split a title into lowercase words, dropping separators and stopwords."""
+    return tuple(
+        token
+        for token in _SEPARATORS.split(title.lower())
+        if token and token not in _STOPWORDS
+    )
+
+
+def read_role_synonyms(path: pathlib.Path) -> RoleSynonymsConfig:
+    with open(path, "r", encoding="utf-8") as f:
+        try:
+            return RoleSynonymsConfig.model_validate(json.load(f))
+        except ValidationError as exc:
+            raise ValueError(str(exc)) from exc
+
+
+class RoleNormalizer:
+    """
+    Maps job titles to the canonical roles they name.
+
+    Every alias is tokenized once into a tuple of words and indexed by that
+    tuple, so normalizing a title is a scan over its words probing the index
+    with the longest n-gram first ("Co-Founder & CEO" -> {"founder", "ceo"}).
+    Results are cached per raw title in a bounded LRU, since a handful of
+    titles make up most traffic. Canonical roles are returned lowercased.
+    """
+
+    def __init__(
+        self,
+        roles: dict[str, Iterable[str]],
+        disqualifying_tokens: Iterable[str] = (),
+        cache_size: int = DEFAULT_CACHE_SIZE,
+    ):
+        self._aliases: dict[tuple[str, ...], str] = {}
+        for role, aliases in roles.items():
+            canonical = role.lower().strip()
+            for alias in (role, *aliases):
+                tokens = tokenize_title(alias)
+                if tokens:
+                    self._aliases.setdefault(tokens, canonical)
+        self._max_ngram = max(map(len, self._aliases), default=0)
+        self._disqualifying = frozenset(
+            token.lower().strip() for token in disqualifying_tokens
+        )
+        self.normalize = functools.lru_cache(maxsize=cache_size)(self._normalize)
+
+    @classmethod
+    def from_file(
+        cls, path: pathlib.Path, extra_roles: Iterable[str] = ()
+    ) -> "RoleNormalizer":
+        config = read_role_synonyms(path)
+        roles = {role: [] for role in extra_roles}
+        roles.update(config.roles)
+        return cls(roles, config.disqualifying_tokens)
+
+    def _normalize(self, title: str) -> frozenset[str]:
+        tokens = tokenize_title(title)
+        if not self._disqualifying.isdisjoint(tokens):
+            return frozenset()
+        aliases = self._aliases
+        found = set()
+        start = 0
+        while start < len(tokens):
+            for size in range(min(self._max_ngram, len(tokens) - start), 0, -1):
+                role = aliases.get(tokens[start : start + size])
+                if role is not None:
+                    found.add(role)
+                    start += size
+                    break
+            else:
+                start += 1
+        return frozenset(found)
+
+    def cache_info(self) -> functools._CacheInfo:
+        return self.normalize.cache_info()
@@ -0,0 +1,252 @@
+"""
+Load benchmark: throughput and latency percentiles of POST /leads under
+concurrent clients, in-process (httpx.ASGITransport) or against a real
+uvicorn server
+
+Requests are generated from a mix of qualified, unqualified and invalid
+leads, each with a unique email so none are duplicates. The report is JSON;
+with --baseline it is compared against a stored report and the process
+exits with status 1 if throughput dropped or p95/p99 latency grew by more
+than --tolerance.
+
+Usage:
+    python -m benchmarks.bench_api_load [--mode asgi|uvicorn] [--requests 5000]
+        [--concurrency 32] [--mix qualified=0.6,unqualified=0.3,invalid=0.1]
+        [--workers 1] [--output report.json] [--baseline baseline.json]
+        [--tolerance 0.1]
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from collections import Counter
+from collections.abc import Iterator
+import httpx
+
+DEFAULT_MIX = "qualified=0.6,unqualified=0.3,invalid=0.1"
+LEAD_KINDS = ("qualified", "unqualified", "invalid")
+
+
+def parse_mix(text: str) -> dict[str, float]:
+    mix = {}
+    for part in text.split(","):
+        kind, _, weight = part.partition("=")
+        if kind.strip() not in LEAD_KINDS:
+            raise argparse.ArgumentTypeError(f"unknown lead kind {kind!r}")
+        mix[kind.strip()] = float(weight)
+    return mix
+
+
+def make_lead(kind: str, index: int, rng: random.Random) -> dict:
+    lead = {
+        "first_name": f"First{index}",
+        "last_name": f"Last{index}",
+        "email": f"user{index}@company{index % 97}.com",
+        "company_name": f"Company {index}",
+        "company_size": rng.randint(11, 5000),
+        "role": rng.choice(["CEO", "CTO", "Founder", "VP of Engineering"]),
+    }
+    if kind == "unqualified":
+        variant = index % 3
+        if variant == 0:
+            lead["company_size"] = rng.randint(1, 10)
+        elif variant == 1:
+            lead["role"] = rng.choice(["Intern", "Engineer", "Sales Manager"])
+        else:
+            lead["email"] = f"user{index}@gmail.com"
+    elif kind == "invalid":
+        if index % 2:
+            lead["email"] = f"user{index}-at-company.com"
+        else:
+            lead["company_size"] = 0
+    return lead
+
+
+def make_requests(count: int, mix: dict[str, float], seed: int = 42) -> list[dict]:
+    rng = random.Random(seed)
+    kinds = rng.choices(list(mix), weights=list(mix.values()), k=count)
+    return [make_lead(kind, index, rng) for index, kind in enumerate(kinds)]
+
+
+def percentile(sorted_values: list[float], fraction: float) -> float:
+    """Nearest-rank percentile of an ascending list."""
+    index = max(
+        0, min(len(sorted_values) - 1, round(fraction * len(sorted_values)) - 1)
+    )
+    return sorted_values[index]
+
+
+async def drive(
+    client: httpx.AsyncClient, leads: list[dict], concurrency: int
+) -> tuple[list[float], Counter, float]:
+    """Send every lead using `concurrency` concurrent clients."""
+    latencies: list[float] = []
+    statuses: Counter = Counter()
+    pending: Iterator[dict] = iter(leads)
+
+    async def worker() -> None:
+        for lead in pending:
+            start = time.perf_counter()
+            try:
+                response = await client.post("/leads", json=lead)
+                statuses[response.status_code] += 1
+            except httpx.HTTPError as exc:
+                statuses[type(exc).__name__] += 1
+            latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return latencies, statuses, time.perf_counter() - start
+
+
+async def run_asgi(leads: list[dict], concurrency: int) -> tuple:
+    from app.dependencies import close_lead_store
+    from app.main import app
+
+    transport = httpx.ASGITransport(app=app)
+    try:
+        async with httpx.AsyncClient(
+            transport=transport, base_url="http://bench"
+        ) as client:
+            # Warm up imports, validators and the lead store before measuring
+            warmup = make_lead("qualified", -1, random.Random())
+            await client.post("/leads", json=warmup)
+            return await drive(client, leads, concurrency)
+    finally:
+        close_lead_store()
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+async def wait_until_healthy(base_url: str, timeout: float = 30.0) -> None:
+    deadline = time.monotonic() + timeout
+    async with httpx.AsyncClient(base_url=base_url) as client:
+        while True:
+            try:
+                if (await client.get("/health")).status_code == 200:
+                    return
+            except httpx.TransportError:
+                pass
+            if time.monotonic() > deadline:
+                raise RuntimeError("uvicorn did not become healthy")
+            await asyncio.sleep(0.1)
+
+
+async def run_uvicorn(leads: list[dict], concurrency: int, workers: int) -> tuple:
+    port = free_port()
+    base_url = f"http://127.0.0.1:{port}"
+    server = subprocess.Popen(
+        [
+            sys.executable,
+            "-m",
+            "uvicorn",
+            "app.main:app",
+            "--port",
+            str(port),
+            "--workers",
+            str(workers),
+            "--log-level",
+            "warning",
+            "--no-access-log",
+        ],
+        env=os.environ.copy(),
+    )
+    try:
+        await wait_until_healthy(base_url)
+        limits = httpx.Limits(max_connections=concurrency)
+        async with httpx.AsyncClient(base_url=base_url, limits=limits) as client:
+            return await drive(client, leads, concurrency)
+    finally:
+        server.terminate()
+        server.wait(timeout=30)
+
+
+def build_report(args: argparse.Namespace, measured: tuple) -> dict:
+    latencies, statuses, duration = measured
+    latencies = sorted(latencies)
+    return {
+        "mode": args.mode,
+        "requests": len(latencies),
+        "concurrency": args.concurrency,
+        "workers": args.workers if args.mode == "uvicorn" else None,
+        "mix": args.mix,
+        "duration_s": round(duration, 3),
+        "throughput_rps": round(len(latencies) / duration, 1),
+        "latency_ms": {
+            "mean": round(sum(latencies) / len(latencies) * 1000, 3),
+            "p50": round(percentile(latencies, 0.50) * 1000, 3),
+            "p95": round(percentile(latencies, 0.95) * 1000, 3),
+            "p99": round(percentile(latencies, 0.99) * 1000, 3),
+            "max": round(latencies[-1] * 1000, 3),
+        },
+        "status_codes": dict(
+            sorted((str(code), count) for code, count in statuses.items())
+        ),
+    }
+
+
+def compare(report: dict, baseline: dict, tolerance: float) -> list[str]:
+    """Return a description of every metric that regressed beyond tolerance."""
+    regressions = []
+    throughput, expected = report["throughput_rps"], baseline["throughput_rps"]
+    if throughput < expected * (1 - tolerance):
+        regressions.append(
+            f"throughput {throughput:,.1f} rps < baseline {expected:,.1f}"
+        )
+    for name in ("p95", "p99"):
+        latency, expected = report["latency_ms"][name], baseline["latency_ms"][name]
+        if latency > expected * (1 + tolerance):
+            regressions.append(f"{name} {latency:,.3f} ms > baseline {expected:,.3f}")
+    return regressions
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--mode", choices=["asgi", "uvicorn"], default="asgi")
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--mix", type=parse_mix, default=parse_mix(DEFAULT_MIX))
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--output", help="also write the JSON report to this file")
+    parser.add_argument("--baseline", help="JSON report to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.10)
+    args = parser.parse_args()
+
+    leads = make_requests(args.requests, args.mix)
+    with tempfile.TemporaryDirectory() as store_dir:
+        # A fresh lead store, so earlier runs do not turn leads into duplicates
+        os.environ["LEAD_STORE_DIR"] = store_dir
+        if args.mode == "asgi":
+            measured = asyncio.run(run_asgi(leads, args.concurrency))
+        else:
+            measured = asyncio.run(run_uvicorn(leads, args.concurrency, args.workers))
+
+    report = build_report(args, measured)
+    print(json.dumps(report, indent=2))
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            regressions = compare(report, json.load(f), args.tolerance)
+        for regression in regressions:
+            print(f"REGRESSION: {regression}", file=sys.stderr)
+        if regressions:
+            sys.exit(1)
+        print("No regression against baseline", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""
+Benchmark: leads/sec of POST /leads versus POST /leads/batch on one worker
+
+Usage:
+    python -m benchmarks.bench_batch_ingestion [--leads 5000] [--batch-size 1000]
+"""
+
+import argparse
+import tempfile
+import time
+from fastapi.testclient import TestClient
+from app.dependencies import get_lead_store
+from app.main import app
+from app.services.lead_store import LeadStore
+
+
+def make_leads(count: int, start: int = 0) -> list[dict]:
+    roles = ["CEO", "CTO", "Manager", "Founder"]
+    domains = ["company.com", "gmail.com", "startup.io", "corp.net"]
+    return [
+        {
+            "first_name": f"First{i}",
+            "last_name": f"Last{i}",
+            "email": f"user{i}@{domains[i % len(domains)]}",
+            "company_name": f"Company {i}",
+            "company_size": 5 + (i % 100),
+            "role": roles[i % len(roles)],
+        }
+        for i in range(start, start + count)
+    ]
+
+
+def bench_single(client: TestClient, leads: list[dict]) -> float:
+    start = time.perf_counter()
+    for lead in leads:
+        client.post("/leads", json=lead)
+    return len(leads) / (time.perf_counter() - start)
+
+
+def bench_batch(client: TestClient, leads: list[dict], batch_size: int) -> float:
+    start = time.perf_counter()
+    for offset in range(0, len(leads), batch_size):
+        client.post("/leads/batch", json=leads[offset : offset + batch_size])
+    return len(leads) / (time.perf_counter() - start)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--leads", type=int, default=5000)
+    parser.add_argument("--batch-size", type=int, default=1000)
+    args = parser.parse_args()
+
+    # A fresh store, and leads of their own for each endpoint, so that
+    # neither is measured answering duplicates
+    with tempfile.TemporaryDirectory() as directory:
+        store = LeadStore(directory)
+        app.dependency_overrides[get_lead_store] = lambda: store
+        try:
+            with TestClient(app) as client:
+                single = bench_single(client, make_leads(args.leads))
+                batch = bench_batch(
+                    client, make_leads(args.leads, args.leads), args.batch_size
+                )
+        finally:
+            app.dependency_overrides.clear()
+            store.close()
+
+    print(f"POST /leads        {single:12,.0f} leads/sec")
+    print(f"POST /leads/batch  {batch:12,.0f} leads/sec")
+    print(f"speedup            {batch / single:12.1f}x")
+
+
+if __name__ == "__main__":
+    main()
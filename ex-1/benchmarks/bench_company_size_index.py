@@ -0,0 +1,89 @@
+"""
+Benchmark: company size index build time, file size, open cost and lookups/sec
+
+Builds an index of synthetic company domains, then looks up a mix of listed
+domains, subdomains of listed domains and unlisted domains. The private
+memory added by opening and searching the index shows that nothing but a
+sparse sample of fence keys is loaded into Python objects: the pages read by
+lookups are file-backed and shared through the page cache. Memory is read
+from /proc, so the benchmark runs on Linux.
+
+Usage:
+    python -m benchmarks.bench_company_size_index [--domains 1000000]
+        [--lookups 100000] [--repeat 5]
+"""
+
+import argparse
+import os
+import random
+import tempfile
+import time
+import timeit
+from app.services.company_size_index import CompanySizeIndex, build_company_size_index
+
+
+def make_lookups(count: int, domains: int) -> list[str]:
+    rng = random.Random(42)
+    lookups = []
+    for i in range(count):
+        company = rng.randrange(domains)
+        kind = i % 3
+        if kind == 0:
+            lookups.append(f"company{company}.example.com")
+        elif kind == 1:
+            lookups.append(f"eu.company{company}.example.com")
+        else:
+            lookups.append(f"unlisted{company}.example.net")
+    return lookups
+
+
+def anonymous_rss_bytes() -> int:
+    """Private (non file-backed) resident memory of this process."""
+    with open("/proc/self/status", encoding="ascii") as f:
+        for line in f:
+            if line.startswith("RssAnon:"):
+                return int(line.split()[1]) * 1024
+    return 0
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--domains", type=int, default=1_000_000)
+    parser.add_argument("--lookups", type=int, default=100_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "company_sizes.idx")
+        started = time.perf_counter()
+        build_company_size_index(
+            ((f"company{i}.example.com", i % 10_000 + 1) for i in range(args.domains)),
+            path,
+        )
+        build_seconds = time.perf_counter() - started
+        lookups = make_lookups(args.lookups, args.domains)
+
+        rss_before = anonymous_rss_bytes()
+        started = time.perf_counter()
+        index = CompanySizeIndex(path)
+        open_seconds = time.perf_counter() - started
+
+        def run() -> None:
+            for domain in lookups:
+                index.get(domain)
+
+        best = min(timeit.repeat(run, number=1, repeat=args.repeat))
+        print(f"domains          {len(index):12,}")
+        print(f"build            {build_seconds:12.2f} s")
+        print(f"file size        {os.path.getsize(path) / 2**20:12,.1f} MiB")
+        print(f"open             {open_seconds * 1e6:12,.0f} us")
+        print(
+            "private memory   "
+            f"{(anonymous_rss_bytes() - rss_before) / 2**20:12,.1f} MiB"
+        )
+        print(f"lookups/sec      {args.lookups / best:12,.0f}")
+        print(f"per lookup       {best / args.lookups * 1e6:12,.2f} us")
+
+
+if __name__ == "__main__":
+    main()
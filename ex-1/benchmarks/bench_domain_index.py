@@ -0,0 +1,51 @@
+"""
+Benchmark: blocked email domain lookups/sec and index memory
+
+Lookups mix exact hits, subdomain hits and business-domain misses.
+
+Usage:
+    python -m benchmarks.bench_domain_index [--lookups 100000] [--repeat 5]
+"""
+
+import argparse
+import random
+import timeit
+from app.services.qualification_rules import rule_engine
+
+
+def make_domains(count: int, listed: list[str]) -> list[str]:
+    rng = random.Random(42)
+    domains = []
+    for i in range(count):
+        kind = i % 3
+        if kind == 0:
+            domains.append(rng.choice(listed))
+        elif kind == 1:
+            domains.append(f"mx{i % 7}.{rng.choice(listed)}")
+        else:
+            domains.append(f"corp{i}.example{i % 50}.com")
+    return domains
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--lookups", type=int, default=100_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    index = rule_engine.current().forbidden_domains
+    domains = make_domains(args.lookups, ["gmail.com", "yahoo.co.uk", "mailinator.com"])
+
+    def run() -> None:
+        for domain in domains:
+            domain in index
+
+    best = min(timeit.repeat(run, number=1, repeat=args.repeat))
+    print(f"listed domains   {len(index):12,}")
+    print(f"index memory     {index.memory_bytes() / 1024:12,.1f} KiB")
+    print(f"lookups/sec      {args.lookups / best:12,.0f}")
+    print(f"per lookup       {best / args.lookups * 1e9:12,.0f} ns")
+
+
+if __name__ == "__main__":
+    main()
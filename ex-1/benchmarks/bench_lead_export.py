@@ -0,0 +1,60 @@
+"""
+Benchmark: lead export throughput and the cost of "since T" exports
+
+Stores --leads leads, then times a full NDJSON export, a full CSV export and
+an NDJSON export of the newest --recent leads selected with `since`. With
+time-ordered lead ids the last one is a range scan, so its cost follows the
+number of recent leads rather than the size of the store.
+
+Usage:
+    python -m benchmarks.bench_lead_export [--leads 100000] [--recent 1000]
+"""
+
+import argparse
+import asyncio
+import tempfile
+import time
+from datetime import datetime, timezone
+from app.models.lead import Lead
+from app.services.lead_export import iter_export
+from app.services.lead_qualification import qualify_leads
+from app.services.lead_store import LeadStore
+from benchmarks.bench_batch_ingestion import make_leads
+
+
+def timed_export(store: LeadStore, **filters) -> tuple[float, int]:
+    start = time.perf_counter()
+    size = sum(len(chunk) for chunk in iter_export(store, **filters))
+    return time.perf_counter() - start, size
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--leads", type=int, default=100_000)
+    parser.add_argument("--recent", type=int, default=1_000)
+    args = parser.parse_args()
+
+    leads = [Lead(**data) for data in make_leads(args.leads)]
+    older = qualify_leads(leads[: -args.recent])
+    time.sleep(0.002)
+    since = datetime.now(timezone.utc)
+    recent = qualify_leads(leads[-args.recent :])
+
+    with tempfile.TemporaryDirectory() as directory:
+        store = LeadStore(directory)
+        asyncio.run(store.append_many(older + recent))
+        for label, filters, count in (
+            ("full ndjson", {}, args.leads),
+            ("full csv", {"fmt": "csv"}, args.leads),
+            ("since ndjson", {"since": since}, args.recent),
+        ):
+            elapsed, size = timed_export(store, **filters)
+            print(
+                f"{label:<14} {count:>9,} leads {elapsed * 1e3:9,.1f} ms "
+                f"{count / elapsed:12,.0f} leads/s {size / elapsed / 2**20:8,.1f} MiB/s"
+            )
+        store.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,37 @@
+"""
+Benchmark: lead scoring per lead versus vectorized over a batch
+
+Usage:
+    python -m benchmarks.bench_lead_scoring [--leads 100000] [--repeat 5]
+"""
+
+import argparse
+import timeit
+from app.models.lead import Lead
+from app.services.qualification_rules import rule_engine
+from benchmarks.bench_batch_ingestion import make_leads
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--leads", type=int, default=100_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    scoring = rule_engine.current().scoring
+    leads = [Lead(**data) for data in make_leads(args.leads)]
+
+    def per_lead() -> None:
+        for lead in leads:
+            scoring.score(lead)
+
+    def vectorized() -> None:
+        scoring.score_many(leads)
+
+    for name, run in (("per lead", per_lead), ("vectorized", vectorized)):
+        best = min(timeit.repeat(run, number=1, repeat=args.repeat))
+        print(f"{name:<16} {best / args.leads * 1e9:12,.0f} ns/lead")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+"""
+Benchmark: durable lead writes/sec with concurrent appenders
+
+Each appender awaits its own write, as a request to POST /leads would; the
+store group-commits whatever is queued into one fsync.
+
+Usage:
+    python -m benchmarks.bench_lead_store [--leads 20000] [--concurrency 256]
+"""
+
+import argparse
+import asyncio
+import tempfile
+import time
+from app.models.lead import Lead
+from app.services.lead_qualification import qualify_leads
+from app.services.lead_store import LeadStore
+from benchmarks.bench_batch_ingestion import make_leads
+
+
+async def run(store: LeadStore, results: list, concurrency: int) -> float:
+    pending = iter(results)
+
+    async def appender() -> None:
+        for result in pending:
+            await store.append(result)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(appender() for _ in range(concurrency)))
+    return time.perf_counter() - start
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--leads", type=int, default=20_000)
+    parser.add_argument("--concurrency", type=int, default=256)
+    args = parser.parse_args()
+
+    results = qualify_leads(Lead(**data) for data in make_leads(args.leads))
+    with tempfile.TemporaryDirectory() as directory:
+        store = LeadStore(directory)
+        elapsed = asyncio.run(run(store, results, args.concurrency))
+        store.close()
+
+    print(f"durable writes/sec  {args.leads / elapsed:12,.0f}")
+    print(f"fsyncs              {store.fsync_count:12,}")
+    print(f"leads per fsync     {args.leads / store.fsync_count:12,.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,134 @@
+"""
+Benchmark: cost of the /metrics instrumentation relative to POST /leads
+
+Times the work the instrumentation adds to one request (the PhaseTimer
+middleware around a no-op app, the handler markers and the per-rule
+counters) and compares it with the median in-process latency of POST /leads.
+Exits with status 1 if the overhead exceeds --budget.
+
+Usage:
+    python -m benchmarks.bench_metrics_overhead [--requests 2000] [--budget 0.02]
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+import timeit
+import httpx
+from starlette.requests import Request
+from app.services.metrics import (
+    PhaseTimer,
+    handler_finished,
+    handler_started,
+    record_qualification,
+)
+from app.services.qualification_rules import EMAIL_NOTE
+from benchmarks.bench_api_load import make_lead
+
+SCOPE = {"type": "http", "method": "POST", "path": "/leads", "headers": []}
+START = {"type": "http.response.start", "status": 201, "headers": []}
+BODY = {"type": "http.response.body", "body": b"{}"}
+
+
+async def receive() -> dict:
+    return {"type": "http.request", "body": b""}
+
+
+async def send(message: dict) -> None:
+    pass
+
+
+async def endpoint(scope, receive, send) -> None:
+    request = Request(scope)
+    handler_started(request)
+    handler_finished(request)
+    await send(START)
+    await send(BODY)
+
+
+async def bare_endpoint(scope, receive, send) -> None:
+    Request(scope)
+    await send(START)
+    await send(BODY)
+
+
+def instrumentation_seconds(number: int) -> float:
+    """Per-request cost of the instrumented path minus the bare path."""
+    instrumented = PhaseTimer(endpoint)
+    loop = asyncio.new_event_loop()
+
+    async def run(app, qualify: bool) -> None:
+        for _ in range(number):
+            await app(dict(SCOPE), receive, send)
+            if qualify:
+                record_qualification("Unqualified", [EMAIL_NOTE], 1e-4)
+
+    try:
+        with_metrics = min(
+            timeit.repeat(
+                lambda: loop.run_until_complete(run(instrumented, True)),
+                number=1,
+                repeat=5,
+            )
+        )
+        without = min(
+            timeit.repeat(
+                lambda: loop.run_until_complete(run(bare_endpoint, False)),
+                number=1,
+                repeat=5,
+            )
+        )
+    finally:
+        loop.close()
+    return max(0.0, with_metrics - without) / number
+
+
+async def request_latency(requests: int) -> float:
+    """Median latency of sequential POST /leads through the ASGI app."""
+    from app.dependencies import close_lead_store
+    from app.main import app
+
+    rng = random.Random(42)
+    latencies = []
+    transport = httpx.ASGITransport(app=app)
+    try:
+        async with httpx.AsyncClient(
+            transport=transport, base_url="http://bench"
+        ) as client:
+            await client.post("/leads", json=make_lead("qualified", -1, rng))
+            for index in range(requests):
+                lead = make_lead("qualified", index, rng)
+                start = time.perf_counter()
+                await client.post("/leads", json=lead)
+                latencies.append(time.perf_counter() - start)
+    finally:
+        close_lead_store()
+    return statistics.median(latencies)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--budget", type=float, default=0.02)
+    args = parser.parse_args()
+
+    overhead = instrumentation_seconds(args.requests)
+    with tempfile.TemporaryDirectory() as store_dir:
+        os.environ["LEAD_STORE_DIR"] = store_dir
+        latency = asyncio.run(request_latency(args.requests))
+
+    share = overhead / latency
+    print(f"instrumentation   {overhead * 1e6:10.2f} us/request")
+    print(f"POST /leads p50   {latency * 1e6:10.2f} us")
+    print(f"overhead          {share:10.2%} (budget {args.budget:.0%})")
+    if share > args.budget:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""
+Microbenchmark: per-lead qualification cost of the previous per-request
+LeadQualification (list lookups, predicates evaluated twice) versus the
+compiled rule engine (frozenset lookups, single pass)
+
+Usage:
+    python -m benchmarks.bench_qualification [--leads 10000] [--repeat 5]
+"""
+
+import argparse
+import timeit
+from app.models.lead import Lead
+from app.services.qualification_rules import rule_engine
+from benchmarks.bench_batch_ingestion import make_leads
+
+
+class LegacyLeadQualification:
+    """The per-request implementation the rule engine replaced."""
+
+    def __init__(self, lead: Lead):
+        self.forbidden_domains = ["gmail.com", "yahoo.com", "outlook.com"]
+        self.decision_maker_roles = ["ceo", "cto", "founder", "vp of engineering"]
+        self.min_company_size = 10
+        self.lead = lead
+
+    def _qualify_lead(self) -> bool:
+        return (
+            self._qualify_by_company_size()
+            and self._qualify_by_role()
+            and self._qualify_by_email()
+        )
+
+    def _qualify_by_company_size(self) -> bool:
+        return self.lead.company_size > self.min_company_size
+
+    def _qualify_by_role(self) -> bool:
+        return self.lead.role.lower().strip() in self.decision_maker_roles
+
+    def _qualify_by_email(self) -> bool:
+        email_domain = self.lead.email.split("@")[1]
+        return email_domain not in self.forbidden_domains
+
+    def _get_qualification_notes(self) -> list[str]:
+        qualification_notes = []
+        if not self._qualify_by_company_size():
+            qualification_notes.append("Company size is too small")
+        if not self._qualify_by_role():
+            qualification_notes.append("Role is not a decision-maker")
+        if not self._qualify_by_email():
+            qualification_notes.append("Email domain is forbidden")
+        return qualification_notes
+
+    def evaluate(self) -> tuple[bool, list[str]]:
+        return self._qualify_lead(), self._get_qualification_notes()
+
+
+def per_lead_ns(func, leads: list[Lead], repeat: int) -> float:
+    best = min(timeit.repeat(lambda: func(leads), number=1, repeat=repeat))
+    return best / len(leads) * 1e9
+
+
+def run_legacy(leads: list[Lead]) -> None:
+    for lead in leads:
+        LegacyLeadQualification(lead).evaluate()
+
+
+def run_compiled(leads: list[Lead]) -> None:
+    evaluate = rule_engine.current().evaluate
+    for lead in leads:
+        evaluate(lead)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--leads", type=int, default=10000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    leads = [Lead(**data) for data in make_leads(args.leads)]
+    legacy = per_lead_ns(run_legacy, leads, args.repeat)
+    compiled = per_lead_ns(run_compiled, leads, args.repeat)
+
+    print(f"legacy per-request rules  {legacy:8.0f} ns/lead")
+    print(f"compiled rule engine      {compiled:8.0f} ns/lead")
+    print(f"speedup                   {legacy / compiled:8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""
+Benchmark: cost of a rate limit check and memory of the bucket table
+
+Times RateLimitTable.acquire over a skewed stream of keys (a few heavy
+sources among many light ones), first in process memory and then in a
+shared file as used across workers, where each check also takes an fcntl
+lock. The table is sized for --keys distinct keys; its memory is fixed by
+--slots whatever the number of keys.
+
+Usage:
+    python -m benchmarks.bench_rate_limit [--keys 1000000] [--slots 1048576]
+        [--checks 200000] [--repeat 5]
+"""
+
+import argparse
+import os
+import random
+import tempfile
+import timeit
+from app.services.rate_limit import SLOT_SIZE, RateLimitTable
+
+
+def time_checks(table: RateLimitTable, keys: list[str], repeat: int) -> float:
+    acquire = table.acquire
+    for key in keys:
+        acquire(key)
+
+    def run() -> None:
+        for key in keys:
+            acquire(key)
+
+    return min(timeit.repeat(run, number=1, repeat=repeat)) / len(keys)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--keys", type=int, default=1_000_000)
+    parser.add_argument("--slots", type=int, default=1 << 20)
+    parser.add_argument("--checks", type=int, default=200_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+    rng = random.Random(42)
+
+    # Half of the checks come from 10 heavy sources, half from the long tail
+    keys = [
+        (
+            f"key:heavy-{rng.randrange(10)}"
+            if rng.random() < 0.5
+            else f"ip:10.{rng.randrange(args.keys)}"
+        )
+        for _ in range(args.checks)
+    ]
+    print(
+        f"{args.checks:,} checks over up to {args.keys:,} keys, "
+        f"table of {args.slots:,} slots = "
+        f"{args.slots * SLOT_SIZE / 2**20:.1f} MiB"
+    )
+
+    table = RateLimitTable(50.0, 100, slots=args.slots)
+    print(
+        f"{'process memory':<16} "
+        f"{time_checks(table, keys, args.repeat) * 1e9:8,.0f} ns/check"
+    )
+    table.close()
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "rate-limit.db")
+        table = RateLimitTable(50.0, 100, slots=args.slots, path=path)
+        print(
+            f"{'shared file':<16} "
+            f"{time_checks(table, keys, args.repeat) * 1e9:8,.0f} ns/check"
+        )
+        table.close()
+
+
+if __name__ == "__main__":
+    main()
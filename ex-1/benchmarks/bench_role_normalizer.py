@@ -0,0 +1,68 @@
+"""
+Benchmark: per-title cost of role normalization, cached and uncached
+
+Titles follow a skewed (Zipf-like) distribution over a pool of real-world
+titles, as in production traffic.
+
+Usage:
+    python -m benchmarks.bench_role_normalizer [--titles 100000] [--repeat 5]
+"""
+
+import argparse
+import random
+import timeit
+from app.services.qualification_rules import rule_engine
+
+TITLES = [
+    "CEO",
+    "Founder",
+    "Co-Founder & CEO",
+    "Chief Technology Officer",
+    "VP Engineering",
+    "Software Engineer",
+    "Head of Sales",
+    "Founder/CTO",
+    "Vice President, Engineering",
+    "Marketing Manager",
+    "Chief Executive Officer & President",
+    "Senior Product Manager",
+]
+
+
+def make_titles(count: int) -> list[str]:
+    rng = random.Random(42)
+    weights = [1 / (rank + 1) for rank in range(len(TITLES))]
+    titles = rng.choices(TITLES, weights=weights, k=count)
+    # A long tail of one-off titles that always miss the cache
+    for i in range(0, count, 100):
+        titles[i] = f"Director of Operations {i}"
+    return titles
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--titles", type=int, default=100_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    normalizer = rule_engine.current().role_normalizer
+    titles = make_titles(args.titles)
+
+    def uncached() -> None:
+        for title in titles:
+            normalizer._normalize(title)
+
+    def cached() -> None:
+        for title in titles:
+            normalizer.normalize(title)
+
+    uncached_best = min(timeit.repeat(uncached, number=1, repeat=args.repeat))
+    cached_best = min(timeit.repeat(cached, number=1, repeat=args.repeat))
+    info = normalizer.cache_info()
+    print(f"uncached         {uncached_best / args.titles * 1e9:12,.0f} ns/title")
+    print(f"cached           {cached_best / args.titles * 1e9:12,.0f} ns/title")
+    print(f"cache hit rate   {info.hits / (info.hits + info.misses):12.1%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""
+Benchmark: per-request cost of selecting tenant rules as tenants are added
+
+For each tenant count, writes that many tenant rules files, warms the cache
+and times rule selection for random tenants, next to the default engine. A
+cold tenant's first lookup includes compiling its rules.
+
+Usage:
+    python -m benchmarks.bench_tenant_rules [--tenants 1,100,1000]
+        [--lookups 100000] [--repeat 5]
+"""
+
+import argparse
+import json
+import pathlib
+import random
+import tempfile
+import time
+import timeit
+from app.services.qualification_rules import TenantRules, rule_engine
+
+TENANT_RULES = {
+    "min_company_size": 10,
+    "decision_maker_roles": ["CEO", "CTO", "Founder"],
+    "forbidden_domains": ["gmail.com", "yahoo.com"],
+}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--tenants",
+        type=lambda text: [int(n) for n in text.split(",")],
+        default=[1, 100, 1000],
+    )
+    parser.add_argument("--lookups", type=int, default=100_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+    rng = random.Random(42)
+
+    best = min(
+        timeit.repeat(rule_engine.current, number=args.lookups, repeat=args.repeat)
+    )
+    print(f"{'default rules':<16} {best / args.lookups * 1e9:10,.0f} ns/lookup")
+
+    for count in args.tenants:
+        with tempfile.TemporaryDirectory() as directory:
+            for i in range(count):
+                rules = {**TENANT_RULES, "min_company_size": i}
+                path = pathlib.Path(directory) / f"tenant{i}.json"
+                path.write_text(json.dumps(rules), encoding="utf-8")
+            tenants = TenantRules(directory, max_tenants=count)
+
+            started = time.perf_counter()
+            tenants.current("tenant0")
+            cold = time.perf_counter() - started
+            for i in range(count):
+                tenants.current(f"tenant{i}")
+
+            names = [f"tenant{rng.randrange(count)}" for _ in range(args.lookups)]
+
+            def run() -> None:
+                for name in names:
+                    tenants.current(name)
+
+            best = min(timeit.repeat(run, number=1, repeat=args.repeat))
+            print(
+                f"{count:>6,} tenants   {best / args.lookups * 1e9:10,.0f} ns/lookup"
+                f"   cold tenant {cold * 1e3:8.2f} ms"
+            )
+
+
+if __name__ == "__main__":
+    main()
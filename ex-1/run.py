@@ -3,9 +3,13 @@ Production server runner for the Lead Ingestion API
 Handles environment detection and production setup
 """
 
+import importlib.util
 import os
+import pathlib
+import tempfile
 import uvicorn
 from dotenv import load_dotenv
+from uvicorn.supervisors import Multiprocess
 
 
 def is_production():
@@ -23,20 +27,79 @@ def setup_environment():
         os.environ["ENVIRONMENT"] = "development"
 
 
+def default_workers() -> int:
+    """One worker per CPU this process may run on (respects taskset/cgroups)"""
+    if hasattr(os, "sched_getaffinity"):
+        return len(os.sched_getaffinity(0))
+    return os.cpu_count() or 1
+
+
+def select_loop() -> str:
+    """Use uvloop when installed, otherwise the stdlib asyncio loop"""
+    return "uvloop" if importlib.util.find_spec("uvloop") else "asyncio"
+
+
+def select_http() -> str:
+    """Use the httptools parser when installed, otherwise h11"""
+    return "httptools" if importlib.util.find_spec("httptools") else "h11"
+
+
+def server_options() -> dict:
+    """uvicorn options for production, from the environment"""
+    max_requests = int(os.getenv("MAX_REQUESTS_PER_WORKER", 0))
+    return {
+        "host": "0.0.0.0",
+        "port": int(os.getenv("PORT", 8000)),
+        # One worker unless asked for more; 0 starts one per CPU
+        "workers": int(os.getenv("WORKERS", 1)) or default_workers(),
+        "loop": select_loop(),
+        "http": select_http(),
+        # Workers exit gracefully after this many requests and are restarted
+        # by the supervisor, which bounds memory growth; 0 disables it
+        "limit_max_requests": max_requests or None,
+        "timeout_graceful_shutdown": int(os.getenv("GRACEFUL_SHUTDOWN_TIMEOUT", 30)),
+        "log_level": os.getenv("LOG_LEVEL", "info"),
+        "access_log": False,
+    }
+
+
+def prepare_metrics_dir() -> str:
+    """Give all workers one fresh directory for their metrics files"""
+    directory = os.getenv("METRICS_DIR") or tempfile.mkdtemp(prefix="lead-metrics-")
+    os.environ["METRICS_DIR"] = directory
+    # Files left by a previous server would be counted into this one
+    for path in pathlib.Path(directory).glob("metrics-*.db"):
+        path.unlink()
+    return directory
+
+
+def serve(options: dict) -> None:
+    """Run uvicorn, supervising workers so they are restarted after max requests"""
+    config = uvicorn.Config("app.main:app", **options)
+    if config.workers == 1 and config.limit_max_requests:
+        # uvicorn only supervises workers when there are several, so a single
+        # worker would exit for good at its request limit
+        server = uvicorn.Server(config)
+        Multiprocess(config, target=server.run, sockets=[config.bind_socket()]).run()
+    else:
+        uvicorn.run("app.main:app", **options)
+
+
 if __name__ == "__main__":
     # Setup environment
     setup_environment()
 
     # Production configuration
     if is_production():
-        uvicorn.run(
-            "app.main:app",
-            host="0.0.0.0",
-            port=int(os.getenv("PORT", 8000)),
-            workers=int(os.getenv("WORKERS", 1)),
-            log_level="warning",
-            access_log=False,
+        options = server_options()
+        prepare_metrics_dir()
+        print(
+            f"🚀 Starting {options['workers']} workers "
+            f"(loop={options['loop']}, http={options['http']}, "
+            f"max requests per worker={options['limit_max_requests'] or 'unlimited'})"
         )
+        # Each worker warms up in the app lifespan before accepting traffic
+        serve(options)
     else:
         # Development mode - use fastapi dev instead
         print("🚀 Use 'fastapi dev app/main.py' for development")
@@ -4,13 +4,64 @@ Test configuration and fixtures for the Lead Ingestion API
 
 import pytest
 from fastapi.testclient import TestClient
+from app.dependencies import get_idempotency_cache, get_lead_store
 from app.main import app
+from app.models.lead import Lead
+from app.services.idempotency import IdempotencyCache
+from app.services.lead_store import LeadStore
+
+
+class FakeClock:
+    """Clock for TTL and refill tests; time only moves when a test advances now."""
+
+    def __init__(self, now: float = 1000.0):
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
 
 
 @pytest.fixture
-def client():
+def clock() -> FakeClock:
+    """A FakeClock to pass as a component's clock."""
+    return FakeClock()
+
+
+@pytest.fixture
+def lead_store(tmp_path):
+    """Lead store in a temporary directory."""
+    store = LeadStore(tmp_path / "leads")
+    yield store
+    store.close()
+
+
+@pytest.fixture
+def client(lead_store):
     """Create a test client for the FastAPI application."""
-    return TestClient(app)
+    idempotency_cache = IdempotencyCache()
+    app.dependency_overrides[get_lead_store] = lambda: lead_store
+    app.dependency_overrides[get_idempotency_cache] = lambda: idempotency_cache
+    yield TestClient(app)
+    app.dependency_overrides.clear()
+
+
+@pytest.fixture
+def make_lead():
+    """Factory of Lead models that pass every rule unless fields are overridden."""
+
+    def make_lead(**overrides) -> Lead:
+        data = {
+            "first_name": "John",
+            "last_name": "Doe",
+            "email": "john@company.com",
+            "company_name": "Tech Corp",
+            "company_size": 50,
+            "role": "CEO",
+        }
+        data.update(overrides)
+        return Lead(**data)
+
+    return make_lead
 
 
 @pytest.fixture
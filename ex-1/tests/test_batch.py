@@ -0,0 +1,187 @@
+"""
+Test cases for the batch lead ingestion endpoint
+"""
+
+import json
+import pytest
+from app.services.lead_batch import (
+    LeadBatchFormatError,
+    LeadBatchResult,
+    LeadBatchTooLargeError,
+    ingest_lead_batch,
+)
+
+
+class TestLeadBatchEndpoint:
+    """Test class for POST /leads/batch."""
+
+    def test_json_array_returns_result_per_lead(
+        self, client, valid_lead_data, unqualified_lead_small_company
+    ):
+        """Test that a JSON array batch returns one qualified result per lead."""
+        response = client.post(
+            "/leads/batch", json=[valid_lead_data, unqualified_lead_small_company]
+        )
+
+        assert response.status_code == 200
+        data = response.json()
+        assert data["total"] == 2
+        assert data["accepted"] == 2
+        assert data["rejected"] == 0
+        assert [item["index"] for item in data["items"]] == [0, 1]
+        assert data["items"][0]["result"]["status"] == "Qualified"
+        assert data["items"][1]["result"]["status"] == "Unqualified"
+        assert "Company size is too small" in (
+            data["items"][1]["result"]["qualification_notes"][0]
+        )
+        assert len(data["items"][0]["result"]["lead_id"]) == 36
+
+    def test_ndjson_body_is_accepted(self, client, valid_lead_data):
+        """Test that an NDJSON body is parsed one lead per line."""
+        body = "\n".join(json.dumps(valid_lead_data) for _ in range(3)) + "\n"
+        response = client.post(
+            "/leads/batch",
+            content=body,
+            headers={"Content-Type": "application/x-ndjson"},
+        )
+
+        assert response.status_code == 200
+        data = response.json()
+        assert data["accepted"] == 3
+        assert all(item["result"]["status"] == "Qualified" for item in data["items"])
+
+    def test_invalid_rows_are_reported_without_failing_batch(
+        self, client, valid_lead_data
+    ):
+        """Test that invalid rows get per-row errors while valid rows are qualified."""
+        invalid_lead = {**valid_lead_data, "email": "invalid-email"}
+        response = client.post(
+            "/leads/batch", json=[valid_lead_data, invalid_lead, valid_lead_data]
+        )
+
+        assert response.status_code == 200
+        data = response.json()
+        assert data["accepted"] == 2
+        assert data["rejected"] == 1
+        items = data["items"]
+        assert [item["index"] for item in items] == [0, 1, 2]
+        assert items[1]["result"] is None
+        assert items[1]["errors"][0]["loc"] == ["email"]
+        assert items[0]["result"]["status"] == "Qualified"
+        assert items[2]["result"]["status"] == "Qualified"
+
+    def test_malformed_ndjson_line_is_reported_per_row(self, client, valid_lead_data):
+        """Test that a malformed NDJSON line only rejects that line."""
+        body = json.dumps(valid_lead_data) + "\n{not json\n"
+        response = client.post(
+            "/leads/batch",
+            content=body,
+            headers={"Content-Type": "application/x-ndjson"},
+        )
+
+        assert response.status_code == 200
+        data = response.json()
+        assert data["accepted"] == 1
+        assert data["items"][1]["errors"][0]["type"] == "json_invalid"
+
+    def test_non_utf8_ndjson_line_is_reported_per_row(self, client, valid_lead_data):
+        """Test that a line that is not UTF-8 is rejected without its input."""
+        body = json.dumps(valid_lead_data).encode() + b'\n{"email": "\xff"}\n'
+        response = client.post(
+            "/leads/batch",
+            content=body,
+            headers={"Content-Type": "application/x-ndjson"},
+        )
+
+        assert response.status_code == 200
+        data = response.json()
+        assert data["accepted"] == 1
+        assert data["rejected"] == 1
+        assert "input" not in data["items"][1]["errors"][0]
+
+    def test_unserializable_batch_stores_nothing(
+        self, client, valid_lead_data, lead_store, monkeypatch
+    ):
+        """Test that no lead is stored when the response cannot be serialized."""
+
+        def fail(*args, **kwargs):
+            raise ValueError("cannot serialize")
+
+        monkeypatch.setattr(LeadBatchResult, "model_dump_json", fail)
+        with pytest.raises(ValueError):
+            client.post("/leads/batch", json=[valid_lead_data])
+
+        assert len(lead_store) == 0
+
+    def test_ndjson_line_with_two_objects_is_one_invalid_row(
+        self, client, valid_lead_data
+    ):
+        """Test that a line holding two objects does not shift later rows."""
+        lead = json.dumps(valid_lead_data)
+        body = f"{lead}\n{lead},{lead}\n{lead}\n"
+        response = client.post(
+            "/leads/batch",
+            content=body,
+            headers={"Content-Type": "application/x-ndjson"},
+        )
+
+        data = response.json()
+        assert data["total"] == 3
+        assert data["accepted"] == 2
+        assert [item["index"] for item in data["items"]] == [0, 1, 2]
+        assert data["items"][1]["errors"][0]["type"] == "json_invalid"
+
+    def test_non_array_body_returns_422(self, client, valid_lead_data):
+        """Test that a JSON object instead of an array returns 422."""
+        response = client.post("/leads/batch", json=valid_lead_data)
+        assert response.status_code == 422
+
+    def test_malformed_json_returns_422(self, client):
+        """Test that malformed JSON returns 422."""
+        response = client.post(
+            "/leads/batch",
+            content="[{",
+            headers={"Content-Type": "application/json"},
+        )
+        assert response.status_code == 422
+
+    def test_empty_array_returns_empty_result(self, client):
+        """Test that an empty batch is accepted."""
+        response = client.post("/leads/batch", json=[])
+
+        assert response.status_code == 200
+        assert response.json() == {
+            "total": 0,
+            "accepted": 0,
+            "rejected": 0,
+            "items": [],
+        }
+
+
+class TestLeadBatchService:
+    """Test class for batch ingestion business logic."""
+
+    def test_oversized_batch_raises(self, valid_lead_data):
+        """Test that batches above the size limit are rejected."""
+        body = json.dumps([valid_lead_data] * 3).encode()
+        with pytest.raises(LeadBatchTooLargeError):
+            ingest_lead_batch(body, "application/json", max_size=2)
+
+    def test_oversized_invalid_batch_raises(self, valid_lead_data):
+        """Test that the size limit also applies on the per-row fallback path."""
+        body = json.dumps([{**valid_lead_data, "company_size": 0}] * 3).encode()
+        with pytest.raises(LeadBatchTooLargeError):
+            ingest_lead_batch(body, "application/json", max_size=2)
+
+    def test_non_json_body_raises_format_error(self):
+        """Test that a non-JSON body raises a format error."""
+        with pytest.raises(LeadBatchFormatError):
+            ingest_lead_batch(b"not json", "application/json", max_size=10)
+
+    def test_lead_ids_are_unique(self, valid_lead_data):
+        """Test that every lead in a batch gets its own lead_id."""
+        body = json.dumps([valid_lead_data] * 50).encode()
+        result = ingest_lead_batch(body, "application/json", max_size=100)
+
+        lead_ids = {item.result.lead_id for item in result.items}
+        assert len(lead_ids) == 50
@@ -0,0 +1,147 @@
+"""
+Test cases for the offline qualification CLI
+"""
+
+import csv
+import json
+import pytest
+from app.cli import main
+from app.services.lead_stream import iter_chunks
+
+HEADER = ["first_name", "last_name", "email", "company_name", "company_size", "role"]
+ROWS = [
+    ["John", "Doe", "john@company.com", "Tech Corp", "50", "CEO"],
+    ["Jane", "Smith", "jane@gmail.com", "Small", "5", "Intern"],
+    ["Bad", "Row", "not-an-email", "Corp", "50", "CEO"],
+]
+
+
+@pytest.fixture
+def leads_csv(tmp_path):
+    path = tmp_path / "leads.csv"
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(HEADER + ["crm_id"])
+        for index, row in enumerate(ROWS):
+            writer.writerow(row + [f"crm-{index}"])
+    return path
+
+
+@pytest.fixture
+def leads_ndjson(tmp_path):
+    path = tmp_path / "leads.ndjson"
+    lines = [json.dumps(dict(zip(HEADER, row))) for row in ROWS]
+    path.write_text("\n".join(lines + ["[1, 2]"]) + "\n", encoding="utf-8")
+    return path
+
+
+def read_csv(path) -> list[dict]:
+    with open(path, encoding="utf-8", newline="") as f:
+        return list(csv.DictReader(f))
+
+
+class TestQualifyCommand:
+    """Test class for `python -m app.cli qualify`."""
+
+    @pytest.mark.parametrize("workers", ["1", "2"])
+    def test_csv_rows_are_qualified_in_order(self, leads_csv, tmp_path, workers):
+        """Test that every CSV row is qualified in order, in-process and pooled."""
+        output = tmp_path / "out.csv"
+        exit_code = main(
+            [
+                "qualify",
+                str(leads_csv),
+                "-o",
+                str(output),
+                "--workers",
+                workers,
+                "--chunk-size",
+                "1",
+                "--quiet",
+            ]
+        )
+
+        rows = read_csv(output)
+        assert exit_code == 0
+        assert [row["crm_id"] for row in rows] == ["crm-0", "crm-1", "crm-2"]
+        assert rows[0]["status"] == "Qualified"
+        assert rows[1]["status"] == "Unqualified"
+        assert "Company size is too small" in rows[1]["qualification_notes"]
+        assert rows[2]["status"] == ""
+        assert rows[2]["errors"].startswith("email:")
+
+    def test_ndjson_input_to_ndjson_output(self, leads_ndjson, tmp_path):
+        """Test that NDJSON input is written back as NDJSON with results."""
+        output = tmp_path / "out.ndjson"
+        main(
+            [
+                "qualify",
+                str(leads_ndjson),
+                "-o",
+                str(output),
+                "--workers",
+                "1",
+                "--quiet",
+            ]
+        )
+
+        records = [json.loads(line) for line in output.read_text().splitlines()]
+        assert [record["status"] for record in records] == [
+            "Qualified",
+            "Unqualified",
+            None,
+            None,
+        ]
+        assert records[3]["errors"] == ["row: row is not a JSON object"]
+
+    def test_output_format_can_differ_from_input(self, leads_ndjson, tmp_path):
+        """Test that NDJSON input can be written as CSV."""
+        output = tmp_path / "out.csv"
+        main(
+            [
+                "qualify",
+                str(leads_ndjson),
+                "-o",
+                str(output),
+                "--workers",
+                "1",
+                "--quiet",
+            ]
+        )
+
+        rows = read_csv(output)
+        assert list(rows[0]) == HEADER + [
+            "status",
+            "qualification_notes",
+            "score",
+            "company_size_source",
+            "errors",
+        ]
+        assert len(rows) == 4
+        assert float(rows[0]["score"]) > float(rows[1]["score"])
+        assert rows[2]["score"] == ""
+
+    def test_summary_reports_rows_per_second(self, leads_csv, tmp_path, capsys):
+        """Test that a rows/sec summary is printed to stderr."""
+        main(
+            [
+                "qualify",
+                str(leads_csv),
+                "-o",
+                str(tmp_path / "out.csv"),
+                "--workers",
+                "1",
+            ]
+        )
+
+        summary = capsys.readouterr().err
+        assert "rows=3 qualified=1 unqualified=1 invalid=1" in summary
+        assert "rows/sec" in summary
+
+
+class TestIterChunks:
+    """Test class for lazy chunking."""
+
+    def test_chunks_are_bounded(self):
+        """Test that rows are split into chunks of at most the given size."""
+        assert list(iter_chunks(range(5), 2)) == [[0, 1], [2, 3], [4]]
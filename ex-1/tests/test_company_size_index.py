@@ -0,0 +1,170 @@
+"""
+Test cases for the memory-mapped company size index
+"""
+
+import json
+import pytest
+from app.cli import main
+from app.services.company_size_index import (
+    CompanySizeIndex,
+    build_company_size_index,
+)
+from app.services.lead_qualification import LeadQualification, qualify_leads
+from app.services.lead_stream import output_fields, qualify_chunk
+from app.services.qualification_rules import (
+    COMPANY_SIZE_NOTE,
+    RulesFileError,
+    compile_rules,
+)
+
+RULES = {
+    "min_company_size": 10,
+    "decision_maker_roles": ["CEO", "CTO"],
+    "forbidden_domains": ["gmail.com"],
+}
+HEADCOUNTS = [
+    ("acme.com", 5000),
+    ("Tiny.IO", 3),
+    ("zeta.example.org", 120),
+    ("acme.com", 4000),
+]
+
+
+@pytest.fixture
+def index_path(tmp_path):
+    path = tmp_path / "sizes.idx"
+    build_company_size_index(HEADCOUNTS, path)
+    return path
+
+
+@pytest.fixture
+def rules(tmp_path, index_path):
+    path = tmp_path / "rules.json"
+    path.write_text(
+        json.dumps({**RULES, "company_size_index": index_path.name}), encoding="utf-8"
+    )
+    return compile_rules(path)
+
+
+class TestCompanySizeIndex:
+    """Test class for building and searching the index."""
+
+    def test_lookups(self, index_path):
+        """Test exact, case-insensitive, parent-domain and missing lookups."""
+        index = CompanySizeIndex(index_path)
+
+        assert len(index) == 3
+        assert index.get("acme.com") == 4000
+        assert index.get("TINY.io") == 3
+        assert index.get("eu.sales.acme.com") == 4000
+        assert index.get("zeta.example.org") == 120
+        assert index.get("example.org") is None
+        assert index.get("com") is None
+        assert index.get("unknown.net") is None
+
+    def test_many_domains_are_searchable(self, tmp_path):
+        """Test that every key of a larger index is found."""
+        entries = [(f"company{i}.example.com", i + 1) for i in range(5000)]
+        build_company_size_index(entries, tmp_path / "big.idx")
+        index = CompanySizeIndex(tmp_path / "big.idx")
+
+        assert all(index.get(domain) == size for domain, size in entries)
+        assert index.get("company5000.example.com") is None
+
+    def test_empty_index(self, tmp_path):
+        """Test that an index without domains finds nothing."""
+        build_company_size_index([], tmp_path / "empty.idx")
+
+        assert CompanySizeIndex(tmp_path / "empty.idx").get("acme.com") is None
+
+    def test_other_files_are_rejected(self, tmp_path):
+        """Test that a file that is not an index cannot be opened."""
+        path = tmp_path / "sizes.idx"
+        path.write_bytes(b"domain,headcount\nacme.com,5000\n")
+
+        with pytest.raises(ValueError):
+            CompanySizeIndex(path)
+
+    def test_rebuild_replaces_the_file(self, index_path):
+        """Test that an open index keeps working while the file is rebuilt."""
+        index = CompanySizeIndex(index_path)
+
+        build_company_size_index([("acme.com", 7)], index_path)
+
+        assert index.get("acme.com") == 4000
+        assert CompanySizeIndex(index_path).get("acme.com") == 7
+
+
+class TestCompanySizeQualification:
+    """Test class for qualifying with indexed company sizes."""
+
+    def test_index_overrides_self_reported_size(self, rules, make_lead):
+        """Test that a listed domain is qualified with its indexed headcount."""
+        result = LeadQualification(
+            make_lead(email="jo@tiny.io", company_size=500), rules=rules
+        ).save()
+
+        assert result.status == "Unqualified"
+        assert result.qualification_notes == [COMPANY_SIZE_NOTE]
+        assert result.company_size_source == "index"
+        assert result.lead.company_size == 500
+
+    def test_unlisted_domain_uses_form_size(self, rules, make_lead):
+        """Test that the self-reported size is used when the domain is unknown."""
+        result = LeadQualification(
+            make_lead(email="jo@other.com", company_size=50), rules=rules
+        ).save()
+
+        assert result.status == "Qualified"
+        assert result.company_size_source == "form"
+
+    def test_batch_and_stream_paths_use_the_index(self, rules, make_lead):
+        """Test that batch qualification and the CLI chunks agree."""
+        leads = [
+            make_lead(email="jo@acme.com", company_size=5),
+            make_lead(email="jo@other.com", company_size=5),
+        ]
+        results = qualify_leads(leads, rules=rules)
+        chunk = qualify_chunk(
+            [lead.model_dump() for lead in leads],
+            "ndjson",
+            output_fields(None),
+            rules,
+        )
+        records = [json.loads(line) for line in chunk.text.splitlines()]
+
+        assert [r.status for r in results] == ["Qualified", "Unqualified"]
+        assert [r.company_size_source for r in results] == ["index", "form"]
+        assert [r["status"] for r in records] == ["Qualified", "Unqualified"]
+        assert [r["company_size_source"] for r in records] == ["index", "form"]
+
+    def test_missing_index_is_a_rules_file_error(self, tmp_path):
+        """Test that a rules file naming a missing index fails to compile."""
+        path = tmp_path / "rules.json"
+        path.write_text(
+            json.dumps({**RULES, "company_size_index": "missing.idx"}),
+            encoding="utf-8",
+        )
+
+        with pytest.raises(RulesFileError):
+            compile_rules(path)
+
+
+class TestBuildSizeIndexCommand:
+    """Test class for `python -m app.cli build-size-index`."""
+
+    def test_csv_is_indexed(self, tmp_path):
+        """Test that the command builds a searchable index from CSV."""
+        source = tmp_path / "headcounts.csv"
+        source.write_text("domain,headcount\nacme.com,5000\n", encoding="utf-8")
+        output = tmp_path / "sizes.idx"
+
+        assert main(["build-size-index", str(source), "-o", str(output)]) == 0
+        assert CompanySizeIndex(output).get("acme.com") == 5000
+
+    def test_invalid_headcount_fails(self, tmp_path):
+        """Test that a bad headcount is reported instead of indexed."""
+        source = tmp_path / "headcounts.csv"
+        source.write_text("domain,headcount\nacme.com,many\n", encoding="utf-8")
+
+        assert main(["build-size-index", str(source), "-o", str(tmp_path / "x")]) == 1
@@ -0,0 +1,89 @@
+"""
+Test cases for the blocked email domain index
+"""
+
+import pytest
+from app.models.lead import Lead
+from app.services.domain_index import DomainIndex, read_domain_list
+from app.services.lead_qualification import LeadQualification
+from app.services.qualification_rules import DEFAULT_RULES_PATH, compile_rules
+
+
+@pytest.fixture
+def index():
+    return DomainIndex(["yahoo.com", "Yahoo.co.uk", " mailinator.com. "])
+
+
+class TestDomainIndex:
+    """Test class for exact and parent-domain matching."""
+
+    def test_exact_domain_matches(self, index):
+        """Test that listed domains match exactly, case-insensitively."""
+        assert index.match("yahoo.com") == "yahoo.com"
+        assert "YAHOO.CO.UK" in index
+        assert "mailinator.com" in index
+
+    def test_subdomains_match_parent_domain(self, index):
+        """Test that subdomains of a listed domain are matched."""
+        assert index.match("mail.yahoo.com") == "yahoo.com"
+        assert index.match("a.b.yahoo.co.uk") == "yahoo.co.uk"
+
+    def test_only_whole_labels_match(self, index):
+        """Test that a domain merely ending with a listed name does not match."""
+        assert "notyahoo.com" not in index
+        assert "yahoo.com.evil.io" not in index
+        assert "co.uk" not in index
+        assert "com" not in index
+
+    def test_domain_list_skips_comments_and_blanks(self, tmp_path):
+        """Test that list files ignore comments and blank lines."""
+        path = tmp_path / "domains.txt"
+        path.write_text("# header\n\ngmail.com\n  # indented comment\nyopmail.com\n")
+
+        assert read_domain_list(path) == ["gmail.com", "yopmail.com"]
+        assert len(DomainIndex.from_files([path], extra=["gmail.com"])) == 2
+
+
+class TestBundledDomainList:
+    """Test class for the bundled free/disposable provider list."""
+
+    @pytest.mark.parametrize(
+        "email",
+        [
+            "jane@mail.yahoo.com",
+            "jane@yahoo.co.uk",
+            "jane@hotmail.com",
+            "jane@mailinator.com",
+            "jane@proton.me",
+            "jane@abyssmail.com",
+            "jane@inbox.pe.hu",
+        ],
+    )
+    def test_free_and_disposable_providers_are_forbidden(self, email):
+        """Test that providers from the bundled list fail the email rule."""
+        lead = Lead(
+            first_name="Jane",
+            last_name="Doe",
+            email=email,
+            company_name="Tech Corp",
+            company_size=50,
+            role="CEO",
+        )
+        result = LeadQualification(lead).save()
+
+        assert result.status == "Unqualified"
+        assert result.qualification_notes == ["Email domain is forbidden"]
+
+    @pytest.mark.parametrize(
+        "name", ["free_email_domains.txt", "disposable_email_domains.txt"]
+    )
+    def test_business_domains_are_not_listed(self, name):
+        """Test that the bundled lists contain no bare public suffixes."""
+        domains = read_domain_list(DEFAULT_RULES_PATH.parent / name)
+
+        assert all("." in domain for domain in domains)
+        assert "company.com" not in DomainIndex(domains)
+
+    def test_bundled_lists_cover_thousands_of_providers(self):
+        """Test that the default rules block several thousand providers."""
+        assert len(compile_rules(DEFAULT_RULES_PATH).forbidden_domains) > 9000
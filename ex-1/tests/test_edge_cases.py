@@ -191,21 +191,21 @@ class TestEdgeCases:
         assert data["status"] == "Unqualified"
         assert "Company size is too small" in data["qualification_notes"][0]
 
-    def test_multiple_valid_roles_in_string_returns_unqualified(self, client):
-        """Test that role containing multiple valid roles returns unqualified (exact match required)."""
+    def test_multiple_valid_roles_in_string_returns_qualified(self, client):
+        """Test that a title naming several valid roles is qualified (normalized)."""
         valid_data = {
             "first_name": "John",
             "last_name": "Doe",
             "email": "john@company.com",
             "company_name": "Tech Corp",
             "company_size": 50,
-            "role": "CEO and CTO",  # Contains valid role but not exact match
+            "role": "CEO and CTO",  # Contains valid roles, not an exact match
         }
         response = client.post("/leads", json=valid_data)
         assert response.status_code == 201
         data = response.json()
-        assert data["status"] == "Unqualified"
-        assert "Role is not a decision-maker" in data["qualification_notes"][0]
+        assert data["status"] == "Qualified"
+        assert data["qualification_notes"] is None
 
     def test_role_with_extra_spaces_returns_qualified(self, client):
         """Test that role with extra spaces returns qualified (whitespace is stripped)."""
@@ -366,11 +366,11 @@ class TestEdgeCases:
         """Test that all valid roles return qualified."""
         valid_roles = ["CEO", "CTO", "Founder", "VP of Engineering"]
 
-        for role in valid_roles:
+        for index, role in enumerate(valid_roles):
             valid_data = {
                 "first_name": "John",
                 "last_name": "Doe",
-                "email": "john@company.com",
+                "email": f"john{index}@company.com",
                 "company_name": "Tech Corp",
                 "company_size": 50,
                 "role": role,
@@ -384,11 +384,11 @@ class TestEdgeCases:
         """Test that case-insensitive valid roles return qualified."""
         case_variations = ["ceo", "CTO", "founder", "vp of engineering"]
 
-        for role in case_variations:
+        for index, role in enumerate(case_variations):
             valid_data = {
                 "first_name": "John",
                 "last_name": "Doe",
-                "email": "john@company.com",
+                "email": f"john{index}@company.com",
                 "company_name": "Tech Corp",
                 "company_size": 50,
                 "role": role,
@@ -402,11 +402,11 @@ class TestEdgeCases:
         """Test that mixed case valid roles return qualified."""
         mixed_case_roles = ["Ceo", "cTo", "FOUNDER", "Vp Of Engineering"]
 
-        for role in mixed_case_roles:
+        for index, role in enumerate(mixed_case_roles):
             valid_data = {
                 "first_name": "John",
                 "last_name": "Doe",
-                "email": "john@company.com",
+                "email": f"john{index}@company.com",
                 "company_name": "Tech Corp",
                 "company_size": 50,
                 "role": role,
@@ -0,0 +1,103 @@
+"""
+Test cases for the cached lead email validation
+"""
+
+import pytest
+from pydantic import ValidationError
+from pydantic.networks import validate_email
+from pydantic_core import PydanticCustomError
+from app.models.email import domain_cache_info, validate_lead_email
+from app.models.lead import Lead
+from app.services.lead_batch import ingest_lead_batch
+
+EMAILS = [
+    "john.doe@company.com",
+    "John.Doe@Company.COM",
+    "Postmaster@example.com",
+    "first+tag@sub.domain.example.org",
+    "o'brien@example.ie",
+    "user@xn--bcher-kva.example",
+    "user@bücher.example",
+    "user@BÜCHER.example",
+    "josé@example.com",
+    "John Doe <john@example.com>",
+    '"quoted local"@example.com',
+    " padded@example.com ",
+    "a" * 64 + "@example.com",
+    "a" * 65 + "@example.com",
+    "user@" + "a" * 63 + "." + "b" * 63 + "." + "c" * 63 + "." + "d" * 50 + ".com",
+    "user@localhost",
+    "user@example",
+    "user@-example.com",
+    "user@example..com",
+    "user@[127.0.0.1]",
+    "user@invalid",
+    "user.@example.com",
+    ".user@example.com",
+    "us..er@example.com",
+    "user@@example.com",
+    "user@example.com@other.com",
+    "no-at-sign",
+    "@example.com",
+    "user@",
+    "",
+]
+
+
+def outcome(validator, email: str) -> tuple[str, str]:
+    try:
+        return "ok", validator(email)
+    except PydanticCustomError as exc:
+        return "error", str(exc)
+
+
+class TestValidateLeadEmail:
+    """Test class for validate_lead_email."""
+
+    @pytest.mark.parametrize("email", EMAILS)
+    def test_matches_email_str(self, email):
+        """Test that results and errors are identical to pydantic's EmailStr."""
+        expected = outcome(lambda value: validate_email(value)[1], email)
+
+        assert outcome(validate_lead_email, email) == expected
+        # A second call is served from the domain cache
+        assert outcome(validate_lead_email, email) == expected
+
+    def test_domains_are_cached(self):
+        """Test that repeated domains hit the cache."""
+        validate_lead_email("first@cache-test.example.com")
+        hits = domain_cache_info().hits
+
+        validate_lead_email("second@cache-test.example.com")
+
+        assert domain_cache_info().hits == hits + 1
+
+
+class TestLeadEmailField:
+    """Test class for the Lead.email field."""
+
+    def test_invalid_email_error_is_unchanged(self, valid_lead_data):
+        """Test that an invalid email still reports EmailStr's value_error."""
+        with pytest.raises(ValidationError) as exc_info:
+            Lead(**{**valid_lead_data, "email": "user@invalid"})
+
+        error = exc_info.value.errors()[0]
+        assert error["type"] == "value_error"
+        assert error["loc"] == ("email",)
+        assert error["msg"].startswith("value is not a valid email address:")
+
+    def test_json_schema_is_email_format(self):
+        """Test that the OpenAPI schema still declares an email string."""
+        schema = Lead.model_json_schema()["properties"]["email"]
+
+        assert schema == {"type": "string", "format": "email", "title": "Email"}
+
+    def test_batch_falls_back_to_lax_validation(self, valid_lead_data):
+        """Test that coercible values pass after the strict batch pass fails."""
+        rows = [valid_lead_data, {**valid_lead_data, "company_size": "50"}]
+        body = str(rows).replace("'", '"').encode()
+
+        result = ingest_lead_batch(body, "application/json", 10)
+
+        assert result.accepted == 2
+        assert result.items[1].result.lead.company_size == 50
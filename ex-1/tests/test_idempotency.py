@@ -0,0 +1,204 @@
+"""
+Test cases for Idempotency-Key handling
+"""
+
+import asyncio
+import sqlite3
+import pytest
+from app.services.idempotency import (
+    IdempotencyCache,
+    IdempotencyKeyReusedError,
+    IdempotencyRecord,
+    SharedIdempotencyStore,
+)
+
+
+def record(body: bytes = b"{}", fingerprint: str = "f") -> IdempotencyRecord:
+    return IdempotencyRecord(201, body, fingerprint)
+
+
+class TestIdempotencyCache:
+    """Test class for the TTL-bounded response cache."""
+
+    def test_entries_expire_after_ttl(self, clock):
+        """Test that entries are evicted once their TTL has passed."""
+        cache = IdempotencyCache(ttl=10, clock=clock)
+        cache.put("a", record())
+        clock.now += 5
+        cache.put("b", record())
+
+        clock.now += 5
+        assert cache.get("a") is None
+        assert cache.get("b") is not None
+        assert len(cache) == 1
+
+    def test_size_cap_evicts_oldest(self):
+        """Test that the cache never holds more than max_entries keys."""
+        cache = IdempotencyCache(max_entries=3)
+        for key in "abcde":
+            cache.put(key, record())
+
+        assert len(cache) == 3
+        assert cache.get("a") is None
+        assert cache.get("e") is not None
+
+    @pytest.mark.asyncio
+    async def test_concurrent_requests_compute_once(self):
+        """Test that requests with the same key wait for the first one."""
+        cache = IdempotencyCache()
+        calls = 0
+
+        async def compute() -> IdempotencyRecord:
+            nonlocal calls
+            calls += 1
+            await asyncio.sleep(0.01)
+            return record(b'{"n": 1}')
+
+        results = await asyncio.gather(
+            *(cache.run("k", "f", compute) for _ in range(5))
+        )
+
+        assert calls == 1
+        assert [replayed for _, replayed in results].count(False) == 1
+        assert {r.body for r, _ in results} == {b'{"n": 1}'}
+
+    @pytest.mark.asyncio
+    async def test_failed_request_is_not_cached(self):
+        """Test that a failure lets the next request compute the response."""
+        cache = IdempotencyCache()
+
+        async def fail() -> IdempotencyRecord:
+            raise RuntimeError("boom")
+
+        async def succeed() -> IdempotencyRecord:
+            return record()
+
+        with pytest.raises(RuntimeError):
+            await cache.run("k", "f", fail)
+        _, replayed = await cache.run("k", "f", succeed)
+
+        assert replayed is False
+
+    @pytest.mark.asyncio
+    async def test_reused_key_with_other_body_raises(self):
+        """Test that a key cannot be replayed for a different request."""
+        cache = IdempotencyCache()
+
+        async def compute() -> IdempotencyRecord:
+            return record(fingerprint="first")
+
+        await cache.run("k", "first", compute)
+        with pytest.raises(IdempotencyKeyReusedError):
+            await cache.run("k", "second", compute)
+
+    @pytest.mark.asyncio
+    async def test_shared_store_is_seen_by_other_workers(self, tmp_path):
+        """Test that a response stored by one worker is replayed by another."""
+        path = str(tmp_path / "idempotency.db")
+        first = IdempotencyCache(shared=SharedIdempotencyStore(path, ttl=60))
+        second = IdempotencyCache(shared=SharedIdempotencyStore(path, ttl=60))
+
+        async def compute() -> IdempotencyRecord:
+            return record(b'{"worker": 1}')
+
+        try:
+            await first.run("k", "f", compute)
+            replay, replayed = await second.run("k", "f", compute)
+        finally:
+            first.close()
+            second.close()
+
+        assert replayed is True
+        assert replay.body == b'{"worker": 1}'
+
+    @pytest.mark.asyncio
+    async def test_find_looks_in_the_shared_store(self, tmp_path):
+        """Test that a response stored by another worker is found without a claim."""
+        path = str(tmp_path / "idempotency.db")
+        first = IdempotencyCache(shared=SharedIdempotencyStore(path, ttl=60))
+        second = IdempotencyCache(shared=SharedIdempotencyStore(path, ttl=60))
+
+        async def compute() -> IdempotencyRecord:
+            return record(b'{"worker": 1}')
+
+        try:
+            assert await second.find("k") is None
+            await first.run("k", "f", compute)
+            found = await second.find("k")
+        finally:
+            first.close()
+            second.close()
+
+        assert found.body == b'{"worker": 1}'
+
+
+class TestSharedIdempotencyStore:
+    """Test class for bounding the shared SQLite idempotency table."""
+
+    def keys(self, path) -> list[str]:
+        with sqlite3.connect(path) as db:
+            return [key for (key,) in db.execute("SELECT key FROM idempotency")]
+
+    def test_oldest_responses_over_the_cap_are_purged(self, tmp_path):
+        """Test that puts purge the table down to max_entries, oldest first."""
+        path = str(tmp_path / "idempotency.db")
+        store = SharedIdempotencyStore(path, ttl=60, max_entries=2, purge_interval=2)
+        try:
+            for key in ("a", "b", "c", "d"):
+                store.put(key, record())
+        finally:
+            store.close()
+
+        assert sorted(self.keys(path)) == ["c", "d"]
+        assert store.purged == 2
+
+    def test_expired_rows_are_purged_on_open(self, tmp_path):
+        """Test that a starting worker deletes the rows that have expired."""
+        path = str(tmp_path / "idempotency.db")
+        store = SharedIdempotencyStore(path, ttl=-1)
+        store.put("expired", record())
+        store.close()
+
+        reopened = SharedIdempotencyStore(path, ttl=60)
+        reopened.close()
+
+        assert self.keys(path) == []
+        assert reopened.purged == 1
+
+
+class TestIdempotencyEndpoint:
+    """Test class for Idempotency-Key on POST /leads."""
+
+    def test_retry_replays_first_response(self, client, valid_lead_data):
+        """Test that a retried request returns the same lead_id and status."""
+        headers = {"Idempotency-Key": "form-123"}
+        first = client.post("/leads", json=valid_lead_data, headers=headers)
+        retry = client.post("/leads", json=valid_lead_data, headers=headers)
+
+        assert first.status_code == retry.status_code == 201
+        assert retry.json() == first.json()
+        assert first.headers["Idempotent-Replayed"] == "false"
+        assert retry.headers["Idempotent-Replayed"] == "true"
+
+    def test_reused_key_with_other_lead_returns_422(self, client, valid_lead_data):
+        """Test that reusing a key for a different lead is rejected."""
+        headers = {"Idempotency-Key": "form-123"}
+        client.post("/leads", json=valid_lead_data, headers=headers)
+        response = client.post(
+            "/leads",
+            json={**valid_lead_data, "email": "other@company.com"},
+            headers=headers,
+        )
+
+        assert response.status_code == 422
+
+    def test_stats_count_replays(self, client, valid_lead_data):
+        """Test that the cache stats endpoint reports replayed responses."""
+        headers = {"Idempotency-Key": "form-123"}
+        for _ in range(2):
+            client.post("/leads", json=valid_lead_data, headers=headers)
+
+        stats = client.get("/leads/idempotency/stats").json()
+        assert stats["entries"] == 1
+        assert stats["hits"] == 1
+        assert stats["misses"] == 1
@@ -0,0 +1,188 @@
+"""
+Test cases for duplicate lead detection
+"""
+
+import asyncio
+import pytest
+from app.services.lead_dedup import (
+    BloomFilter,
+    LeadDeduplicator,
+    bloom_sizing,
+    dedup_key,
+)
+from app.services.lead_qualification import LeadQualification
+from app.services.lead_store import LeadStore
+
+
+class TestBloomFilter:
+    """Test class for the Bloom filter."""
+
+    def test_added_keys_are_always_found(self):
+        """Test that a Bloom filter has no false negatives."""
+        bloom = BloomFilter(capacity=1000, error_rate=0.01)
+        keys = [f"user{i}@company.com" for i in range(1000)]
+        for key in keys:
+            bloom.add(key)
+
+        assert all(key in bloom for key in keys)
+
+    def test_false_positive_rate_is_near_target(self):
+        """Test that the observed false-positive rate at capacity is near target."""
+        bloom = BloomFilter(capacity=5000, error_rate=0.01)
+        for i in range(5000):
+            bloom.add(f"member{i}")
+
+        false_positives = sum(f"other{i}" in bloom for i in range(20000))
+        assert false_positives / 20000 < 0.02
+        assert bloom.false_positive_rate() == pytest.approx(0.01, rel=0.2)
+
+    def test_sizing_for_fifty_million_leads(self):
+        """Test the standard m = -n ln p / (ln 2)^2 sizing."""
+        size_bits, hash_count = bloom_sizing(50_000_000, 0.001)
+
+        assert size_bits // 8 == pytest.approx(89_860_000, rel=0.01)
+        assert hash_count == 10
+
+
+class TestLeadDeduplicator:
+    """Test class for duplicate detection against the lead store."""
+
+    def test_dedup_key_normalizes_email_and_company(self):
+        """Test that case and whitespace do not change the key."""
+        assert dedup_key(" John@Company.com ", "Tech   Corp") == dedup_key(
+            "john@company.com", "tech corp"
+        )
+
+    @pytest.mark.asyncio
+    async def test_stored_lead_is_found_after_restart(self, tmp_path, make_lead):
+        """Test that the filter is rebuilt from the store on startup."""
+        store = LeadStore(tmp_path)
+        result = LeadQualification(make_lead()).save()
+        await store.append(result)
+        store.close()
+
+        reopened = LeadStore(tmp_path)
+        try:
+            deduplicator = LeadDeduplicator(reopened, 1000, 0.01)
+            assert deduplicator.find_original(make_lead(role="CTO")) == result
+            assert deduplicator.find_original(make_lead(company_name="Other")) is None
+        finally:
+            reopened.close()
+
+    def test_in_flight_lead_is_a_duplicate(self, lead_store, make_lead):
+        """Test that a claimed lead is detected before it is durable."""
+        deduplicator = LeadDeduplicator(lead_store, 1000, 0.01)
+        result = LeadQualification(make_lead()).save()
+        deduplicator.claim(result)
+
+        assert deduplicator.find_original(make_lead()) is result
+
+    def test_resolve_flags_duplicates_within_a_batch(self, lead_store, make_lead):
+        """Test that repeated leads in one batch resolve to the first one."""
+        deduplicator = LeadDeduplicator(lead_store, 1000, 0.01)
+        results = [LeadQualification(make_lead()).save() for _ in range(3)]
+
+        resolved, duplicate_flags = deduplicator.resolve(results)
+
+        assert duplicate_flags == [False, True, True]
+        assert all(result is results[0] for result in resolved)
+
+    @pytest.mark.asyncio
+    async def test_lead_stored_by_another_worker_is_a_duplicate(
+        self, tmp_path, make_lead
+    ):
+        """Test that the filter learns leads written to a shared store directory."""
+        store, other_worker = LeadStore(tmp_path), LeadStore(tmp_path)
+        try:
+            deduplicator = LeadDeduplicator(store, 1000, 0.01)
+            result = LeadQualification(make_lead()).save()
+            await other_worker.append(result)
+            store.refresh()
+
+            assert deduplicator.find_original(make_lead()) == result
+            resolved, duplicate_flags = deduplicator.resolve(
+                [LeadQualification(make_lead(email="new@company.com")).save()]
+            )
+            assert duplicate_flags == [False]
+            assert deduplicator.stats()["keys"] == 2
+        finally:
+            store.close()
+            other_worker.close()
+
+    @pytest.mark.asyncio
+    async def test_background_refresh_learns_other_workers_leads(
+        self, tmp_path, make_lead
+    ):
+        """Test that the refresh thread adds other workers' leads to the filter."""
+        store, other_worker = LeadStore(tmp_path), LeadStore(tmp_path)
+        deduplicator = LeadDeduplicator(store, 1000, 0.01, refresh_interval=0.01)
+        try:
+            result = LeadQualification(make_lead()).save()
+            await other_worker.append(result)
+            await asyncio.sleep(0.1)
+
+            assert deduplicator.find_original(make_lead()) == result
+        finally:
+            deduplicator.close()
+            store.close()
+            other_worker.close()
+
+    def test_new_lead_does_not_touch_storage(self, lead_store, make_lead, monkeypatch):
+        """Test that a Bloom miss answers without refreshing or reading the store."""
+        deduplicator = LeadDeduplicator(lead_store, 1000, 0.01)
+
+        def fail():
+            raise AssertionError("store was read")
+
+        monkeypatch.setattr(lead_store, "refresh", fail)
+        monkeypatch.setattr(lead_store, "find_by_email", fail)
+
+        assert deduplicator.find_original(make_lead()) is None
+        assert deduplicator.resolve([LeadQualification(make_lead()).save()])[1] == [
+            False
+        ]
+
+
+class TestDedupEndpoints:
+    """Test class for duplicate handling over the API."""
+
+    def test_resubmitted_lead_returns_original(self, client, valid_lead_data):
+        """Test that a resubmit returns 200 with the original lead_id and status."""
+        first = client.post("/leads", json=valid_lead_data)
+        resubmit = client.post(
+            "/leads", json={**valid_lead_data, "email": "JOHN.DOE@company.com"}
+        )
+
+        assert first.status_code == 201
+        assert resubmit.status_code == 200
+        assert resubmit.json()["lead_id"] == first.json()["lead_id"]
+        assert resubmit.json()["status"] == first.json()["status"]
+
+    def test_same_email_other_company_is_a_new_lead(self, client, valid_lead_data):
+        """Test that dedup is keyed on email and company together."""
+        first = client.post("/leads", json=valid_lead_data)
+        other = client.post("/leads", json={**valid_lead_data, "company_name": "Other"})
+
+        assert other.status_code == 201
+        assert other.json()["lead_id"] != first.json()["lead_id"]
+
+    def test_batch_duplicates_are_flagged(self, client, valid_lead_data, lead_store):
+        """Test that batch duplicates carry the original result and are not stored."""
+        first = client.post("/leads", json=valid_lead_data).json()
+        response = client.post("/leads/batch", json=[valid_lead_data] * 2)
+
+        items = response.json()["items"]
+        assert [item["duplicate"] for item in items] == [True, True]
+        assert {item["result"]["lead_id"] for item in items} == {first["lead_id"]}
+        assert len(lead_store) == 1
+
+    def test_stats_report_memory_and_false_positive_rate(self, client, valid_lead_data):
+        """Test the dedup stats endpoint."""
+        client.post("/leads", json=valid_lead_data)
+        client.post("/leads", json=valid_lead_data)
+
+        stats = client.get("/leads/dedup/stats").json()
+        assert stats["keys"] == 1
+        assert stats["duplicates"] == 1
+        assert stats["memory_bytes"] > 0
+        assert 0 <= stats["estimated_false_positive_rate"] < 0.001
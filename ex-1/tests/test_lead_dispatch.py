@@ -0,0 +1,216 @@
+"""
+Test cases for the downstream lead dispatcher, against a local stub sink
+"""
+
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import pytest
+from app.dependencies import get_lead_dispatcher
+from app.main import app
+from app.models.lead import Lead
+from app.services.lead_dispatch import LeadDispatcher
+from app.services.lead_qualification import LeadQualification
+from app.services.metrics import DISPATCH_DROPPED, registry
+
+
+class StubSink:
+    """HTTP server recording every batch POSTed to it."""
+
+    def __init__(self, status: int = 200):
+        self.status = status
+        self.batches: list[list[dict]] = []
+        self.release = threading.Event()
+        self.release.set()
+        sink = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                body = self.rfile.read(int(self.headers["Content-Length"]))
+                sink.release.wait(5)
+                sink.batches.append(json.loads(body))
+                self.send_response(sink.status)
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.server.server_port}/leads"
+        threading.Thread(
+            target=self.server.serve_forever, args=(0.05,), daemon=True
+        ).start()
+
+    @property
+    def lead_ids(self) -> list[str]:
+        return [result["lead_id"] for batch in self.batches for result in batch]
+
+    def close(self) -> None:
+        self.release.set()
+        self.server.shutdown()
+        self.server.server_close()
+
+
+@pytest.fixture
+def sink():
+    stub = StubSink()
+    yield stub
+    stub.close()
+
+
+def make_results(count: int) -> list:
+    return [
+        LeadQualification(
+            Lead(
+                first_name="John",
+                last_name="Doe",
+                email=f"john{i}@company.com",
+                company_name="Tech Corp",
+                company_size=50,
+                role="CEO",
+            )
+        ).save()
+        for i in range(count)
+    ]
+
+
+class TestLeadDispatcher:
+    """Test class for batched delivery to sinks."""
+
+    def test_leads_are_delivered_in_batches_to_every_sink(self, sink):
+        """Test that every lead reaches every sink, at most batch_size at a time."""
+        other = StubSink()
+        dispatcher = LeadDispatcher([sink.url, other.url], batch_size=100)
+        results = make_results(250)
+        try:
+            assert dispatcher.submit_many(results) == 250
+            dispatcher.flush(timeout=10)
+        finally:
+            dispatcher.close()
+            other.close()
+
+        expected = sorted(str(result.lead_id) for result in results)
+        assert sorted(sink.lead_ids) == sorted(other.lead_ids) == expected
+        assert max(len(batch) for batch in sink.batches) <= 100
+        assert dispatcher.stats()["leads_sent"] == 250
+
+    def test_time_window_groups_a_trickle_into_one_batch(self, sink):
+        """Test that leads submitted within the window share a batch."""
+        dispatcher = LeadDispatcher([sink.url], batch_window=0.5)
+        try:
+            for result in make_results(3):
+                dispatcher.submit(result)
+            dispatcher.flush(timeout=10)
+        finally:
+            dispatcher.close()
+
+        assert [len(batch) for batch in sink.batches] == [3]
+
+    def test_full_queue_signals_backpressure(self, sink):
+        """Test that submit returns False once the queue is full."""
+        sink.release.clear()
+        dispatcher = LeadDispatcher([sink.url], max_queue_size=2, batch_window=0)
+        try:
+            accepted = [dispatcher.submit(result) for result in make_results(5)]
+            stats = dispatcher.stats()
+        finally:
+            sink.release.set()
+            dispatcher.close()
+
+        assert accepted == [True, True, False, False, False]
+        assert stats["rejected"] == 3
+        assert stats["queue_depth"] == 2
+
+    def test_reserved_room_is_kept_for_the_submit(self, sink):
+        """Test that reserved room is not taken by other submits."""
+        sink.release.clear()
+        dispatcher = LeadDispatcher([sink.url], max_queue_size=2, batch_window=0)
+        first, second, third = make_results(3)
+        try:
+            assert dispatcher.reserve(2)
+            assert not dispatcher.reserve(1)
+            assert not dispatcher.submit(third)
+            assert dispatcher.submit_many([first, second], reserved=True) == 2
+            stats = dispatcher.stats()
+        finally:
+            sink.release.set()
+            dispatcher.close()
+
+        assert stats["queue_depth"] == 2
+        assert stats["rejected"] == 1
+        assert sorted(sink.lead_ids) == sorted(str(r.lead_id) for r in (first, second))
+
+    def test_failed_sink_is_counted(self):
+        """Test that a sink answering with errors is reported after retries."""
+        failing = StubSink(status=500)
+        dispatcher = LeadDispatcher([failing.url], max_retries=0)
+        dropped = registry.values[DISPATCH_DROPPED.slot()]
+        try:
+            dispatcher.submit_many(make_results(2))
+            dispatcher.flush(timeout=10)
+        finally:
+            dispatcher.close()
+            failing.close()
+
+        stats = dispatcher.stats()
+        assert stats["failed_deliveries"] == 1
+        assert stats["dropped_leads"] == 2
+        assert registry.values[DISPATCH_DROPPED.slot()] == dropped + 2
+        assert stats["batch_latency_ms"]["p50"] is not None
+
+    def test_reserved_submit_after_close_gives_room_back(self, sink):
+        """Test that a reservation is released when the dispatcher has closed."""
+        dispatcher = LeadDispatcher([sink.url], max_queue_size=2)
+        assert dispatcher.reserve(2)
+        dispatcher.close()
+
+        assert dispatcher.submit_many(make_results(2), reserved=True) == 0
+        assert dispatcher.stats()["queue_depth"] == 0
+
+
+class TestDispatchEndpoints:
+    """Test class for lead fan-out from the API."""
+
+    def test_only_qualified_leads_are_dispatched(
+        self, client, sink, valid_lead_data, unqualified_lead_wrong_role
+    ):
+        """Test that POST /leads pushes qualified leads and skips the rest."""
+        dispatcher = LeadDispatcher([sink.url], batch_window=0)
+        app.dependency_overrides[get_lead_dispatcher] = lambda: dispatcher
+        try:
+            qualified = client.post("/leads", json=valid_lead_data).json()
+            client.post("/leads", json=unqualified_lead_wrong_role)
+            dispatcher.flush(timeout=10)
+            stats = client.get("/leads/dispatch/stats").json()
+        finally:
+            dispatcher.close()
+
+        assert sink.lead_ids == [qualified["lead_id"]]
+        assert stats["leads_sent"] == 1
+
+    def test_full_queue_returns_503_without_storing(
+        self, client, sink, lead_store, valid_lead_data
+    ):
+        """Test that a lead is refused rather than dropped when the queue is full."""
+        dispatcher = LeadDispatcher([sink.url])
+        app.dependency_overrides[get_lead_dispatcher] = lambda: dispatcher
+        try:
+            assert dispatcher.reserve(dispatcher.max_queue_size)
+            single = client.post("/leads", json=valid_lead_data)
+            batch = client.post("/leads/batch", json=[valid_lead_data])
+            dispatcher.release(dispatcher.max_queue_size)
+            retried = client.post("/leads", json=valid_lead_data)
+            dispatcher.flush(timeout=10)
+        finally:
+            dispatcher.close()
+
+        assert single.status_code == batch.status_code == 503
+        assert single.headers["Retry-After"] == "1"
+        assert retried.status_code == 201
+        assert len(lead_store) == 1
+        assert sink.lead_ids == [retried.json()["lead_id"]]
+
+    def test_stats_without_sinks_returns_404(self, client):
+        """Test that dispatch stats are unavailable when no sink is configured."""
+        assert client.get("/leads/dispatch/stats").status_code == 404
@@ -0,0 +1,181 @@
+"""
+Test cases for time-ordered lead ids and the streaming lead export
+"""
+
+import csv
+import io
+import json
+import time
+import uuid
+from datetime import datetime, timezone
+import pytest
+from app.models.lead import Lead
+from app.services.lead_export import EXPORT_FIELDS, iter_export
+from app.services.lead_ids import is_uuid7, uuid7, uuid7_floor
+from app.services.lead_qualification import LeadQualification, LeadQualificationResult
+from app.services.lead_store import LeadStore
+
+
+def make_lead(i: int, domain: str = "company.com", company_size: int = 50) -> dict:
+    return {
+        "first_name": f"First{i}",
+        "last_name": f"Last{i}",
+        "email": f"user{i}@{domain}",
+        "company_name": f"Company {i}",
+        "company_size": company_size,
+        "role": "CEO",
+    }
+
+
+def make_result(i: int, lead_id: uuid.UUID | None = None) -> LeadQualificationResult:
+    result = LeadQualification(Lead(**make_lead(i))).save()
+    if lead_id is not None:
+        result.lead_id = lead_id
+    return result
+
+
+class TestLeadIds:
+    """Test class for UUIDv7 lead id generation."""
+
+    def test_ids_are_version_7_and_strictly_increasing(self):
+        """Test that consecutive ids sort in creation order, as UUIDs and strings."""
+        ids = [uuid7() for _ in range(10_000)]
+
+        assert all(lead_id.version == 7 for lead_id in ids)
+        assert all(lead_id.variant == uuid.RFC_4122 for lead_id in ids)
+        assert ids == sorted(ids)
+        assert len(set(ids)) == len(ids)
+        assert [str(i) for i in ids] == sorted(str(i) for i in ids)
+
+    def test_id_embeds_creation_time(self):
+        """Test that the first 48 bits are the Unix time in milliseconds."""
+        before = time.time_ns() // 1_000_000
+        lead_id = uuid7()
+        after = time.time_ns() // 1_000_000
+
+        assert before <= lead_id.int >> 80 <= after
+
+    def test_floor_sorts_between_earlier_and_later_ids(self):
+        """Test that the floor of a time is above older ids and below newer ones."""
+        earlier = uuid7()
+        time.sleep(0.002)
+        floor = uuid7_floor(time.time())
+        later = uuid7()
+
+        assert earlier < floor <= later
+        assert is_uuid7(str(later))
+        assert not is_uuid7(str(uuid.uuid4()))
+
+    def test_saved_leads_get_time_ordered_ids(self):
+        """Test that LeadQualification.save() issues UUIDv7 ids."""
+        assert make_result(0).lead_id.version == 7
+
+
+class TestStoreRecords:
+    """Test class for reading the lead store in lead_id order."""
+
+    @pytest.mark.asyncio
+    async def test_records_are_read_in_id_order_from_start(self, lead_store):
+        """Test that records come back sorted and start at the given id."""
+        results = [make_result(i) for i in range(10)]
+        await lead_store.append_many(reversed(results))
+        ids = [str(result.lead_id) for result in results]
+
+        assert [lead_id for lead_id, _ in lead_store.records()] == ids
+        assert [lead_id for lead_id, _ in lead_store.records(ids[4], 3)] == ids[4:]
+
+    @pytest.mark.asyncio
+    async def test_order_survives_reopen(self, tmp_path):
+        """Test that the sorted index is rebuilt when the store is opened."""
+        store = LeadStore(tmp_path)
+        results = [make_result(i) for i in range(5)]
+        await store.append_many(reversed(results))
+        store.close()
+
+        reopened = LeadStore(tmp_path)
+        records = list(reopened.records())
+        reopened.close()
+
+        assert [lead_id for lead_id, _ in records] == [
+            str(result.lead_id) for result in results
+        ]
+        assert json.loads(records[0][1])["lead"]["email"] == "user0@company.com"
+
+    @pytest.mark.asyncio
+    async def test_since_export_skips_random_ids(self, lead_store):
+        """Test that legacy uuid4 leads are left out of "since" exports only."""
+        await lead_store.append(make_result(0, lead_id=uuid.UUID(int=2**128 - 1)))
+        await lead_store.append(make_result(1))
+
+        everything = b"".join(iter_export(lead_store)).splitlines()
+        since = b"".join(
+            iter_export(lead_store, since=datetime(2020, 1, 1))
+        ).splitlines()
+
+        assert len(everything) == 2
+        assert [json.loads(line)["lead"]["first_name"] for line in since] == ["First1"]
+
+
+class TestExportEndpoint:
+    """Test class for GET /leads/export."""
+
+    def test_ndjson_export_returns_stored_records(self, client):
+        """Test that every stored lead is streamed back, oldest first."""
+        created = [client.post("/leads", json=make_lead(i)).json() for i in range(3)]
+
+        response = client.get("/leads/export")
+
+        assert response.status_code == 200
+        assert response.headers["content-type"] == "application/x-ndjson"
+        assert [json.loads(line) for line in response.text.splitlines()] == created
+
+    def test_since_filter(self, client):
+        """Test that only leads created at or after `since` are exported."""
+        client.post("/leads", json=make_lead(0))
+        time.sleep(0.005)
+        since = datetime.now(timezone.utc)
+        time.sleep(0.005)
+        later = client.post("/leads", json=make_lead(1)).json()
+
+        response = client.get("/leads/export", params={"since": since.isoformat()})
+
+        assert [json.loads(line) for line in response.text.splitlines()] == [later]
+
+    def test_status_and_domain_filters(self, client):
+        """Test that status and email domain (with subdomains) narrow the export."""
+        client.post("/leads", json=make_lead(0, "acme.com"))
+        client.post("/leads", json=make_lead(1, "eu.acme.com"))
+        client.post("/leads", json=make_lead(2, "acme.com", company_size=1))
+        client.post("/leads", json=make_lead(3, "globex.com"))
+
+        response = client.get(
+            "/leads/export", params={"status": "Qualified", "domain": "ACME.com"}
+        )
+
+        emails = [
+            json.loads(line)["lead"]["email"] for line in response.text.splitlines()
+        ]
+        assert emails == ["user0@acme.com", "user1@eu.acme.com"]
+
+    def test_csv_export(self, client):
+        """Test that CSV exports have a header row and one row per lead."""
+        created = client.post("/leads", json=make_lead(0, company_size=1)).json()
+
+        response = client.get("/leads/export", params={"format": "csv"})
+
+        assert response.headers["content-type"].startswith("text/csv")
+        rows = list(csv.DictReader(io.StringIO(response.text)))
+        assert list(rows[0]) == EXPORT_FIELDS
+        assert rows[0]["lead_id"] == created["lead_id"]
+        assert rows[0]["email"] == "user0@company.com"
+        assert rows[0]["status"] == "Unqualified"
+        assert rows[0]["qualification_notes"]
+
+    def test_invalid_parameters_return_422(self, client):
+        """Test that unknown formats, statuses and times are rejected."""
+        for params in ({"format": "xml"}, {"status": "Maybe"}, {"since": "soon"}):
+            assert client.get("/leads/export", params=params).status_code == 422
+
+    def test_export_route_is_not_a_lead_id(self, client):
+        """Test that /leads/export is not captured by /leads/{lead_id}."""
+        assert client.get("/leads/export").status_code == 200
@@ -0,0 +1,216 @@
+"""
+Test cases for the streaming CSV import endpoint
+"""
+
+import asyncio
+import csv
+import io
+import json
+import pytest
+from app.main import app
+from app.services.lead_import import (
+    CsvRowReader,
+    LeadImportFormatError,
+    MultipartCsvReader,
+)
+
+HEADER = "first_name,last_name,email,company_name,company_size,role\n"
+BOUNDARY = "lead-import-boundary"
+
+
+def make_csv(rows: int) -> str:
+    return HEADER + "".join(
+        f"First{i},Last{i},user{i}@company{i}.com,Company {i},50,CEO\n"
+        for i in range(rows)
+    )
+
+
+def multipart_body(csv_text: str, field: str = "file") -> bytes:
+    return (
+        f"--{BOUNDARY}\r\n"
+        'Content-Disposition: form-data; name="source"\r\n\r\n'
+        f"trade-show\r\n"
+        f"--{BOUNDARY}\r\n"
+        f'Content-Disposition: form-data; name="{field}"; filename="leads.csv"\r\n'
+        "Content-Type: text/csv\r\n\r\n"
+        f"{csv_text}\r\n"
+        f"--{BOUNDARY}--\r\n"
+    ).encode()
+
+
+def post_import(client, body: bytes):
+    return client.post(
+        "/leads/import",
+        content=body,
+        headers={"Content-Type": f"multipart/form-data; boundary={BOUNDARY}"},
+    )
+
+
+def ndjson(response) -> list[dict]:
+    return [json.loads(line) for line in response.text.splitlines()]
+
+
+class TestCsvRowReader:
+    """Test class for incremental CSV parsing."""
+
+    def test_rows_match_csv_module_for_any_split(self):
+        """Test that feeding text in tiny pieces yields the same rows as csv."""
+        text = (
+            HEADER
+            + 'Ann,Lee,ann@corp.com,"Corp, ""Inc""\nEurope",50,CEO\r\n'
+            + "\n"
+            + "Bo,Kim,bo@corp.com,Corp,20,CTO"
+        )
+        expected = list(csv.DictReader(io.StringIO(text, newline="")))
+
+        for size in (1, 3, 7, len(text)):
+            reader = CsvRowReader()
+            rows = []
+            for start in range(0, len(text), size):
+                rows.extend(reader.feed(text[start : start + size]))
+            rows.extend(reader.close())
+
+            assert rows == [dict(row) for row in expected]
+
+    def test_long_record_is_rejected(self):
+        """Test that an unterminated quote cannot buffer without bound."""
+        reader = CsvRowReader(max_record_size=100)
+        reader.feed(HEADER + '"never closed\n')
+
+        with pytest.raises(LeadImportFormatError):
+            for _ in range(20):
+                reader.feed("still inside the quoted field\n")
+
+    def test_missing_header_is_rejected(self):
+        """Test that an empty file is reported."""
+        with pytest.raises(LeadImportFormatError):
+            CsvRowReader().close()
+
+
+class TestMultipartCsvReader:
+    """Test class for incremental multipart parsing."""
+
+    def test_byte_by_byte_feed(self):
+        """Test that rows come out as soon as the bytes completing them arrive."""
+        reader = MultipartCsvReader(f"multipart/form-data; boundary={BOUNDARY}")
+        body = multipart_body(make_csv(3))
+        rows = []
+        for i in range(len(body)):
+            rows.extend(reader.feed(body[i : i + 1]))
+        reader.close()
+
+        assert [row["email"] for row in rows] == [
+            "user0@company0.com",
+            "user1@company1.com",
+            "user2@company2.com",
+        ]
+
+    def test_non_multipart_content_type_is_rejected(self):
+        """Test that other content types are refused up front."""
+        with pytest.raises(LeadImportFormatError):
+            MultipartCsvReader("text/csv")
+
+
+class TestLeadImportEndpoint:
+    """Test class for POST /leads/import."""
+
+    def test_rows_are_qualified_and_streamed_as_ndjson(self, client):
+        """Test that every row gets a batch item, invalid rows with errors."""
+        text = make_csv(2) + "Bad,Row,not-an-email,Company,5,CEO\n"
+        response = client.post(
+            "/leads/import", files={"file": ("leads.csv", text, "text/csv")}
+        )
+
+        assert response.status_code == 200
+        assert response.headers["content-type"] == "application/x-ndjson"
+        items = ndjson(response)
+        assert [item["index"] for item in items] == [0, 1, 2]
+        assert items[0]["result"]["status"] == "Qualified"
+        assert items[0]["result"]["lead"]["company_size"] == 50
+        assert items[2]["result"] is None
+        assert items[2]["errors"][0]["loc"] == ["email"]
+
+    def test_imported_leads_are_stored_and_deduplicated(self, client):
+        """Test that imported leads can be fetched and re-imports are duplicates."""
+        body = multipart_body(make_csv(1))
+        first = ndjson(post_import(client, body))[0]
+        second = ndjson(post_import(client, body))[0]
+
+        lead_id = first["result"]["lead_id"]
+        assert client.get(f"/leads/{lead_id}").status_code == 200
+        assert second["duplicate"] is True
+        assert second["result"]["lead_id"] == lead_id
+
+    def test_non_multipart_body_returns_415(self, client, valid_lead_data):
+        """Test that a JSON body is refused before streaming starts."""
+        response = client.post("/leads/import", json=valid_lead_data)
+
+        assert response.status_code == 415
+
+    def test_missing_file_field_ends_with_error_line(self, client):
+        """Test that an upload without a file field reports it in the stream."""
+        response = post_import(client, multipart_body(make_csv(1), field="upload"))
+
+        assert response.status_code == 200
+        assert "error" in ndjson(response)[-1]
+
+    def test_truncated_upload_ends_with_error_line(self, client):
+        """Test that rows before a truncation are kept and the error is last."""
+        body = multipart_body(make_csv(2))
+        items = ndjson(post_import(client, body[: body.rindex(b"\r\n--")]))
+
+        assert items[0]["result"]["status"] == "Qualified"
+        assert "ended before" in items[-1]["error"]
+
+    @pytest.mark.asyncio
+    async def test_results_stream_before_upload_finishes(self, client):
+        """Test that results are sent while the request body is still arriving."""
+        body = multipart_body(make_csv(10))
+        split = body.index(b"First5")
+        chunks = asyncio.Queue()
+        chunks.put_nowait(body[:split])
+        sent = []
+        first_result = asyncio.Event()
+
+        async def receive():
+            if chunks.empty():
+                # Hold back the rest of the upload until a result was sent
+                await first_result.wait()
+                return {"type": "http.request", "body": body[split:]}
+            return {
+                "type": "http.request",
+                "body": await chunks.get(),
+                "more_body": True,
+            }
+
+        async def send(message):
+            sent.append(message)
+            if message["type"] == "http.response.body" and message["body"]:
+                first_result.set()
+
+        scope = {
+            "type": "http",
+            "asgi": {"version": "3.0"},
+            "http_version": "1.1",
+            "method": "POST",
+            "scheme": "http",
+            "path": "/leads/import",
+            "raw_path": b"/leads/import",
+            "query_string": b"",
+            "root_path": "",
+            "headers": [
+                (
+                    b"content-type",
+                    f"multipart/form-data; boundary={BOUNDARY}".encode(),
+                )
+            ],
+            "client": ("test", 1),
+            "server": ("test", 80),
+        }
+        await asyncio.wait_for(app(scope, receive, send), timeout=10)
+
+        bodies = [m["body"] for m in sent if m["type"] == "http.response.body"]
+        first = [json.loads(line) for line in bodies[0].splitlines()]
+        rest = [json.loads(line) for b in bodies[1:] for line in b.splitlines()]
+        assert [item["index"] for item in first] == [0, 1, 2, 3, 4]
+        assert [item["index"] for item in rest] == [5, 6, 7, 8, 9]
@@ -0,0 +1,98 @@
+"""
+Test cases for numeric lead scoring
+"""
+
+import json
+import pytest
+from app.services.lead_qualification import LeadQualification, qualify_leads
+from app.services.qualification_rules import RulesFileError, compile_rules
+
+SCORING = {
+    "company_size_edges": [11, 100],
+    "company_size_weights": [0, 10, 20],
+    "role_weights": {"CEO": 40, "CTO": 30},
+    "default_role_weight": 5,
+    "free_domain_weight": -30,
+    "business_domain_weight": 20,
+}
+
+
+def write_rules(tmp_path, scoring: dict | None) -> object:
+    path = tmp_path / "rules.json"
+    rules = {
+        "min_company_size": 10,
+        "decision_maker_roles": ["CEO", "CTO"],
+        "forbidden_domains": ["gmail.com"],
+    }
+    if scoring is not None:
+        rules["scoring"] = scoring
+    path.write_text(json.dumps(rules), encoding="utf-8")
+    return path
+
+
+@pytest.fixture
+def rules(tmp_path):
+    return compile_rules(write_rules(tmp_path, SCORING))
+
+
+class TestLeadScoring:
+    """Test class for weighted lead scores."""
+
+    @pytest.mark.parametrize(
+        "overrides, score",
+        [
+            ({}, 10 + 40 + 20),
+            ({"company_size": 10}, 0 + 40 + 20),
+            ({"company_size": 11}, 10 + 40 + 20),
+            ({"company_size": 100}, 20 + 40 + 20),
+            ({"role": "CEO and CTO"}, 10 + 40 + 20),
+            ({"role": "Intern"}, 10 + 5 + 20),
+            ({"email": "john@gmail.com"}, 10 + 40 - 30),
+        ],
+    )
+    def test_score_sums_feature_weights(self, rules, overrides, score, make_lead):
+        """Test that the score is the sum of bucket, role and domain weights."""
+        assert rules.scoring.score(make_lead(**overrides)) == score
+
+    def test_batch_scores_match_single_lead_scores(self, rules, make_lead):
+        """Test that vectorized scoring agrees with the per-lead path."""
+        leads = [
+            make_lead(company_size=size, role=role, email=email)
+            for size in (1, 11, 99, 100, 5000)
+            for role in ("CEO", "CTO", "Sales")
+            for email in ("a@company.com", "a@gmail.com")
+        ]
+
+        scores = rules.scoring.score_many(leads)
+
+        assert scores.tolist() == [rules.scoring.score(lead) for lead in leads]
+
+    def test_results_carry_score_and_status(self, rules, make_lead):
+        """Test that qualification results report the score with the status."""
+        lead = make_lead(email="john@gmail.com")
+
+        single = LeadQualification(lead, rules=rules).save()
+        [batch] = qualify_leads([lead], rules=rules)
+
+        assert single.status == batch.status == "Unqualified"
+        assert single.score == batch.score == 20
+
+    def test_scoring_is_optional(self, tmp_path, make_lead):
+        """Test that rules without scoring report no score."""
+        rules = compile_rules(write_rules(tmp_path, None))
+
+        assert rules.scoring is None
+        assert LeadQualification(make_lead(), rules=rules).save().score is None
+
+    def test_bucket_weights_must_match_edges(self, tmp_path):
+        """Test that a weight is required for every company size bucket."""
+        path = write_rules(tmp_path, {**SCORING, "company_size_weights": [0, 10]})
+
+        with pytest.raises(RulesFileError):
+            compile_rules(path)
+
+    def test_api_returns_score(self, client, valid_lead_data):
+        """Test that POST /leads returns the score with the default rules."""
+        response = client.post("/leads", json=valid_lead_data)
+
+        assert isinstance(response.json()["score"], float)
@@ -0,0 +1,246 @@
+"""
+Test cases for the append-only lead store
+"""
+
+import asyncio
+import multiprocessing
+import pytest
+from app.models.lead import Lead
+from app.services.lead_qualification import LeadQualification, LeadQualificationResult
+from app.services.lead_store import (
+    LeadStore,
+    LeadStoreClosedError,
+    LeadStoreWriterError,
+)
+
+
+def make_result(index: int = 0, email: str | None = None) -> LeadQualificationResult:
+    lead = Lead(
+        first_name="John",
+        last_name="Doe",
+        email=email or f"john{index}@company.com",
+        company_name="Tech Corp",
+        company_size=50,
+        role="CEO",
+    )
+    return LeadQualification(lead).save()
+
+
+def append_in_process(directory, count: int, lead_ids) -> None:
+    """Append leads from another process and report their ids."""
+    store = LeadStore(directory)
+    results = [make_result(email=f"worker{i}@company.com") for i in range(count)]
+    asyncio.run(store.append_many(results))
+    store.close()
+    lead_ids.put([str(result.lead_id) for result in results])
+
+
+class TestLeadStore:
+    """Test class for LeadStore persistence and indexing."""
+
+    @pytest.mark.asyncio
+    async def test_appended_lead_can_be_read_back(self, lead_store):
+        """Test that an appended result is readable by lead_id."""
+        result = make_result()
+        await lead_store.append(result)
+
+        assert lead_store.get(str(result.lead_id)) == result
+        assert lead_store.get("unknown") is None
+
+    @pytest.mark.asyncio
+    async def test_leads_survive_reopen(self, tmp_path):
+        """Test that the index is rebuilt from segments on reopen."""
+        store = LeadStore(tmp_path)
+        results = [make_result(i) for i in range(5)]
+        await store.append_many(results)
+        store.close()
+
+        reopened = LeadStore(tmp_path)
+        try:
+            assert len(reopened) == 5
+            assert reopened.get(str(results[3].lead_id)) == results[3]
+        finally:
+            reopened.close()
+
+    @pytest.mark.asyncio
+    async def test_find_by_email_is_case_insensitive(self, lead_store):
+        """Test the email index returns every lead for an address."""
+        first = make_result(email="jane@company.com")
+        second = make_result(email="jane@company.com")
+        await lead_store.append_many([first, second])
+
+        assert lead_store.find_by_email("JANE@company.com") == [first, second]
+
+    @pytest.mark.asyncio
+    async def test_concurrent_appends_share_fsyncs(self, tmp_path):
+        """Test that concurrent appends are group-committed."""
+        store = LeadStore(tmp_path)
+        try:
+            await asyncio.gather(*(store.append(make_result(i)) for i in range(200)))
+
+            assert len(store) == 200
+            assert store.fsync_count < 200
+        finally:
+            store.close()
+
+    @pytest.mark.asyncio
+    async def test_segments_rotate_at_size_limit(self, tmp_path):
+        """Test that a new segment is started once the size limit is reached."""
+        store = LeadStore(tmp_path, segment_max_bytes=600)
+        results = [make_result(i) for i in range(6)]
+        for result in results:
+            await store.append(result)
+        store.close()
+
+        assert len(list(tmp_path.glob("segment-*.log"))) > 1
+        reopened = LeadStore(tmp_path)
+        try:
+            assert [reopened.get(str(r.lead_id)) for r in results] == results
+        finally:
+            reopened.close()
+
+    @pytest.mark.asyncio
+    async def test_partial_trailing_record_is_dropped(self, tmp_path):
+        """Test that a torn write at the end of a segment is truncated on open."""
+        store = LeadStore(tmp_path)
+        result = make_result()
+        await store.append(result)
+        store.close()
+        segment = next(tmp_path.glob("segment-*.log"))
+        with open(segment, "ab") as f:
+            f.write(b'{"lead_id": "torn')
+
+        reopened = LeadStore(tmp_path)
+        try:
+            assert len(reopened) == 1
+            assert reopened.get(str(result.lead_id)) == result
+            assert segment.read_bytes().endswith(b"}\n")
+        finally:
+            reopened.close()
+
+    def test_closed_store_rejects_writes(self, tmp_path):
+        """Test that writing after close raises."""
+        store = LeadStore(tmp_path)
+        store.close()
+
+        with pytest.raises(LeadStoreClosedError):
+            store.submit([make_result()])
+
+    @pytest.mark.asyncio
+    async def test_unserializable_append_fails_alone(self, lead_store):
+        """Test that an append that cannot be serialized fails without the rest."""
+
+        class Unserializable:
+            def model_dump_json(self) -> str:
+                raise ValueError("cannot serialize")
+
+        broken = lead_store.submit([Unserializable()])
+        result = make_result()
+        await asyncio.wait_for(lead_store.append(result), 5)
+
+        with pytest.raises(ValueError):
+            await asyncio.wrap_future(broken)
+        assert lead_store.get(str(result.lead_id)) == result
+        assert len(lead_store) == 1
+
+    @pytest.mark.asyncio
+    async def test_stopped_writer_fails_appends_fast(self, lead_store, monkeypatch):
+        """Test that appends fail instead of hanging once the writer has died."""
+
+        def crash(*args):
+            raise RuntimeError("index corrupted")
+
+        monkeypatch.setattr(lead_store, "_index", crash)
+
+        with pytest.raises(LeadStoreWriterError):
+            await asyncio.wait_for(lead_store.append(make_result()), 5)
+        with pytest.raises(LeadStoreWriterError):
+            lead_store.submit([make_result(1)])
+
+
+class TestLeadStoreSharedDirectory:
+    """Test class for several processes writing to one store directory."""
+
+    @pytest.mark.asyncio
+    async def test_stores_write_their_own_segments(self, tmp_path):
+        """Test that two open stores never share offsets and see each other."""
+        first, second = LeadStore(tmp_path), LeadStore(tmp_path)
+        try:
+            results = [make_result(i) for i in range(20)]
+            for i, result in enumerate(results):
+                await (first if i % 2 else second).append(result)
+
+            assert (first.writer, second.writer) == (0, 1)
+            for store in (first, second):
+                assert [store.get(str(r.lead_id)) for r in results] == results
+                assert store.find_by_email("john7@company.com") == [results[7]]
+                assert len(store) == 20
+        finally:
+            first.close()
+            second.close()
+
+        reopened = LeadStore(tmp_path)
+        try:
+            assert reopened.writer == 0
+            assert [reopened.get(str(r.lead_id)) for r in results] == results
+        finally:
+            reopened.close()
+
+    @pytest.mark.asyncio
+    async def test_leads_written_by_another_process_are_readable(self, tmp_path):
+        """Test that a worker process's leads are read back intact."""
+        store = LeadStore(tmp_path)
+        seen = []
+        store.add_listener(lambda record: seen.append(record["lead_id"]))
+        context = multiprocessing.get_context("fork")
+        lead_ids = context.Queue()
+        worker = context.Process(
+            target=append_in_process, args=(tmp_path, 50, lead_ids)
+        )
+        try:
+            worker.start()
+            own = [make_result(i) for i in range(50)]
+            for result in own:
+                await store.append(result)
+            worker_ids = lead_ids.get(timeout=30)
+            worker.join()
+
+            for lead_id in worker_ids:
+                assert str(store.get(lead_id).lead_id) == lead_id
+            assert [store.get(str(r.lead_id)) for r in own] == own
+            assert store.find_by_email("worker3@company.com")[0].lead.email == (
+                "worker3@company.com"
+            )
+            assert sorted(seen) == sorted(worker_ids)
+            assert len(store) == 100
+        finally:
+            store.close()
+
+
+class TestLeadEndpoints:
+    """Test class for persisted leads over the API."""
+
+    def test_created_lead_can_be_fetched(self, client, valid_lead_data):
+        """Test that GET /leads/{lead_id} returns a lead created by POST /leads."""
+        created = client.post("/leads", json=valid_lead_data).json()
+
+        response = client.get(f"/leads/{created['lead_id']}")
+
+        assert response.status_code == 200
+        assert response.json() == created
+
+    def test_batch_leads_are_persisted(self, client, valid_lead_data, lead_store):
+        """Test that accepted batch rows are stored."""
+        leads = [{**valid_lead_data, "email": f"john{i}@company.com"} for i in range(3)]
+        response = client.post("/leads/batch", json=leads)
+
+        lead_ids = [item["result"]["lead_id"] for item in response.json()["items"]]
+        assert len(lead_store) == 3
+        assert client.get(f"/leads/{lead_ids[2]}").status_code == 200
+
+    def test_unknown_lead_returns_404(self, client):
+        """Test that an unknown lead_id returns 404."""
+        response = client.get("/leads/00000000-0000-0000-0000-000000000000")
+
+        assert response.status_code == 404
+        assert response.json()["detail"] == "Lead not found"
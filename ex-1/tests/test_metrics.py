@@ -0,0 +1,105 @@
+"""
+Test cases for Prometheus metrics
+"""
+
+from app.services.metrics import MetricsRegistry, registry
+
+
+def make_registry() -> tuple[MetricsRegistry, object, object]:
+    metrics = MetricsRegistry()
+    counter = metrics.counter(
+        "rule_total", "Rule outcomes.", ("outcome",), [("pass",), ("fail",)]
+    )
+    histogram = metrics.histogram("phase_seconds", "Phase latency.", (0.1, 1.0))
+    return metrics, counter, histogram
+
+
+def sample(text: str, name: str) -> float:
+    for line in text.splitlines():
+        if line.startswith(name + " "):
+            return float(line.rsplit(" ", 1)[1])
+    raise KeyError(name)
+
+
+class TestMetricsRegistry:
+    """Test class for the file-backed metrics registry."""
+
+    def test_counters_and_histograms_render_as_prometheus_text(self):
+        """Test the text exposition of counters and cumulative histograms."""
+        metrics, counter, histogram = make_registry()
+        metrics.open()
+        metrics.inc(counter.slot("fail"), 2)
+        for seconds in (0.05, 0.5, 5.0):
+            metrics.observe(histogram, histogram.slot(), seconds)
+
+        text = metrics.render()
+
+        assert "# TYPE rule_total counter" in text
+        assert sample(text, 'rule_total{outcome="fail"}') == 2
+        assert sample(text, 'phase_seconds_bucket{le="0.1"}') == 1
+        assert sample(text, 'phase_seconds_bucket{le="1.0"}') == 2
+        assert sample(text, 'phase_seconds_bucket{le="+Inf"}') == 3
+        assert sample(text, "phase_seconds_count") == 3
+        assert sample(text, "phase_seconds_sum") == 5.55
+
+    def test_worker_files_are_summed(self, tmp_path):
+        """Test that a scrape aggregates the files of every worker."""
+        workers = []
+        for worker_id in ("1", "2"):
+            metrics, counter, _ = make_registry()
+            metrics.open(str(tmp_path), worker_id=worker_id)
+            metrics.inc(counter.slot("pass"))
+            workers.append(metrics)
+        (tmp_path / "metrics-3.db").write_bytes(b"\0" * 8)
+
+        assert sample(workers[0].render(), 'rule_total{outcome="pass"}') == 2
+
+    def test_restarted_worker_continues_its_counts(self, tmp_path):
+        """Test that reopening a worker file keeps its values."""
+        metrics, counter, _ = make_registry()
+        metrics.open(str(tmp_path), worker_id="1")
+        metrics.inc(counter.slot("pass"))
+
+        reopened, counter, _ = make_registry()
+        reopened.open(str(tmp_path), worker_id="1")
+
+        assert reopened.values[counter.slot("pass")] == 1
+
+
+class TestMetricsEndpoint:
+    """Test class for GET /metrics."""
+
+    def test_rule_outcomes_and_phases_are_counted(
+        self, client, unqualified_lead_forbidden_email
+    ):
+        """Test that creating a lead updates rule counters and phase histograms."""
+        before = client.get("/metrics").text
+        client.post("/leads", json=unqualified_lead_forbidden_email)
+        after = client.get("/metrics").text
+
+        def delta(name: str) -> float:
+            return sample(after, name) - sample(before, name)
+
+        assert (
+            delta('lead_qualification_rule_total{rule="email_domain",outcome="fail"}')
+            == 1
+        )
+        assert delta('lead_qualification_rule_total{rule="role",outcome="pass"}') == 1
+        assert delta('lead_qualification_status_total{status="Unqualified"}') == 1
+        for phase in ("validation", "qualification", "serialization"):
+            assert delta(f'lead_request_phase_seconds_count{{phase="{phase}"}}') == 1
+
+    def test_batch_rows_are_counted(self, client, valid_lead_data):
+        """Test that batch rows update the rule counters."""
+        slot = registry.metrics[2].slot("Qualified")
+        before = registry.values[slot]
+
+        client.post("/leads/batch", json=[valid_lead_data])
+
+        assert registry.values[slot] == before + 1
+
+    def test_metrics_content_type(self, client):
+        """Test that /metrics uses the Prometheus text content type."""
+        response = client.get("/metrics")
+
+        assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
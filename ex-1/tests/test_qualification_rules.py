@@ -0,0 +1,165 @@
+"""
+Test cases for the compiled qualification rule engine
+"""
+
+import json
+import os
+import pytest
+from app.services import qualification_rules
+from app.services.lead_qualification import LeadQualification
+from app.services.qualification_rules import (
+    COMPANY_SIZE_NOTE,
+    EMAIL_NOTE,
+    ROLE_NOTE,
+    RuleEngine,
+    RulesFileError,
+    compile_rules,
+)
+
+RULES = {
+    "min_company_size": 10,
+    "decision_maker_roles": ["CEO", "CTO"],
+    "forbidden_domains": ["Gmail.com"],
+}
+
+
+def write_rules(path, rules: dict, mtime_offset: int = 0) -> None:
+    path.write_text(json.dumps(rules), encoding="utf-8")
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + mtime_offset))
+
+
+@pytest.fixture
+def rules_path(tmp_path):
+    path = tmp_path / "rules.json"
+    write_rules(path, RULES)
+    return path
+
+
+class TestCompiledRules:
+    """Test class for compiling and evaluating rules."""
+
+    def test_rules_are_compiled_to_normalized_lookups(self, rules_path):
+        """Test that roles and domains are normalized for lookups."""
+        rules = compile_rules(rules_path)
+
+        assert rules.decision_maker_roles == frozenset({"ceo", "cto"})
+        assert "gmail.com" in rules.forbidden_domains
+        assert len(rules.forbidden_domains) == 1
+        assert rules.min_company_size == 10
+
+    def test_evaluate_returns_verdict_and_notes_together(self, rules_path, make_lead):
+        """Test that a single evaluation returns the verdict and all notes."""
+        rules = compile_rules(rules_path)
+
+        assert rules.evaluate(make_lead()) == (True, [])
+        assert rules.evaluate(
+            make_lead(company_size=5, role="Intern", email="a@GMAIL.com")
+        ) == (False, [COMPANY_SIZE_NOTE, ROLE_NOTE, EMAIL_NOTE])
+
+    def test_yaml_rules_file_is_supported(self, tmp_path, make_lead):
+        """Test that YAML rules files compile like JSON ones."""
+        path = tmp_path / "rules.yaml"
+        path.write_text(
+            "min_company_size: 100\n"
+            "decision_maker_roles: [Founder]\n"
+            "forbidden_domains: [yahoo.com]\n",
+            encoding="utf-8",
+        )
+        rules = compile_rules(path)
+
+        assert rules.evaluate(make_lead(company_size=50, role="founder")) == (
+            False,
+            [COMPANY_SIZE_NOTE],
+        )
+
+    def test_invalid_rules_file_raises(self, tmp_path):
+        """Test that a rules file missing fields is rejected."""
+        path = tmp_path / "rules.json"
+        path.write_text(json.dumps({"min_company_size": 10}), encoding="utf-8")
+
+        with pytest.raises(RulesFileError):
+            compile_rules(path)
+
+    def test_lead_qualification_uses_given_rules(self, rules_path, make_lead):
+        """Test that LeadQualification evaluates against explicit rules."""
+        rules = compile_rules(rules_path)
+        result = LeadQualification(make_lead(role="Founder"), rules=rules).save()
+
+        assert result.status == "Unqualified"
+        assert result.qualification_notes == [ROLE_NOTE]
+
+
+class TestRuleEngine:
+    """Test class for hot-swapping rules files."""
+
+    def test_changed_file_is_swapped_in(self, rules_path):
+        """Test that editing the rules file swaps the compiled rules."""
+        engine = RuleEngine(rules_path, reload_interval=0)
+        before = engine.current()
+
+        write_rules(rules_path, {**RULES, "min_company_size": 100}, mtime_offset=10**9)
+        after = engine.current()
+
+        assert after is not before
+        assert after.min_company_size == 100
+
+    def test_unchanged_file_is_not_recompiled(self, rules_path):
+        """Test that rules are not recompiled when the file is unchanged."""
+        engine = RuleEngine(rules_path, reload_interval=0)
+
+        assert engine.current() is engine.current()
+        assert engine.reload() is False
+
+    def test_reload_interval_throttles_file_checks(self, rules_path):
+        """Test that the file is not re-checked within the reload interval."""
+        engine = RuleEngine(rules_path, reload_interval=3600)
+        before = engine.current()
+
+        write_rules(rules_path, {**RULES, "min_company_size": 100}, mtime_offset=10**9)
+
+        assert engine.current() is before
+
+    def test_changed_domain_list_is_swapped_in(self, tmp_path):
+        """Test that editing a referenced domain list also swaps the rules."""
+        domain_list = tmp_path / "domains.txt"
+        domain_list.write_text("mailinator.com\n", encoding="utf-8")
+        rules_path = tmp_path / "rules.json"
+        write_rules(rules_path, {**RULES, "forbidden_domain_lists": ["domains.txt"]})
+        engine = RuleEngine(rules_path, reload_interval=0)
+
+        assert "mailinator.com" in engine.current().forbidden_domains
+
+        domain_list.write_text("yopmail.com\n", encoding="utf-8")
+        os.utime(domain_list, ns=(0, os.stat(domain_list).st_mtime_ns + 10**9))
+
+        assert "yopmail.com" in engine.current().forbidden_domains
+        assert "mailinator.com" not in engine.current().forbidden_domains
+
+    def test_edit_during_compilation_is_picked_up(self, rules_path, monkeypatch):
+        """Test that a file edited while rules compile is reloaded by the next check."""
+        engine = RuleEngine(rules_path, reload_interval=0)
+        write_rules(rules_path, {**RULES, "min_company_size": 100}, mtime_offset=10**9)
+
+        def compile_then_edit(path):
+            rules = compile_rules(path)
+            write_rules(
+                path, {**RULES, "min_company_size": 200}, mtime_offset=2 * 10**9
+            )
+            return rules
+
+        monkeypatch.setattr(qualification_rules, "compile_rules", compile_then_edit)
+        assert engine.current().min_company_size == 100
+        monkeypatch.undo()
+
+        assert engine.current().min_company_size == 200
+
+    def test_broken_file_keeps_previous_rules(self, rules_path):
+        """Test that a broken rules file does not replace working rules."""
+        engine = RuleEngine(rules_path, reload_interval=0)
+        before = engine.current()
+
+        rules_path.write_text("{not json", encoding="utf-8")
+        os.utime(rules_path, ns=(0, os.stat(rules_path).st_mtime_ns + 10**9))
+
+        assert engine.current() is before
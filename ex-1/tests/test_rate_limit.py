@@ -0,0 +1,243 @@
+"""
+Test cases for per-source token-bucket rate limiting
+"""
+
+import json
+import os
+import multiprocessing
+import pytest
+from app.dependencies import get_rate_limiter
+from app.main import app
+from app.services.rate_limit import (
+    SLOT_SIZE,
+    RateLimiter,
+    RateLimitTable,
+    retry_after_header,
+)
+
+HEADER = "first_name,last_name,email,company_name,company_size,role\n"
+
+
+def make_lead(i: int, domain: str = "company.com") -> dict:
+    return {
+        "first_name": f"First{i}",
+        "last_name": f"Last{i}",
+        "email": f"user{i}@{domain}",
+        "company_name": f"Company {i}",
+        "company_size": 50,
+        "role": "CEO",
+    }
+
+
+def take_tokens(path: str, count: int) -> None:
+    table = RateLimitTable(1.0, 100, slots=64, path=path)
+    for _ in range(count):
+        table.acquire("shared")
+    table.close()
+
+
+@pytest.fixture
+def limiter_client(client):
+    def install(key_by: str = "api_key", rate: float = 1.0, burst: float = 2):
+        limiter = RateLimiter(RateLimitTable(rate, burst, slots=1024), key_by)
+        app.dependency_overrides[get_rate_limiter] = lambda: limiter
+        return client
+
+    return install
+
+
+class TestRateLimitTable:
+    """Test class for the fixed-size token bucket table."""
+
+    def test_burst_then_throttle_with_retry_after(self, clock):
+        """Test that a key gets its burst, then the wait for the next token."""
+        table = RateLimitTable(2.0, 3, slots=64, clock=clock)
+
+        assert [table.acquire("a") for _ in range(3)] == [0.0, 0.0, 0.0]
+        assert table.acquire("a") == pytest.approx(0.5)
+        assert table.acquire("b") == 0.0
+
+        clock.now += 0.5
+        assert table.acquire("a") == 0.0
+        assert table.acquire("a") > 0
+
+    def test_bucket_refills_up_to_burst(self, clock):
+        """Test that an idle bucket never holds more than the burst."""
+        table = RateLimitTable(10.0, 2, slots=64, clock=clock)
+        table.acquire("a", 2)
+
+        clock.now += 3600
+
+        assert table.acquire("a", 2) == 0.0
+        assert table.acquire("a") == pytest.approx(0.1)
+
+    def test_cost_above_burst_leaves_bucket_in_debt(self, clock):
+        """Test that a large cost needs a full bucket and is repaid by waiting."""
+        table = RateLimitTable(1.0, 10, slots=64, clock=clock)
+
+        assert table.acquire("a", 30) == 0.0
+        assert table.acquire("a") == pytest.approx(21.0)
+
+        clock.now += 21
+        assert table.acquire("a") == 0.0
+
+    def test_memory_is_fixed_however_many_keys(self, clock):
+        """Test that more keys than slots reuse slots instead of growing."""
+        table = RateLimitTable(1.0, 5, slots=16, clock=clock)
+
+        for i in range(10_000):
+            assert table.acquire(f"key-{i}") == 0.0
+
+        assert len(table._mmap) == 16 * SLOT_SIZE
+
+    def test_fullest_bucket_is_taken_over_first(self, clock):
+        """Test that a throttled key keeps its slot when new keys arrive."""
+        table = RateLimitTable(1.0, 2, slots=4, clock=clock)
+        table.acquire("busy", 2)
+
+        for i in range(50):
+            clock.now += 0.001
+            table.acquire(f"other-{i}", 0.5)
+
+        assert table.acquire("busy") > 0
+
+    def test_shared_file_is_seen_by_other_processes(self, tmp_path):
+        """Test that workers mapping the same file share buckets."""
+        path = str(tmp_path / "rate-limit.db")
+        table = RateLimitTable(1.0, 100, slots=64, path=path)
+        worker = multiprocessing.get_context("fork").Process(
+            target=take_tokens, args=(path, 99)
+        )
+        worker.start()
+        worker.join()
+
+        assert table.acquire("shared") == 0.0
+        assert table.acquire("shared") > 0
+        assert os.path.getsize(path) == 64 * SLOT_SIZE
+        table.close()
+
+    def test_invalid_settings_are_rejected(self):
+        """Test that a zero rate or a burst below one token is refused."""
+        with pytest.raises(ValueError):
+            RateLimitTable(0, 10)
+        with pytest.raises(ValueError):
+            RateLimitTable(1.0, 0.5)
+        with pytest.raises(ValueError):
+            RateLimiter(RateLimitTable(1.0, 1, slots=16), "tenant")
+
+    def test_retry_after_header_rounds_up(self):
+        """Test that Retry-After is a whole number of seconds of at least 1."""
+        assert retry_after_header(0.01) == "1"
+        assert retry_after_header(1.2) == "2"
+
+
+class TestRateLimitedEndpoints:
+    """Test class for rate limiting of the lead ingestion endpoints."""
+
+    def test_limits_are_off_by_default(self, client):
+        """Test that without a limiter every request is accepted."""
+        for i in range(5):
+            response = client.post("/leads", json=make_lead(i))
+            assert response.status_code == 201
+
+    def test_throttled_lead_gets_429_with_retry_after(self, limiter_client):
+        """Test that a source over its limit is turned away with Retry-After."""
+        client = limiter_client()
+        headers = {"X-API-Key": "partner-form"}
+
+        statuses = [
+            client.post("/leads", json=make_lead(i), headers=headers).status_code
+            for i in range(3)
+        ]
+        response = client.post("/leads", json=make_lead(3), headers=headers)
+
+        assert statuses == [201, 201, 429]
+        assert response.status_code == 429
+        assert response.headers["Retry-After"] == "1"
+        assert response.json()["detail"] == "Rate limit exceeded"
+
+    def test_idempotent_replays_cost_no_tokens(self, limiter_client):
+        """Test that replaying a stored response does not use up the bucket."""
+        client = limiter_client()
+        headers = {"X-API-Key": "partner-form", "Idempotency-Key": "form-1"}
+
+        statuses = [
+            client.post("/leads", json=make_lead(0), headers=headers).status_code
+            for _ in range(5)
+        ]
+        fresh = client.post(
+            "/leads", json=make_lead(1), headers={"X-API-Key": "partner-form"}
+        )
+
+        assert statuses == [201] * 5
+        assert fresh.status_code == 201
+
+    def test_api_keys_have_separate_buckets(self, limiter_client):
+        """Test that one misbehaving key does not starve another."""
+        client = limiter_client()
+        for i in range(3):
+            client.post("/leads", json=make_lead(i), headers={"X-API-Key": "noisy"})
+
+        response = client.post(
+            "/leads", json=make_lead(9), headers={"X-API-Key": "quiet"}
+        )
+
+        assert response.status_code == 201
+
+    def test_requests_without_api_key_are_limited_by_ip(self, limiter_client):
+        """Test that the client IP is the fallback key."""
+        client = limiter_client()
+        statuses = [
+            client.post("/leads", json=make_lead(i)).status_code for i in range(3)
+        ]
+
+        assert statuses == [201, 201, 429]
+
+    def test_email_domain_key(self, limiter_client):
+        """Test that email_domain mode limits each domain separately."""
+        client = limiter_client("email_domain")
+        statuses = [
+            client.post("/leads", json=make_lead(i, "flood.com")).status_code
+            for i in range(3)
+        ]
+        response = client.post("/leads", json=make_lead(9, "other.com"))
+
+        assert statuses == [201, 201, 429]
+        assert response.status_code == 201
+
+    def test_batch_rows_are_charged(self, limiter_client):
+        """Test that a batch costs one token per row."""
+        client = limiter_client(burst=3)
+        first = client.post("/leads/batch", json=[make_lead(i) for i in range(3)])
+        second = client.post("/leads/batch", json=[make_lead(9)])
+
+        assert first.status_code == 200
+        assert second.status_code == 429
+        assert "Retry-After" in second.headers
+
+    def test_import_is_rejected_when_out_of_tokens(self, limiter_client):
+        """Test that an import from a throttled source gets 429 up front."""
+        client = limiter_client(burst=1)
+        client.post("/leads", json=make_lead(0))
+        csv_text = HEADER + "Ann,Lee,ann@corp.com,Corp,50,CEO\n"
+
+        response = client.post(
+            "/leads/import", files={"file": ("leads.csv", csv_text, "text/csv")}
+        )
+
+        assert response.status_code == 429
+
+    def test_import_waits_for_tokens_instead_of_failing(self, limiter_client):
+        """Test that an import past the burst is slowed down, not cut off."""
+        client = limiter_client(rate=1000.0, burst=2)
+        csv_text = HEADER + "".join(
+            f"First{i},Last{i},user{i}@corp{i}.com,Corp {i},50,CEO\n" for i in range(10)
+        )
+
+        response = client.post(
+            "/leads/import", files={"file": ("leads.csv", csv_text, "text/csv")}
+        )
+
+        assert response.status_code == 200
+        items = [json.loads(line) for line in response.text.splitlines()]
+        assert [item["result"] is not None for item in items] == [True] * 10
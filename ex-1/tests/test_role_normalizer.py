@@ -0,0 +1,113 @@
+"""
+Test cases for job title normalization
+"""
+
+import json
+import pytest
+from app.models.lead import Lead
+from app.services.qualification_rules import ROLE_NOTE, rule_engine, compile_rules
+from app.services.role_normalizer import RoleNormalizer, tokenize_title
+
+
+@pytest.fixture
+def normalizer():
+    return RoleNormalizer(
+        {
+            "CEO": ["chief executive officer"],
+            "CTO": ["chief technology officer"],
+            "Founder": ["co founder", "cofounder"],
+            "VP of Engineering": ["vp engineering", "vice president engineering"],
+        },
+        disqualifying_tokens=["former", "assistant"],
+    )
+
+
+class TestRoleNormalizer:
+    """Test class for mapping titles to canonical roles."""
+
+    def test_tokenize_drops_separators_and_stopwords(self):
+        """Test that punctuation splits words and stopwords are dropped."""
+        assert tokenize_title("Co-Founder & CEO") == ("co", "founder", "ceo")
+        assert tokenize_title("VP of Engineering") == ("vp", "engineering")
+        assert tokenize_title("CEO@Company") == ("ceo@company",)
+
+    @pytest.mark.parametrize(
+        "title, roles",
+        [
+            ("Chief Technology Officer", {"cto"}),
+            ("Co-Founder & CEO", {"founder", "ceo"}),
+            ("VP Engineering", {"vp of engineering"}),
+            ("Vice President, Engineering", {"vp of engineering"}),
+            ("  ceo  ", {"ceo"}),
+            ("Founder/CTO", {"founder", "cto"}),
+            ("VP Sales", set()),
+            ("CEO@Company", set()),
+            ("Former CEO", set()),
+            ("Assistant to the CEO", set()),
+        ],
+    )
+    def test_titles_map_to_canonical_roles(self, normalizer, title, roles):
+        """Test that real-world titles are mapped to the roles they name."""
+        assert normalizer.normalize(title) == roles
+
+    def test_repeated_titles_are_cached(self, normalizer):
+        """Test that normalized titles are served from the LRU cache."""
+        normalizer.normalize("Chief Technology Officer")
+        normalizer.normalize("Chief Technology Officer")
+
+        info = normalizer.cache_info()
+        assert (info.hits, info.misses) == (1, 1)
+
+    def test_cache_is_bounded(self):
+        """Test that the LRU cache does not grow past its size."""
+        normalizer = RoleNormalizer({"CEO": []}, cache_size=8)
+        for i in range(100):
+            normalizer.normalize(f"Title {i}")
+
+        assert normalizer.cache_info().currsize == 8
+
+
+class TestRoleRules:
+    """Test class for role normalization in the compiled rules."""
+
+    def test_default_rules_qualify_real_titles(self):
+        """Test that the shipped synonyms qualify common decision-maker titles."""
+        rules = rule_engine.current()
+        lead = Lead(
+            first_name="John",
+            last_name="Doe",
+            email="john@company.com",
+            company_name="Tech Corp",
+            company_size=50,
+            role="Chief Executive Officer",
+        )
+
+        assert rules.evaluate(lead) == (True, [])
+        assert rules.evaluate(lead.model_copy(update={"role": "Head of Sales"})) == (
+            False,
+            [ROLE_NOTE],
+        )
+
+    def test_synonyms_file_is_watched(self, tmp_path):
+        """Test that the synonyms file is a source of the compiled rules."""
+        (tmp_path / "roles.json").write_text(
+            json.dumps({"roles": {"CTO": ["chief technology officer"]}}),
+            encoding="utf-8",
+        )
+        rules_path = tmp_path / "rules.json"
+        rules_path.write_text(
+            json.dumps(
+                {
+                    "min_company_size": 10,
+                    "decision_maker_roles": ["CTO"],
+                    "forbidden_domains": [],
+                    "role_synonyms_file": "roles.json",
+                }
+            ),
+            encoding="utf-8",
+        )
+
+        rules = compile_rules(rules_path)
+
+        assert tmp_path / "roles.json" in rules.sources
+        assert rules.role_normalizer.normalize("Chief Technology Officer") == {"cto"}
@@ -0,0 +1,75 @@
+"""
+Test cases for worker warm-up and production server options
+"""
+
+import logging
+import pytest
+from fastapi.testclient import TestClient
+from app.main import app
+from app.services.metrics import registry
+from app.startup import FirstRequestTimer, warm_up
+from run import default_workers, server_options
+
+
+class TestWarmUp:
+    """Test class for warming workers up before they serve traffic."""
+
+    def test_warm_up_prerenders_openapi(self):
+        """Test that warm-up leaves the OpenAPI schema cached."""
+        app.openapi_schema = None
+
+        assert warm_up(app) > 0
+        assert app.openapi_schema is not None
+
+    def test_warm_up_is_not_counted_in_metrics(self):
+        """Test that the synthetic warm-up lead leaves the metrics untouched."""
+        before = list(registry.values)
+
+        warm_up(app)
+
+        assert list(registry.values) == before
+
+    def test_lifespan_warms_worker_up(self, caplog):
+        """Test that the app lifespan warms the worker up before serving."""
+        with caplog.at_level(logging.INFO, logger="uvicorn.error"):
+            with TestClient(app):
+                pass
+
+        assert any("warmed up" in record.getMessage() for record in caplog.records)
+
+    @pytest.mark.asyncio
+    async def test_only_first_request_is_reported(self, caplog):
+        """Test that time to first request is logged once per worker."""
+
+        async def endpoint(scope, receive, send):
+            pass
+
+        timer = FirstRequestTimer(endpoint)
+        with caplog.at_level(logging.INFO, logger="uvicorn.error"):
+            for _ in range(3):
+                await timer({"type": "http"}, None, None)
+
+        messages = [record.getMessage() for record in caplog.records]
+        assert sum("first request" in message for message in messages) == 1
+
+
+class TestServerOptions:
+    """Test class for run.py production options."""
+
+    def test_one_worker_by_default(self, monkeypatch):
+        """Test that a single worker is started unless WORKERS is set."""
+        monkeypatch.delenv("WORKERS", raising=False)
+
+        assert server_options()["workers"] == 1
+
+    def test_workers_zero_uses_cpu_affinity(self, monkeypatch):
+        """Test that WORKERS=0 starts a worker per available CPU."""
+        monkeypatch.setenv("WORKERS", "0")
+        monkeypatch.setenv("MAX_REQUESTS_PER_WORKER", "1000")
+
+        options = server_options()
+
+        assert options["workers"] == default_workers()
+        assert options["limit_max_requests"] == 1000
+        assert options["loop"] in ("uvloop", "asyncio")
+        assert options["http"] in ("httptools", "h11")
@@ -0,0 +1,162 @@
+"""
+Test cases for per-tenant qualification rules
+"""
+
+import json
+import os
+import threading
+import pytest
+from app.dependencies import get_tenant_rules
+from app.main import app
+from app.services import qualification_rules
+from app.services.qualification_rules import (
+    TenantRules,
+    UnknownTenantError,
+)
+
+TENANT_RULES = {
+    "min_company_size": 100,
+    "decision_maker_roles": ["CEO"],
+    "forbidden_domains": ["gmail.com"],
+}
+
+
+def write_tenant(directory, tenant: str, rules: dict, mtime_offset: int = 0) -> None:
+    path = directory / f"{tenant}.json"
+    path.write_text(json.dumps(rules), encoding="utf-8")
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + mtime_offset))
+
+
+@pytest.fixture
+def tenants_dir(tmp_path):
+    directory = tmp_path / "tenants"
+    directory.mkdir()
+    write_tenant(directory, "acme", TENANT_RULES)
+    write_tenant(directory, "globex", {**TENANT_RULES, "min_company_size": 1})
+    return directory
+
+
+@pytest.fixture
+def tenant_client(client, tenants_dir):
+    tenant_rules = TenantRules(tenants_dir)
+    app.dependency_overrides[get_tenant_rules] = lambda: tenant_rules
+    return client
+
+
+class TestTenantRules:
+    """Test class for the per-tenant rule engine cache."""
+
+    def test_rules_are_compiled_once_per_tenant(self, tenants_dir):
+        """Test that repeated lookups reuse the compiled rules."""
+        tenants = TenantRules(tenants_dir)
+
+        first = tenants.current("acme")
+
+        assert tenants.current("acme") is first
+        assert first.min_company_size == 100
+        assert tenants.current("globex").min_company_size == 1
+        assert len(tenants) == 2
+
+    def test_least_recently_used_tenant_is_evicted(self, tenants_dir):
+        """Test that the cache holds at most max_tenants engines."""
+        tenants = TenantRules(tenants_dir, max_tenants=1)
+        acme = tenants.engine("acme")
+
+        tenants.engine("globex")
+
+        assert len(tenants) == 1
+        assert tenants.engine("acme") is not acme
+
+    def test_unknown_tenant_raises(self, tenants_dir):
+        """Test that a tenant without a rules file is reported."""
+        with pytest.raises(UnknownTenantError):
+            TenantRules(tenants_dir).current("initech")
+
+    def test_changed_tenant_rules_are_reloaded_lazily(self, tenants_dir):
+        """Test that a tenant's rules are recompiled when its file changes."""
+        tenants = TenantRules(tenants_dir, reload_interval=0)
+        assert tenants.current("acme").min_company_size == 100
+
+        write_tenant(
+            tenants_dir, "acme", {**TENANT_RULES, "min_company_size": 5}, 10**9
+        )
+
+        assert tenants.current("acme").min_company_size == 5
+
+    def test_concurrent_first_requests_compile_once(self, tenants_dir, monkeypatch):
+        """Test that threads racing on a cold tenant share one compilation."""
+        compile_rules = qualification_rules.compile_rules
+        calls = []
+
+        def counting_compile(path):
+            calls.append(path)
+            return compile_rules(path)
+
+        monkeypatch.setattr(qualification_rules, "compile_rules", counting_compile)
+        tenants = TenantRules(tenants_dir)
+        barrier = threading.Barrier(8)
+        results = []
+
+        def first_request():
+            barrier.wait()
+            results.append(tenants.current("acme"))
+
+        threads = [threading.Thread(target=first_request) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert len(calls) == 1
+        assert all(rules is results[0] for rules in results)
+
+
+class TestTenantEndpoints:
+    """Test class for selecting rules with the X-Tenant-ID header."""
+
+    def test_tenant_rules_are_applied(self, tenant_client, valid_lead_data):
+        """Test that the same lead is qualified differently per tenant."""
+        default = tenant_client.post("/leads", json=valid_lead_data)
+        acme = tenant_client.post(
+            "/leads",
+            json={**valid_lead_data, "email": "jd@acme-leads.com"},
+            headers={"X-Tenant-ID": "acme"},
+        )
+
+        assert default.json()["status"] == "Qualified"
+        assert acme.status_code == 201
+        assert acme.json()["status"] == "Unqualified"
+        assert acme.json()["qualification_notes"] == ["Company size is too small"]
+
+    def test_batch_uses_tenant_rules(self, tenant_client, valid_lead_data):
+        """Test that batch ingestion honors the tenant header."""
+        response = tenant_client.post(
+            "/leads/batch", json=[valid_lead_data], headers={"X-Tenant-ID": "acme"}
+        )
+
+        assert response.json()["items"][0]["result"]["status"] == "Unqualified"
+
+    def test_unknown_tenant_returns_404(self, tenant_client, valid_lead_data):
+        """Test that a tenant without rules is rejected."""
+        response = tenant_client.post(
+            "/leads", json=valid_lead_data, headers={"X-Tenant-ID": "initech"}
+        )
+
+        assert response.status_code == 404
+
+    def test_invalid_tenant_id_returns_422(self, tenant_client, valid_lead_data):
+        """Test that tenant ids cannot name paths outside the tenants directory."""
+        response = tenant_client.post(
+            "/leads", json=valid_lead_data, headers={"X-Tenant-ID": "../acme"}
+        )
+
+        assert response.status_code == 422
+
+    def test_tenants_not_configured_returns_404(self, client, valid_lead_data):
+        """Test that a tenant header without a tenants directory is rejected."""
+        response = client.post(
+            "/leads", json=valid_lead_data, headers={"X-Tenant-ID": "acme"}
+        )
+
+        assert response.status_code == 404
@@ -1,9 +1,57 @@
 """Dependency injection functions for FastAPI."""
 
+import os
 from app.services.enrichment import EnrichmentService
+from app.services.job_store import JobStore
+from app.services.result_cache import ResultCache
+from app.services.sqlite_job_store import SQLiteJobStore
+
+# Concurrent enrichment calls, and jobs allowed to wait for a free worker
+ENRICHMENT_WORKERS = int(os.getenv("ENRICHMENT_WORKERS", "1000"))
+ENRICHMENT_QUEUE_SIZE = int(os.getenv("ENRICHMENT_QUEUE_SIZE", "100000"))
+# Finished jobs are kept this many seconds after they finish or are last read
+JOB_TTL = float(os.getenv("JOB_TTL", "3600"))
+# Hard caps on retained jobs and on their estimated memory
+MAX_JOBS = int(os.getenv("MAX_JOBS", "1000000"))
+MAX_JOB_BYTES = int(os.getenv("MAX_JOB_BYTES", str(512 * 1024 * 1024)))
+# With a path, jobs are also written behind to a SQLite file every
+# JOB_STORE_FLUSH_INTERVAL seconds and recovered from it on startup
+JOB_STORE_PATH = os.getenv("JOB_STORE_PATH") or None
+JOB_STORE_FLUSH_INTERVAL = float(os.getenv("JOB_STORE_FLUSH_INTERVAL", "0.05"))
+# Set when several uvicorn workers on one host share JOB_STORE_PATH, so that
+# any worker can serve the status of a job created on another
+JOB_STORE_SHARED = os.getenv("JOB_STORE_SHARED", "false").lower() == "true"
+# Enrichment results are fresh for ENRICHMENT_CACHE_TTL seconds, then served
+# stale while refreshed for ENRICHMENT_CACHE_STALE_TTL more; a size of 0
+# disables the cache, and a path keeps it in a SQLite file across restarts
+ENRICHMENT_CACHE_TTL = float(os.getenv("ENRICHMENT_CACHE_TTL", "86400"))
+ENRICHMENT_CACHE_STALE_TTL = float(os.getenv("ENRICHMENT_CACHE_STALE_TTL", "604800"))
+ENRICHMENT_CACHE_SIZE = int(os.getenv("ENRICHMENT_CACHE_SIZE", "100000"))
+ENRICHMENT_CACHE_PATH = os.getenv("ENRICHMENT_CACHE_PATH") or None
+
+job_limits = dict(ttl=JOB_TTL, max_jobs=MAX_JOBS, max_bytes=MAX_JOB_BYTES)
+if JOB_STORE_PATH is not None:
+    job_store = SQLiteJobStore(
+        JOB_STORE_PATH,
+        flush_interval=JOB_STORE_FLUSH_INTERVAL,
+        shared=JOB_STORE_SHARED,
+        **job_limits,
+    )
+else:
+    job_store = JobStore(**job_limits)
 
 # Create service instance
-enrichment_service = EnrichmentService()
+enrichment_service = EnrichmentService(
+    workers=ENRICHMENT_WORKERS,
+    max_queue_size=ENRICHMENT_QUEUE_SIZE,
+    jobs=job_store,
+    cache=ResultCache(
+        ttl=ENRICHMENT_CACHE_TTL,
+        stale_ttl=ENRICHMENT_CACHE_STALE_TTL,
+        max_entries=ENRICHMENT_CACHE_SIZE,
+        path=ENRICHMENT_CACHE_PATH,
+    ),
+)
 
 
 def get_enrichment_service() -> EnrichmentService:
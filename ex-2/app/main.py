@@ -3,11 +3,26 @@ Main FastAPI application entry point
 Creates and configures the FastAPI app with all routes and middleware
 """
 
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
+from app.dependencies import enrichment_service
 from app.services.enrichment import EnrichmentService
 from app.routers import enrichment
 
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Rerun jobs recovered by the job store on startup; on shutdown, stop the
+    enrichment worker pool and close the job store and result cache.
+    """
+    await enrichment_service.start()
+    yield
+    await enrichment_service.close()
+    await enrichment_service.jobs.close()
+    await enrichment_service.cache.close()
+
+
 # Import routers
 # from app.routers import leads
 
@@ -18,6 +33,7 @@ app = FastAPI(
     version="1.0.0",
     docs_url="/docs",
     redoc_url="/redoc",
+    lifespan=lifespan,
 )
 
 
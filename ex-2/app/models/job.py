@@ -10,3 +10,5 @@ class Job(BaseModel):
     job_id: str
     status: str
     data: Company | None = None
+    # Why the enrichment failed, when status is "failed"
+    error: str | None = None
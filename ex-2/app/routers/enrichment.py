@@ -15,13 +15,25 @@ async def enrich_company_data(
     company_domain: str,
     enrichment_service: EnrichmentService = Depends(get_enrichment_service),
 ) -> EnrichmentResponse:
-    """Enrich company data for the given domain."""
+    """
+    Enrich company data for the given domain.
+
+    Returns 503 with Retry-After when the enrichment queue is full.
+    """
     response: EnrichmentResponse = EnrichmentResponse(
         job_id=await enrichment_service.enrich_company_data(company_domain)
     )
     return response
 
 
+@router.get("/enrich/stats")
+async def get_enrichment_stats(
+    enrichment_service: EnrichmentService = Depends(get_enrichment_service),
+) -> dict:
+    """Enrichment queue depth and worker utilization."""
+    return enrichment_service.stats()
+
+
 @router.get("/enrich/{job_id}")
 async def get_enrichment_status(
     job_id: str, enrichment_service: EnrichmentService = Depends(get_enrichment_service)
@@ -1,38 +1,220 @@
 from fastapi import HTTPException
-from app.models.company import Company
 from app.models.job import Job
+from app.services.job_store import JobStore, JobStoreFullError
+from app.services.result_cache import ResultCache
 import uuid
+import math
 import random
 import asyncio
+import contextlib
+import logging
+
+# Simulated duration of the external enrichment API call, in seconds
+ENRICHMENT_DURATION = 15.0
+
+
+def normalize_domain(company_domain: str) -> str:
+    """Key under which requests for the same domain share one upstream call."""
+    return company_domain.strip().lower().rstrip(".")
 
 
 class EnrichmentService:
-    """Service for handling company data enrichment."""
+    """
+    Service for handling company data enrichment.
+
+    Jobs wait in a bounded queue drained by a fixed pool of worker tasks, so a
+    burst of requests queues up instead of starting one task per request, and
+    the service holds a reference to every task it runs. A request arriving
+    when the queue is full is turned away with 503 and Retry-After. The
+    workers belong to the event loop they were started on; if the service is
+    used from another loop, queued jobs move to a new queue and pool there.
+    Job state lives in a bounded JobStore; with a persistent one, `start()`
+    runs the jobs left pending by the previous process again.
+
+    Requests are coalesced per normalized domain: a job for a domain that
+    already has a queued or running job gets its own job_id but joins that
+    job's group instead of the queue, and the group's single upstream call
+    completes every job in it, or fails every one with its error.
+
+    Results are cached per normalized domain. A job whose domain has a fresh
+    cached result completes at once; one with a stale result also completes
+    at once with it, and the domain is queued for a refresh unless a call for
+    it is already in flight.
+    """
+
+    def __init__(
+        self,
+        workers: int = 1000,
+        max_queue_size: int = 100_000,
+        duration: float = ENRICHMENT_DURATION,
+        jobs: JobStore | None = None,
+        cache: ResultCache | None = None,
+    ):
+        self.jobs = jobs if jobs is not None else JobStore()
+        self.cache = cache if cache is not None else ResultCache()
+        self.workers = workers
+        self.max_queue_size = max_queue_size
+        self.duration = duration
+        self.completed = 0
+        self.failed = 0
+        self.submitted = 0
+        self.coalesced = 0
+        self._busy = 0
+        # Normalized domain -> job_ids waiting on its queued or running call;
+        # empty for a refresh of a stale cached result
+        self._inflight: dict[str, list[str]] = {}
+        # Queued (job_id, domain) pairs; job_id is None for a refresh
+        self._queue: asyncio.Queue[tuple[str | None, str]] | None = None
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._worker_tasks: set[asyncio.Task] = set()
+
+    def _ensure_workers(self) -> asyncio.Queue[tuple[str | None, str]]:
+        """Start the queue and worker pool on the running loop, if not already."""
+        loop = asyncio.get_running_loop()
+        if self._loop is loop and self._queue is not None:
+            return self._queue
+        queue: asyncio.Queue[tuple[str | None, str]] = asyncio.Queue(
+            self.max_queue_size
+        )
+        if self._queue is not None:
+            while not self._queue.empty():
+                queue.put_nowait(self._queue.get_nowait())
+        self._queue, self._loop, self._busy = queue, loop, 0
+        self._worker_tasks = {
+            loop.create_task(self._worker(queue), name=f"enrichment-worker-{i}")
+            for i in range(self.workers)
+        }
+        return queue
+
+    async def _worker(self, queue: asyncio.Queue[tuple[str | None, str]]) -> None:
+        """Process queued jobs one at a time until cancelled."""
+        while True:
+            job_id, company_domain = await queue.get()
+            self._busy += 1
+            try:
+                await self._process_enrichment(job_id, company_domain)
+                self.completed += 1
+            except asyncio.CancelledError:
+                # Cancelled mid-job, e.g. by its loop shutting down: queue the
+                # job again so that the next pool runs it
+                if not queue.full():
+                    queue.put_nowait((job_id, company_domain))
+                else:
+                    self._inflight.pop(normalize_domain(company_domain), None)
+                raise
+            except Exception as exc:
+                self.failed += 1
+                self._fail_group(job_id, company_domain, str(exc) or repr(exc))
+                logging.exception("Enrichment of %s failed", company_domain)
+            finally:
+                self._busy -= 1
+                queue.task_done()
 
-    def __init__(self):
-        self.jobs: dict[str, Job] = {}
+    async def start(self) -> None:
+        """Open the result cache and job store; queue the jobs it recovered."""
+        await self.cache.open()
+        queue = self._ensure_workers()
+        for job_id, company_domain in await self.jobs.open():
+            key = normalize_domain(company_domain)
+            if key in self._inflight:
+                self._inflight[key].append(job_id)
+            elif not queue.full():
+                self._inflight[key] = [job_id]
+                queue.put_nowait((job_id, company_domain))
+            else:
+                logging.warning("No room to rerun recovered job %s", job_id)
 
     async def enrich_company_data(self, company_domain: str) -> str:
         """Enrich company data for the given domain."""
+        queue = self._ensure_workers()
         job_id = str(uuid.uuid4())
-        self.jobs[job_id] = Job(job_id=job_id, status="pending", data=None)
-
-        # Start background processing, simulate a 15 second external API call
-        asyncio.create_task(self._process_enrichment(job_id, company_domain))
-
+        # On average a worker frees up every duration / workers seconds
+        retry_after = str(max(1, math.ceil(self.duration / self.workers)))
+        key = normalize_domain(company_domain)
+        cached = self.cache.get(key)
+        group = self._inflight.get(key)
+        if cached is None and group is None and queue.full():
+            raise HTTPException(
+                status_code=503,
+                detail="Enrichment queue is full",
+                headers={"Retry-After": retry_after},
+            )
+        try:
+            self.jobs.add(job_id, company_domain)
+        except JobStoreFullError as e:
+            raise HTTPException(
+                status_code=503, detail=str(e), headers={"Retry-After": retry_after}
+            ) from e
+        self.submitted += 1
+        if cached is not None:
+            entry, stale = cached
+            self.jobs.complete(job_id, size=entry.size, industry=entry.industry)
+            # A refresh is best effort: without room it waits for a later hit
+            if stale and group is None and not queue.full():
+                self._inflight[key] = []
+                queue.put_nowait((None, company_domain))
+        elif group is not None:
+            group.append(job_id)
+            self.coalesced += 1
+        else:
+            self._inflight[key] = [job_id]
+            queue.put_nowait((job_id, company_domain))
+        await self.jobs.sync()
         return job_id
 
-    async def _process_enrichment(self, job_id: str, company_domain: str) -> None:
-        """Background processing for enrichment."""
+    async def _process_enrichment(
+        self, job_id: str | None, company_domain: str
+    ) -> None:
+        """Background processing for enrichment, for every job in the group."""
         headcount = random.randint(10, 1000)
-        await asyncio.sleep(15)
-        self.jobs[job_id].status = "complete"
-        self.jobs[job_id].data = Company(
-            domain=company_domain, size=headcount, industry="Technology"
-        )
+        await asyncio.sleep(self.duration)
+        key = normalize_domain(company_domain)
+        self.cache.put(key, size=headcount, industry="Technology")
+        for group_job_id in self._inflight.pop(key, [job_id] if job_id else []):
+            # A job may have been evicted or deleted meanwhile
+            with contextlib.suppress(KeyError):
+                self.jobs.complete(group_job_id, size=headcount, industry="Technology")
+
+    def _fail_group(self, job_id: str | None, company_domain: str, error: str) -> None:
+        """Mark every job waiting on a failed upstream call as failed."""
+        key = normalize_domain(company_domain)
+        for group_job_id in self._inflight.pop(key, [job_id] if job_id else []):
+            with contextlib.suppress(KeyError):
+                self.jobs.fail(group_job_id, error)
 
     async def get_enrichment_status(self, job_id: str) -> Job:
         """Get enrichment status for a job."""
-        if job_id not in self.jobs:
+        job = self.jobs.get(job_id)
+        if job is None:
             raise HTTPException(status_code=404, detail="Job not found")
-        return self.jobs[job_id]
+        return job
+
+    def stats(self) -> dict:
+        """Queue depth and worker pool utilization."""
+        queue_depth = self._queue.qsize() if self._queue is not None else 0
+        return {
+            "queue_depth": queue_depth,
+            "queue_capacity": self.max_queue_size,
+            "workers": self.workers,
+            "busy_workers": self._busy,
+            "worker_utilization": self._busy / self.workers,
+            "completed": self.completed,
+            "failed": self.failed,
+            "jobs_submitted": self.submitted,
+            "coalesced_jobs": self.coalesced,
+            "coalescing_ratio": (
+                self.coalesced / self.submitted if self.submitted else 0.0
+            ),
+            "inflight_domains": len(self._inflight),
+            "jobs": self.jobs.stats(),
+            "cache": self.cache.stats(),
+        }
+
+    async def close(self) -> None:
+        """Stop the worker pool; jobs still queued or running stay pending."""
+        for task in self._worker_tasks:
+            task.cancel()
+        if self._loop is asyncio.get_running_loop():
+            await asyncio.gather(*self._worker_tasks, return_exceptions=True)
+        self._worker_tasks = set()
+        self._queue, self._loop, self._busy = None, None, 0
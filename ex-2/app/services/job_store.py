@@ -0,0 +1,185 @@
+from collections import OrderedDict
+from collections.abc import Callable, Iterator
+from app.models.company import Company
+from app.models.job import Job
+import time
+
+# Approximate bytes held per job besides its id and domain: the record, its
+# dict entry and the string headers of the id and domain
+RECORD_OVERHEAD = 300
+
+
+class JobStoreFullError(Exception):
+    """Raised when the job store is at its cap and has no finished job to evict"""
+
+    def __init__(self, max_jobs: int):
+        self.max_jobs = max_jobs
+        super().__init__(f"Job store is full ({max_jobs} jobs)")
+
+
+class JobRecord:
+    """Compact state of one job; converted to a Job only when served."""
+
+    __slots__ = ("domain", "size", "industry", "error", "touched")
+
+    def __init__(self, domain: str):
+        self.domain = domain
+        # Set when the job completes
+        self.size: int | None = None
+        self.industry: str | None = None
+        # Set when the job fails
+        self.error: str | None = None
+        # Monotonic time the job finished or was last read, once finished
+        self.touched = 0.0
+
+    @property
+    def status(self) -> str:
+        if self.error is not None:
+            return "failed"
+        return "pending" if self.industry is None else "complete"
+
+    def to_job(self, job_id: str) -> Job:
+        data = None
+        if self.industry is not None:
+            data = Company(domain=self.domain, size=self.size, industry=self.industry)
+        return Job(job_id=job_id, status=self.status, data=data, error=self.error)
+
+
+class JobStore:
+    """
+    Bounded store of enrichment jobs.
+
+    Pending jobs are kept until they complete or fail. Finished jobs are kept
+    in least recently used order and expire `ttl` seconds after they finished
+    or were last read, so expired and evicted jobs both come off the front of
+    that order in O(1). Past `max_jobs` entries or `max_bytes` (an estimate of
+    the memory held), the least recently used finished jobs are evicted; a new
+    job that would need a pending job evicted is refused instead.
+    """
+
+    def __init__(
+        self,
+        ttl: float = 3600.0,
+        max_jobs: int = 1_000_000,
+        max_bytes: int = 512 * 1024 * 1024,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.ttl = ttl
+        self.max_jobs = max_jobs
+        self.max_bytes = max_bytes
+        self.clock = clock
+        self.bytes = 0
+        self.expired = 0
+        self.evicted = 0
+        self._pending: dict[str, JobRecord] = {}
+        self._finished: OrderedDict[str, JobRecord] = OrderedDict()
+
+    @staticmethod
+    def _record_bytes(job_id: str, record: JobRecord) -> int:
+        return RECORD_OVERHEAD + len(job_id) + len(record.domain)
+
+    def _remove_finished(self, job_id: str) -> None:
+        self.bytes -= self._record_bytes(job_id, self._finished.pop(job_id))
+
+    def _expire(self, now: float) -> None:
+        finished = self._finished
+        deadline = now - self.ttl
+        while finished:
+            job_id, record = next(iter(finished.items()))
+            if record.touched > deadline:
+                return
+            self._remove_finished(job_id)
+            self.expired += 1
+
+    def add(self, job_id: str, domain: str) -> None:
+        """Store a new pending job, evicting finished jobs to make room."""
+        self._expire(self.clock())
+        record = JobRecord(domain)
+        size = self._record_bytes(job_id, record)
+        while self._finished and (
+            len(self) >= self.max_jobs or self.bytes + size > self.max_bytes
+        ):
+            self._remove_finished(next(iter(self._finished)))
+            self.evicted += 1
+        if len(self) >= self.max_jobs or self.bytes + size > self.max_bytes:
+            raise JobStoreFullError(self.max_jobs)
+        self._pending[job_id] = record
+        self.bytes += size
+
+    def _finish(self, job_id: str, record: JobRecord) -> None:
+        record.touched = self.clock()
+        self._finished[job_id] = record
+        self._expire(record.touched)
+
+    def complete(self, job_id: str, size: int, industry: str) -> None:
+        """Record the result of a pending job; KeyError if it is unknown."""
+        record = self._pending.pop(job_id)
+        record.size, record.industry = size, industry
+        self._finish(job_id, record)
+
+    def fail(self, job_id: str, error: str) -> None:
+        """Record why a pending job failed; KeyError if it is unknown."""
+        record = self._pending.pop(job_id)
+        record.error = error
+        self._finish(job_id, record)
+
+    def get(self, job_id: str) -> Job | None:
+        """The job as a Job model, or None if unknown or expired."""
+        record = self._pending.get(job_id)
+        if record is not None:
+            return record.to_job(job_id)
+        record = self._finished.get(job_id)
+        if record is None:
+            return None
+        now = self.clock()
+        if record.touched <= now - self.ttl:
+            self._expire(now)
+            return None
+        record.touched = now
+        self._finished.move_to_end(job_id)
+        return record.to_job(job_id)
+
+    def __getitem__(self, job_id: str) -> Job:
+        job = self.get(job_id)
+        if job is None:
+            raise KeyError(job_id)
+        return job
+
+    def __delitem__(self, job_id: str) -> None:
+        if job_id in self._pending:
+            record = self._pending.pop(job_id)
+            self.bytes -= self._record_bytes(job_id, record)
+        else:
+            self._remove_finished(job_id)
+
+    def __contains__(self, job_id: object) -> bool:
+        return job_id in self._pending or job_id in self._finished
+
+    def __iter__(self) -> Iterator[str]:
+        yield from list(self._pending)
+        yield from list(self._finished)
+
+    def __len__(self) -> int:
+        return len(self._pending) + len(self._finished)
+
+    async def open(self) -> list[tuple[str, str]]:
+        """Load persisted jobs; (job_id, domain) of the pending ones to rerun."""
+        return []
+
+    async def sync(self) -> None:
+        """Make the jobs added so far visible to other processes sharing them."""
+
+    async def close(self) -> None:
+        """Write out and release any persistent storage."""
+
+    def stats(self) -> dict:
+        """Job counts, estimated memory and eviction counters."""
+        return {
+            "pending": len(self._pending),
+            "finished": len(self._finished),
+            "bytes": self.bytes,
+            "max_jobs": self.max_jobs,
+            "max_bytes": self.max_bytes,
+            "expired": self.expired,
+            "evicted": self.evicted,
+        }
@@ -0,0 +1,186 @@
+from collections import OrderedDict
+from collections.abc import Callable
+import time
+import asyncio
+import logging
+import aiosqlite
+
+# A row of the enrichment_cache table: domain, size, industry, fetched
+CacheRow = tuple[str, int, str, float]
+
+
+class CacheEntry:
+    """Enrichment result for one domain and the wall-clock time it was fetched."""
+
+    __slots__ = ("size", "industry", "fetched")
+
+    def __init__(self, size: int, industry: str, fetched: float):
+        self.size = size
+        self.industry = industry
+        self.fetched = fetched
+
+
+class ResultCache:
+    """
+    Bounded cache of enrichment results keyed by normalized domain.
+
+    An entry is fresh for `ttl` seconds after it was fetched and stale for
+    `stale_ttl` seconds after that, when it is still served but should be
+    refreshed; past both it is dropped. Beyond `max_entries` the least
+    recently used entries are evicted, and `max_entries=0` disables caching.
+
+    With a `path`, entries are also kept in a SQLite file, loaded from it by
+    `open()`, so the cache survives restarts. Lookups and stores only touch
+    memory; changes are written behind like the SQLite job store's, buffered
+    per domain and written every `flush_interval` seconds in one transaction
+    through aiosqlite, so the event loop never waits on the file.
+    """
+
+    def __init__(
+        self,
+        ttl: float = 24 * 3600.0,
+        stale_ttl: float = 7 * 24 * 3600.0,
+        max_entries: int = 100_000,
+        path: str | None = None,
+        flush_interval: float = 0.05,
+        clock: Callable[[], float] = time.time,
+    ):
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.max_entries = max_entries
+        self.path = path
+        self.flush_interval = flush_interval
+        self.clock = clock
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.evicted = 0
+        self._entries: OrderedDict[str, CacheEntry] = OrderedDict()
+        # Domain -> its row to write, or None to delete it
+        self._writes: dict[str, CacheRow | None] = {}
+        self._db: aiosqlite.Connection | None = None
+        self._flusher: asyncio.Task | None = None
+
+    async def open(self) -> None:
+        """Load the newest unexpired entries of the file and start writing behind."""
+        if self.path is None or self._db is not None:
+            return
+        self._db = await aiosqlite.connect(self.path)
+        await self._db.execute("PRAGMA journal_mode=WAL")
+        await self._db.execute("PRAGMA synchronous=NORMAL")
+        await self._db.execute(
+            "CREATE TABLE IF NOT EXISTS enrichment_cache ("
+            "domain TEXT PRIMARY KEY, size INTEGER NOT NULL, "
+            "industry TEXT NOT NULL, fetched REAL NOT NULL)"
+        )
+        deadline = self.clock() - self.ttl - self.stale_ttl
+        await self._db.execute(
+            "DELETE FROM enrichment_cache WHERE fetched <= ?", (deadline,)
+        )
+        await self._db.commit()
+        async with self._db.execute(
+            "SELECT domain, size, industry, fetched FROM enrichment_cache "
+            "ORDER BY fetched DESC LIMIT ?",
+            (self.max_entries,),
+        ) as cursor:
+            rows = await cursor.fetchall()
+        for domain, size, industry, fetched in reversed(rows):
+            self._entries.setdefault(domain, CacheEntry(size, industry, fetched))
+        self._flusher = asyncio.create_task(self._flush_periodically())
+
+    async def _flush_periodically(self) -> None:
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            try:
+                await self.flush()
+            except Exception:
+                logging.exception("Writing the result cache to %s failed", self.path)
+
+    async def flush(self) -> None:
+        """Write the buffered changes in one transaction."""
+        if self._db is None or not self._writes:
+            return
+        batch, self._writes = self._writes, {}
+        try:
+            await self._db.executemany(
+                "INSERT OR REPLACE INTO enrichment_cache VALUES (?, ?, ?, ?)",
+                [row for row in batch.values() if row is not None],
+            )
+            await self._db.executemany(
+                "DELETE FROM enrichment_cache WHERE domain = ?",
+                [(domain,) for domain, row in batch.items() if row is None],
+            )
+            await self._db.commit()
+        except BaseException:
+            # Keep the batch for the next flush, behind any newer change
+            for domain, row in batch.items():
+                self._writes.setdefault(domain, row)
+            raise
+
+    def _remove(self, key: str) -> None:
+        del self._entries[key]
+        if self._db is not None:
+            self._writes[key] = None
+
+    def get(self, key: str) -> tuple[CacheEntry, bool] | None:
+        """The cached entry and whether it is stale, or None on a miss."""
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        age = self.clock() - entry.fetched
+        if age >= self.ttl + self.stale_ttl:
+            self._remove(key)
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        stale = age >= self.ttl
+        if stale:
+            self.stale_hits += 1
+        else:
+            self.hits += 1
+        return entry, stale
+
+    def put(self, key: str, size: int, industry: str) -> None:
+        """Store a fresh result, evicting the least recently used past the cap."""
+        if self.max_entries <= 0:
+            return
+        entry = CacheEntry(size, industry, self.clock())
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        if self._db is not None:
+            self._writes[key] = (key, size, industry, entry.fetched)
+        while len(self._entries) > self.max_entries:
+            self._remove(next(iter(self._entries)))
+            self.evicted += 1
+
+    def __contains__(self, key: object) -> bool:
+        return key in self._entries
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def stats(self) -> dict:
+        """Entry count and hit, miss and eviction counters."""
+        lookups = self.hits + self.stale_hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "stale_hits": self.stale_hits,
+            "misses": self.misses,
+            "hit_ratio": (self.hits + self.stale_hits) / lookups if lookups else 0.0,
+            "evicted": self.evicted,
+            "unflushed": len(self._writes),
+        }
+
+    async def close(self) -> None:
+        """Stop the background writer, write what is left and close the file."""
+        if self._flusher is not None:
+            self._flusher.cancel()
+            await asyncio.gather(self._flusher, return_exceptions=True)
+            self._flusher = None
+        if self._db is not None:
+            await self.flush()
+            await self._db.close()
+            self._db = None
@@ -0,0 +1,304 @@
+from app.models.job import Job
+from app.services.job_store import JobRecord, JobStore
+import os
+import time
+import sqlite3
+import asyncio
+import logging
+import aiosqlite
+
+# A row of the jobs table; size, industry and finished are None while pending,
+# owner is the pid of the process that runs or ran the job, and error is set
+# once it failed
+JobRow = tuple[str, str, int | None, str | None, float | None, int, str | None]
+
+# Bytes of the file the read path maps into memory
+READ_MMAP_SIZE = 256 * 1024 * 1024
+
+
+def _alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+class SQLiteJobStore(JobStore):
+    """
+    JobStore that also keeps its jobs in a SQLite file, to survive restarts.
+
+    Jobs are still read from memory. Every change is written behind: it is
+    buffered per job_id, so a job added and completed between two flushes is
+    written once, and a background task writes the buffer every
+    `flush_interval` seconds in a single transaction through aiosqlite, whose
+    thread keeps the event loop free. A crash loses at most the last interval
+    of changes. Expired, evicted and deleted jobs are deleted from the file.
+
+    `open()` loads the file and returns the jobs that were still pending, for
+    the service to run again. Finished jobs keep the time left of their TTL
+    counted from when they finished, since reads are not written out.
+
+    With `shared=True` several processes on one host, such as uvicorn
+    workers, use the same file. Each runs its own jobs and keeps them in
+    memory, and a job it does not know is looked up in the file through a
+    read-only, memory-mapped connection, which takes microseconds. New jobs
+    are written before `sync()` returns, so a job is visible to every worker
+    once its POST has returned; later changes show up within a flush
+    interval. `sync()` is a group commit: the requests that call it while a
+    write is pending or running share the next transaction, so under load
+    a commit covers many POSTs rather than one each. Pending jobs are
+    recorded with the pid of their process, and `open()` takes over only
+    those whose process is gone; unshared, it takes over all of them.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        flush_interval: float = 0.05,
+        shared: bool = False,
+        **kwargs,
+    ):
+        super().__init__(**kwargs)
+        self.path = path
+        self.flush_interval = flush_interval
+        self.shared = shared
+        self.flushes = 0
+        self.written = 0
+        self.file_reads = 0
+        # Job id -> its row to write, or None to delete it
+        self._writes: dict[str, JobRow | None] = {}
+        self._db: aiosqlite.Connection | None = None
+        self._reader: sqlite3.Connection | None = None
+        self._flusher: asyncio.Task | None = None
+        # The flush that the next callers of sync() wait for
+        self._sync: asyncio.Task | None = None
+        # Flushes run one at a time on the single connection
+        self._flush_lock = asyncio.Lock()
+
+    async def open(self) -> list[tuple[str, str]]:
+        """Load the jobs in the file and start writing changes behind."""
+        if self._db is not None:
+            return []
+        self._db = await aiosqlite.connect(self.path)
+        await self._db.execute("PRAGMA journal_mode=WAL")
+        await self._db.execute("PRAGMA synchronous=NORMAL")
+        await self._db.execute(
+            "CREATE TABLE IF NOT EXISTS jobs (job_id TEXT PRIMARY KEY, "
+            "domain TEXT NOT NULL, size INTEGER, industry TEXT, finished REAL, "
+            "owner INTEGER NOT NULL, error TEXT)"
+        )
+        await self._db.execute(
+            "DELETE FROM jobs WHERE finished <= ?", (time.time() - self.ttl,)
+        )
+        await self._db.commit()
+        await self._claim_orphans()
+        pending = await self._load()
+        if self.shared:
+            self._reader = sqlite3.connect(
+                f"file:{self.path}?mode=ro", uri=True, check_same_thread=False
+            )
+            self._reader.execute(f"PRAGMA mmap_size={READ_MMAP_SIZE}")
+        self._flusher = asyncio.create_task(self._flush_periodically())
+        return pending
+
+    async def _claim_orphans(self) -> None:
+        """Take over the pending jobs of processes that are no longer running."""
+        if not self.shared:
+            # No other process uses the file, whatever pid owned the job
+            await self._db.execute(
+                "UPDATE jobs SET owner = ? WHERE finished IS NULL", (os.getpid(),)
+            )
+            await self._db.commit()
+            return
+        async with self._db.execute(
+            "SELECT DISTINCT owner FROM jobs WHERE finished IS NULL"
+        ) as cursor:
+            owners = [owner for (owner,) in await cursor.fetchall()]
+        for owner in owners:
+            if owner != os.getpid() and not _alive(owner):
+                # Only one process can move a row away from the dead owner
+                await self._db.execute(
+                    "UPDATE jobs SET owner = ? WHERE finished IS NULL AND owner = ?",
+                    (os.getpid(), owner),
+                )
+        await self._db.commit()
+
+    async def _load(self) -> list[tuple[str, str]]:
+        # When shared, finished jobs are read from the file when asked for
+        where = "owner = ? AND finished IS NULL"
+        if not self.shared:
+            where = "owner = ? OR finished IS NOT NULL"
+        async with self._db.execute(
+            "SELECT job_id, domain, size, industry, finished, error FROM jobs "
+            f"WHERE {where} ORDER BY finished",
+            (os.getpid(),),
+        ) as cursor:
+            rows = await cursor.fetchall()
+        now, wall = self.clock(), time.time()
+        pending = []
+        for job_id, domain, size, industry, finished, error in rows:
+            if job_id in self:
+                continue
+            record = JobRecord(domain)
+            if finished is None:
+                self._pending[job_id] = record
+                pending.append((job_id, domain))
+            else:
+                record.size, record.industry, record.error = size, industry, error
+                record.touched = now - (wall - finished)
+                self._finished[job_id] = record
+            self.bytes += self._record_bytes(job_id, record)
+        return pending
+
+    async def _flush_periodically(self) -> None:
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            try:
+                await self.flush()
+            except Exception:
+                logging.exception("Writing jobs to %s failed", self.path)
+
+    async def flush(self) -> None:
+        """Write the buffered changes in one transaction."""
+        async with self._flush_lock:
+            if self._db is None or not self._writes:
+                return
+            batch, self._writes = self._writes, {}
+            try:
+                await self._db.executemany(
+                    "INSERT OR REPLACE INTO jobs VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    [row for row in batch.values() if row is not None],
+                )
+                await self._db.executemany(
+                    "DELETE FROM jobs WHERE job_id = ?",
+                    [(job_id,) for job_id, row in batch.items() if row is None],
+                )
+                await self._db.commit()
+            except BaseException:
+                # Keep the batch for the next flush, behind any newer change
+                for job_id, row in batch.items():
+                    self._writes.setdefault(job_id, row)
+                raise
+            self.flushes += 1
+            self.written += len(batch)
+
+    async def sync(self) -> None:
+        """When shared, wait until the changes made so far are in the file."""
+        # A running flush may hold changes taken from the buffer
+        if not self.shared or not (self._writes or self._flush_lock.locked()):
+            return
+        if self._sync is None:
+            self._sync = asyncio.create_task(self._sync_flush())
+        # A cancelled request must not cancel the flush the others wait for
+        await asyncio.shield(self._sync)
+
+    async def _sync_flush(self) -> None:
+        # Let the requests already running on the loop join this flush
+        await asyncio.sleep(0)
+        # Changes made from here on wait for the next flush
+        self._sync = None
+        try:
+            await self.flush()
+        except Exception:
+            logging.exception("Writing jobs to %s failed", self.path)
+
+    async def close(self) -> None:
+        """Stop the background writer, write what is left and close the file."""
+        if self._flusher is not None:
+            self._flusher.cancel()
+            await asyncio.gather(self._flusher, return_exceptions=True)
+            self._flusher = None
+        if self._db is not None:
+            await self.flush()
+            await self._db.close()
+            self._db = None
+        if self._reader is not None:
+            self._reader.close()
+            self._reader = None
+
+    def add(self, job_id: str, domain: str) -> None:
+        super().add(job_id, domain)
+        if self._db is not None:
+            self._writes[job_id] = (
+                job_id,
+                domain,
+                None,
+                None,
+                None,
+                os.getpid(),
+                None,
+            )
+
+    def complete(self, job_id: str, size: int, industry: str) -> None:
+        super().complete(job_id, size, industry)
+        record = self._finished.get(job_id)
+        if self._db is not None and record is not None:
+            self._writes[job_id] = (
+                job_id,
+                record.domain,
+                size,
+                industry,
+                time.time(),
+                os.getpid(),
+                None,
+            )
+
+    def fail(self, job_id: str, error: str) -> None:
+        super().fail(job_id, error)
+        record = self._finished.get(job_id)
+        if self._db is not None and record is not None:
+            self._writes[job_id] = (
+                job_id,
+                record.domain,
+                None,
+                None,
+                time.time(),
+                os.getpid(),
+                error,
+            )
+
+    def get(self, job_id: str) -> Job | None:
+        """The job from memory or, when shared, the file; None if unknown."""
+        job = super().get(job_id)
+        if job is None and self._reader is not None:
+            job = self._read(job_id)
+        return job
+
+    def _read(self, job_id: str) -> Job | None:
+        row = self._reader.execute(
+            "SELECT domain, size, industry, finished, error FROM jobs "
+            "WHERE job_id = ?",
+            (job_id,),
+        ).fetchone()
+        self.file_reads += 1
+        if row is None:
+            return None
+        domain, size, industry, finished, error = row
+        if finished is not None and finished <= time.time() - self.ttl:
+            return None
+        record = JobRecord(domain)
+        record.size, record.industry, record.error = size, industry, error
+        return record.to_job(job_id)
+
+    def _remove_finished(self, job_id: str) -> None:
+        super()._remove_finished(job_id)
+        if self._db is not None:
+            self._writes[job_id] = None
+
+    def __delitem__(self, job_id: str) -> None:
+        super().__delitem__(job_id)
+        if self._db is not None:
+            self._writes[job_id] = None
+
+    def stats(self) -> dict:
+        """JobStore stats plus the write-behind buffer and file counters."""
+        return {
+            **super().stats(),
+            "unflushed": len(self._writes),
+            "flushes": self.flushes,
+            "written": self.written,
+            "file_reads": self.file_reads,
+        }
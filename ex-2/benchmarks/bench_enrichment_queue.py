@@ -0,0 +1,91 @@
+"""
+Benchmark: enrichment queue throughput and memory at 100k queued jobs
+
+Queues --jobs jobs into an EnrichmentService and reports the time per
+enqueue and the memory held once they are all waiting. It then lets the
+worker pool drain the queue with a short simulated call (--duration) and
+reports the sustained jobs/sec. For comparison, the same number of jobs is
+started the old way, one asyncio task per job.
+
+Usage:
+    python -m benchmarks.bench_enrichment_queue [--jobs 100000]
+        [--workers 1000] [--duration 0.01]
+"""
+
+import argparse
+import asyncio
+import time
+import tracemalloc
+from app.services.enrichment import EnrichmentService
+
+
+async def enqueue(service: EnrichmentService, jobs: int) -> float:
+    service._ensure_workers()
+    await asyncio.sleep(0)
+    start = time.perf_counter()
+    for i in range(jobs):
+        await service.enrich_company_data(f"company{i}.com")
+    return time.perf_counter() - start
+
+
+async def run_queue(jobs: int, workers: int, duration: float) -> None:
+    service = EnrichmentService(workers=workers, max_queue_size=jobs, duration=duration)
+    elapsed = await enqueue(service, jobs)
+    print(f"enqueue            {elapsed / jobs * 1e6:10.2f} us/job")
+    print(f"queue depth        {service.stats()['queue_depth']:10,}")
+
+    start = time.perf_counter()
+    while service.completed < jobs:
+        await asyncio.sleep(0.01)
+    elapsed = time.perf_counter() - start
+    print(
+        f"drain              {jobs / elapsed:10,.0f} jobs/s "
+        f"(ideal {workers / duration:,.0f} with {workers:,} workers)"
+    )
+    await service.close()
+
+    # Workers stay busy for the whole measurement, so every job stays queued
+    service = EnrichmentService(workers=workers, max_queue_size=jobs, duration=3600)
+    tracemalloc.start()
+    await enqueue(service, jobs)
+    queued_memory = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    print(
+        f"queued jobs       {queued_memory / 2**20:8.1f} MiB "
+        f"({queued_memory / jobs:,.0f} B/job, job records and workers included)"
+    )
+    await service.close()
+
+
+async def run_tasks(jobs: int) -> None:
+    async def job() -> None:
+        await asyncio.sleep(3600)
+
+    tracemalloc.start()
+    baseline = tracemalloc.get_traced_memory()[0]
+    tasks = [asyncio.create_task(job()) for _ in range(jobs)]
+    await asyncio.sleep(0)
+    task_memory = tracemalloc.get_traced_memory()[0] - baseline
+    tracemalloc.stop()
+    print(
+        f"one task per job  {task_memory / 2**20:8.1f} MiB "
+        f"({task_memory / jobs:,.0f} B/job, job records excluded)"
+    )
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--jobs", type=int, default=100_000)
+    parser.add_argument("--workers", type=int, default=1000)
+    parser.add_argument("--duration", type=float, default=0.01)
+    args = parser.parse_args()
+
+    asyncio.run(run_queue(args.jobs, args.workers, args.duration))
+    asyncio.run(run_tasks(args.jobs))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""
+Benchmark: memory per retained job, dict of Job models vs JobStore
+
+Fills both stores with --jobs completed jobs, as the service leaves them,
+and reports the bytes traced per job (ids and domains included) next to
+JobStore's own estimate, plus the time to look up and serialize a job.
+
+Usage:
+    python -m benchmarks.bench_job_store [--jobs 1000000]
+"""
+
+import argparse
+import gc
+import random
+import timeit
+import tracemalloc
+import uuid
+from app.models.company import Company
+from app.models.job import Job
+from app.services.job_store import JobStore
+
+
+def new_jobs(count: int):
+    """The same (job_id, domain) pairs on every call, created as they are used."""
+    rng = random.Random(42)
+    for i in range(count):
+        yield str(uuid.UUID(int=rng.getrandbits(128), version=4)), f"company{i}.com"
+
+
+def fill_models(count: int) -> dict[str, Job]:
+    jobs = {}
+    for job_id, domain in new_jobs(count):
+        jobs[job_id] = Job(job_id=job_id, status="pending", data=None)
+        jobs[job_id].status = "complete"
+        jobs[job_id].data = Company(
+            domain=domain, size=random.randint(10, 1000), industry="Technology"
+        )
+    return jobs
+
+
+def fill_store(count: int) -> JobStore:
+    store = JobStore(max_jobs=count, max_bytes=2**40)
+    for job_id, domain in new_jobs(count):
+        store.add(job_id, domain)
+        store.complete(job_id, size=random.randint(10, 1000), industry="Technology")
+    return store
+
+
+def traced(fill, *args):
+    gc.collect()
+    tracemalloc.start()
+    result = fill(*args)
+    gc.collect()
+    used = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return result, used
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--jobs", type=int, default=1_000_000)
+    args = parser.parse_args()
+    random.seed(42)
+    probe = [job_id for job_id, _ in new_jobs(args.jobs)][:: max(1, args.jobs // 1000)]
+
+    def report(label: str, traced_bytes: int, serve) -> None:
+        seconds = min(
+            timeit.repeat(lambda: [serve(job_id) for job_id in probe], number=10)
+        )
+        print(
+            f"{label:<15}{traced_bytes / args.jobs:8,.0f} B/job "
+            f"{traced_bytes / 2**20:8,.0f} MiB "
+            f"{seconds / 10 / len(probe) * 1e9:8,.0f} ns/serve"
+        )
+
+    models, model_bytes = traced(fill_models, args.jobs)
+    report(
+        "dict of models", model_bytes, lambda job_id: models[job_id].model_dump_json()
+    )
+    del models
+
+    store, store_bytes = traced(fill_store, args.jobs)
+    report("JobStore", store_bytes, lambda job_id: store.get(job_id).model_dump_json())
+    print(f"JobStore estimate {store.bytes / args.jobs:5,.0f} B/job")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,192 @@
+"""
+Benchmark: job status across uvicorn workers sharing a SQLite job store
+
+First times a status lookup served from memory by the worker that owns the
+job, and from the shared file by any other worker, over --jobs jobs. Then
+makes --posts enrichment requests in one worker, --concurrency at a time,
+and reports requests/sec and the commits each took: concurrent requests
+share a commit, so the ratio falls as concurrency rises.
+
+Then, for each count in --workers, starts `uvicorn app.main:app --workers N`
+with JOB_STORE_SHARED=true and runs --clients client processes for
+--seconds. Each client POSTs /enrich on a kept-alive connection and GETs the
+job on a new connection, which whichever worker accepts it serves. Reports
+requests/sec, the GET latency and the GETs that found no job, which should
+be none; a last run with the largest worker count and the in-memory job
+store shows how many it would be without sharing.
+
+Usage:
+    python -m benchmarks.bench_multi_worker [--jobs 100000] [--posts 10000]
+        [--concurrency 64] [--workers 1 2 4] [--clients 8] [--seconds 5]
+"""
+
+import argparse
+import asyncio
+import multiprocessing
+import os
+import random
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import httpx
+from app.services.enrichment import EnrichmentService
+from app.services.result_cache import ResultCache
+from app.services.sqlite_job_store import SQLiteJobStore
+
+
+async def time_lookups(path: str, jobs: int) -> None:
+    owner = SQLiteJobStore(path, shared=True, max_jobs=jobs)
+    other = SQLiteJobStore(path, shared=True)
+    await owner.open()
+    for i in range(jobs):
+        owner.add(f"job-{i}", f"company{i}.com")
+        if i % 2:
+            owner.complete(f"job-{i}", size=i % 1000, industry="Technology")
+    await owner.flush()
+    await other.open()
+    probe = random.Random(42).sample(range(jobs), min(jobs, 10_000))
+
+    for label, store in (("owner, memory", owner), ("other worker, file", other)):
+        start = time.perf_counter()
+        for i in probe:
+            store.get(f"job-{i}")
+        elapsed = time.perf_counter() - start
+        print(f"lookup {label:<20}{elapsed / len(probe) * 1e6:8.2f} us")
+    await owner.close()
+    await other.close()
+
+
+async def time_posts(tmp: str, posts: int, concurrency: int) -> None:
+    for level in sorted({1, concurrency}):
+        service = EnrichmentService(
+            workers=1,
+            max_queue_size=posts,
+            duration=3600,
+            jobs=SQLiteJobStore(
+                os.path.join(tmp, f"posts-{level}.db"), shared=True, max_jobs=posts
+            ),
+            cache=ResultCache(max_entries=0),
+        )
+        await service.start()
+        start = time.perf_counter()
+        for first in range(0, posts, level):
+            await asyncio.gather(
+                *(
+                    service.enrich_company_data(f"c{level}-{i}.com")
+                    for i in range(first, min(first + level, posts))
+                )
+            )
+        elapsed = time.perf_counter() - start
+        flushes = service.jobs.stats()["flushes"]
+        print(
+            f"POST x{level:<4} at once{posts / elapsed:10,.0f} req/s  "
+            f"{flushes / posts:.3f} commits per POST"
+        )
+        await service.close()
+        await service.jobs.close()
+
+
+def client(port: int, seconds: float, results) -> None:
+    base = f"http://127.0.0.1:{port}"
+    posted = gets = missing = 0
+    latencies = []
+    no_keepalive = httpx.Limits(max_keepalive_connections=0)
+    with (
+        httpx.Client(base_url=base) as poster,
+        httpx.Client(base_url=base, limits=no_keepalive) as getter,
+    ):
+        deadline = time.perf_counter() + seconds
+        i = 0
+        while time.perf_counter() < deadline:
+            i += 1
+            domain = f"c{os.getpid()}-{i}.com"
+            job_id = poster.post("/enrich", params={"company_domain": domain})
+            posted += 1
+            start = time.perf_counter()
+            response = getter.get(f"/enrich/{job_id.json()['job_id']}")
+            latencies.append(time.perf_counter() - start)
+            gets += 1
+            missing += response.status_code == 404
+    results.put((posted, gets, missing, latencies))
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def run_server(
+    tmp: str, workers: int, clients: int, seconds: float, shared: bool = True
+) -> None:
+    port = free_port()
+    env = {**os.environ, "ENRICHMENT_WORKERS": "100"}
+    if shared:
+        env["JOB_STORE_PATH"] = os.path.join(tmp, f"jobs-{workers}.db")
+        env["JOB_STORE_SHARED"] = "true"
+    else:
+        env.pop("JOB_STORE_PATH", None)
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port)]
+        + ["--workers", str(workers), "--log-level", "warning"],
+        env=env,
+    )
+    try:
+        for _ in range(100):
+            try:
+                httpx.get(f"http://127.0.0.1:{port}/health")
+                break
+            except httpx.TransportError:
+                time.sleep(0.1)
+        time.sleep(1)
+
+        results = multiprocessing.Queue()
+        processes = [
+            multiprocessing.Process(target=client, args=(port, seconds, results))
+            for _ in range(clients)
+        ]
+        for process in processes:
+            process.start()
+        totals = [results.get() for _ in processes]
+        for process in processes:
+            process.join()
+    finally:
+        server.terminate()
+        server.wait()
+
+    requests = sum(posted + gets for posted, gets, _, _ in totals)
+    missing = sum(result[2] for result in totals)
+    latencies = sorted(latency for result in totals for latency in result[3])
+    print(
+        f"{workers} worker(s){'' if shared else ', not shared':<13}"
+        f"{requests / seconds:8,.0f} req/s  "
+        f"GET p50 {statistics.median(latencies) * 1e3:6.2f} ms "
+        f"p99 {latencies[int(len(latencies) * 0.99)] * 1e3:6.2f} ms  "
+        f"{missing} of {len(latencies):,} GETs found no job"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--jobs", type=int, default=100_000)
+    parser.add_argument("--posts", type=int, default=10_000)
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--clients", type=int, default=8)
+    parser.add_argument("--seconds", type=float, default=5.0)
+    args = parser.parse_args()
+
+    print(f"{os.cpu_count()} CPU(s)")
+    with tempfile.TemporaryDirectory() as tmp:
+        asyncio.run(time_lookups(os.path.join(tmp, "lookups.db"), args.jobs))
+        asyncio.run(time_posts(tmp, args.posts, args.concurrency))
+        for workers in args.workers:
+            run_server(tmp, workers, args.clients, args.seconds)
+        run_server(tmp, max(args.workers), args.clients, args.seconds, shared=False)
+
+
+if __name__ == "__main__":
+    main()
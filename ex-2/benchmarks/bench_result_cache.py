@@ -0,0 +1,75 @@
+"""
+Benchmark: upstream calls and time-to-complete with and without the result cache
+
+Sends --jobs requests at --rate requests/sec for domains drawn from a Zipf-like
+distribution over --domains domains, the way repeat customers skew real
+traffic, with a short simulated upstream call (--duration). Reports the
+number of upstream calls and the p50 / p99 time from POST to a complete job,
+with the cache disabled (coalescing only) and enabled.
+
+Usage:
+    python -m benchmarks.bench_result_cache [--jobs 20000] [--domains 2000]
+        [--rate 2000] [--duration 0.5]
+"""
+
+import argparse
+import asyncio
+import random
+import statistics
+import time
+from app.services.enrichment import EnrichmentService
+from app.services.result_cache import ResultCache
+
+
+async def run(label: str, cache: ResultCache, args: argparse.Namespace) -> None:
+    service = EnrichmentService(
+        workers=1000, max_queue_size=args.jobs, duration=args.duration, cache=cache
+    )
+    submitted: dict[str, float] = {}
+    finished: dict[str, float] = {}
+    complete = service.jobs.complete
+
+    def timed_complete(job_id: str, **result) -> None:
+        finished[job_id] = time.perf_counter()
+        complete(job_id, **result)
+
+    service.jobs.complete = timed_complete
+    rng = random.Random(42)
+    weights = [1 / (rank + 1) for rank in range(args.domains)]
+    domains = rng.choices(range(args.domains), weights=weights, k=args.jobs)
+
+    start = time.perf_counter()
+    for i, domain in enumerate(domains):
+        delay = start + i / args.rate - time.perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        posted = time.perf_counter()
+        job_id = await service.enrich_company_data(f"company{domain}.com")
+        submitted[job_id] = posted
+    while len(finished) < args.jobs:
+        await asyncio.sleep(0.01)
+
+    latencies = sorted(finished[job_id] - submitted[job_id] for job_id in submitted)
+    p50 = statistics.median(latencies)
+    p99 = latencies[int(len(latencies) * 0.99)]
+    print(
+        f"{label:<10}{service.completed:8,} upstream calls "
+        f"p50 {p50 * 1e3:8.2f} ms  p99 {p99 * 1e3:8.2f} ms"
+    )
+    await service.close()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--jobs", type=int, default=20_000)
+    parser.add_argument("--domains", type=int, default=2000)
+    parser.add_argument("--rate", type=float, default=2000)
+    parser.add_argument("--duration", type=float, default=0.5)
+    args = parser.parse_args()
+
+    asyncio.run(run("no cache", ResultCache(max_entries=0), args))
+    asyncio.run(run("cache", ResultCache(), args))
+
+
+if __name__ == "__main__":
+    main()
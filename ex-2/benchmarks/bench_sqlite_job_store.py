@@ -0,0 +1,97 @@
+"""
+Benchmark: job transitions/sec and event loop stalls with the SQLite job store
+
+Adds and completes --rate jobs/sec (two transitions each) for --seconds,
+in a burst every millisecond, while a ticker task measures how late the
+event loop wakes it up beyond that. Runs against the in-memory JobStore, the
+write-behind SQLiteJobStore, and, for comparison, a synchronous sqlite3
+commit per transition on the event loop. Reports the transitions/sec
+achieved, the loop lag and the time the final flush takes on close.
+
+Usage:
+    python -m benchmarks.bench_sqlite_job_store [--rate 10000] [--seconds 5]
+"""
+
+import argparse
+import asyncio
+import os
+import sqlite3
+import tempfile
+import time
+from app.services.job_store import JobStore
+from app.services.sqlite_job_store import SQLiteJobStore
+
+
+async def ticker(lags: list[float]) -> None:
+    while True:
+        start = time.perf_counter()
+        await asyncio.sleep(0.001)
+        lags.append(time.perf_counter() - start - 0.001)
+
+
+async def drive(store: JobStore, rate: int, seconds: float, commit=None) -> float:
+    start = time.perf_counter()
+    done = 0
+    while (now := time.perf_counter()) < start + seconds:
+        for i in range(done, int((now - start) * rate)):
+            job_id, domain = f"job-{i}", f"company{i}.com"
+            store.add(job_id, domain)
+            if commit is not None:
+                commit(job_id, domain, None)
+            store.complete(job_id, size=i % 1000, industry="Technology")
+            if commit is not None:
+                commit(job_id, domain, i % 1000)
+            done = i + 1
+        await asyncio.sleep(0.001)
+    return 2 * done / (time.perf_counter() - start)
+
+
+async def run(label: str, store: JobStore, args: argparse.Namespace, commit=None):
+    await store.open()
+    lags: list[float] = []
+    ticks = asyncio.create_task(ticker(lags))
+    await asyncio.sleep(0.01)
+    transitions = await drive(store, args.rate, args.seconds, commit)
+    start = time.perf_counter()
+    await store.close()
+    closed = time.perf_counter() - start
+    ticks.cancel()
+    lags.sort()
+    stats = store.stats()
+    print(
+        f"{label:<22}{transitions:10,.0f} transitions/s  "
+        f"loop lag p99 {lags[int(len(lags) * 0.99)] * 1e3:6.2f} ms "
+        f"max {lags[-1] * 1e3:6.2f} ms  "
+        f"{stats.get('flushes', 0):5,} flushes, final flush {closed * 1e3:6.1f} ms"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rate", type=int, default=10_000)
+    parser.add_argument("--seconds", type=float, default=5.0)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        asyncio.run(run("JobStore", JobStore(), args))
+        store = SQLiteJobStore(os.path.join(tmp, "jobs.db"))
+        asyncio.run(run("SQLiteJobStore", store, args))
+
+        db = sqlite3.connect(os.path.join(tmp, "sync.db"))
+        db.execute("PRAGMA journal_mode=WAL")
+        db.execute("PRAGMA synchronous=NORMAL")
+        db.execute("CREATE TABLE jobs (job_id TEXT PRIMARY KEY, domain TEXT, size)")
+
+        def commit(job_id: str, domain: str, size: int | None) -> None:
+            with db:
+                db.execute(
+                    "INSERT OR REPLACE INTO jobs VALUES (?, ?, ?)",
+                    (job_id, domain, size),
+                )
+
+        asyncio.run(run("commit per transition", JobStore(), args, commit))
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
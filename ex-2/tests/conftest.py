@@ -5,6 +5,22 @@ from fastapi.testclient import TestClient
 from app.main import app
 
 
+class FakeClock:
+    """Clock for TTL tests; time only moves when a test advances now."""
+
+    def __init__(self, now: float = 1_000_000.0):
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock() -> FakeClock:
+    """A FakeClock to pass as a component's clock."""
+    return FakeClock()
+
+
 @pytest.fixture
 def client():
     """Create test client."""
@@ -0,0 +1,138 @@
+"""Test cases for coalescing concurrent enrichment of the same domain."""
+
+import pytest
+import asyncio
+from app.services.enrichment import EnrichmentService, normalize_domain
+from app.services.result_cache import ResultCache
+
+
+class TestEnrichmentCoalescing:
+    """Test cases for single-flight enrichment per domain."""
+
+    @pytest.mark.asyncio
+    async def test_same_domain_jobs_share_one_upstream_call(self):
+        """Test that jobs for one domain get their own ids and one call."""
+        service = EnrichmentService(workers=4, duration=0.05)
+        calls = 0
+        process = service._process_enrichment
+
+        async def counting_process(job_id: str, company_domain: str) -> None:
+            nonlocal calls
+            calls += 1
+            await process(job_id, company_domain)
+
+        service._process_enrichment = counting_process
+        domains = ["acme.com", "ACME.com", " acme.com. ", "other.com"]
+        job_ids = [await service.enrich_company_data(domain) for domain in domains]
+
+        await asyncio.sleep(0.02)
+        assert service.jobs[job_ids[1]].status == "pending"
+        await asyncio.sleep(0.1)
+
+        jobs = [service.jobs[job_id] for job_id in job_ids]
+        assert len(set(job_ids)) == 4
+        assert calls == 2
+        assert all(job.status == "complete" for job in jobs)
+        assert len({job.data.size for job in jobs[:3]}) == 1
+        assert [job.data.domain for job in jobs] == domains
+        await service.close()
+
+    @pytest.mark.asyncio
+    async def test_failed_call_fails_every_job_in_the_group(self):
+        """Test that an upstream error marks all coalesced jobs failed."""
+        service = EnrichmentService(
+            workers=1, duration=0.02, cache=ResultCache(max_entries=0)
+        )
+        process = service._process_enrichment
+
+        async def failing_process(job_id: str, company_domain: str) -> None:
+            await asyncio.sleep(0.02)
+            raise RuntimeError("upstream unavailable")
+
+        service._process_enrichment = failing_process
+        job_ids = [await service.enrich_company_data("acme.com") for _ in range(3)]
+        await asyncio.sleep(0.05)
+
+        jobs = [service.jobs[job_id] for job_id in job_ids]
+        assert all(job.status == "failed" for job in jobs)
+        assert all(job.error == "upstream unavailable" for job in jobs)
+        assert service.stats()["failed"] == 1
+        assert service.stats()["inflight_domains"] == 0
+
+        service._process_enrichment = process
+        retry = await service.enrich_company_data("acme.com")
+        await asyncio.sleep(0.05)
+        assert service.jobs[retry].status == "complete"
+        await service.close()
+
+    @pytest.mark.asyncio
+    async def test_coalescing_ratio_is_reported(self):
+        """Test that the share of jobs served by another job's call is exposed."""
+        service = EnrichmentService(workers=1, duration=0.01)
+        for domain in ("a.com", "a.com", "a.com", "b.com"):
+            await service.enrich_company_data(domain)
+
+        stats = service.stats()
+
+        assert stats["jobs_submitted"] == 4
+        assert stats["coalesced_jobs"] == 2
+        assert stats["coalescing_ratio"] == 0.5
+        assert stats["inflight_domains"] == 2
+        await service.close()
+
+    @pytest.mark.asyncio
+    async def test_finished_domain_starts_a_new_call(self):
+        """Test that only in-flight work is shared, not finished results."""
+        service = EnrichmentService(
+            workers=1, duration=0.01, cache=ResultCache(max_entries=0)
+        )
+        first = await service.enrich_company_data("acme.com")
+        await asyncio.sleep(0.05)
+
+        second = await service.enrich_company_data("acme.com")
+
+        assert service.jobs[first].status == "complete"
+        assert service.jobs[second].status == "pending"
+        assert service.stats()["coalesced_jobs"] == 0
+        await service.close()
+
+    @pytest.mark.asyncio
+    async def test_failed_call_releases_the_domain(self):
+        """Test that a failed upstream call does not keep the group open."""
+        service = EnrichmentService(
+            workers=1, duration=0, cache=ResultCache(max_entries=0)
+        )
+        complete = service.jobs.complete
+
+        def fail_first(job_id: str, **result) -> None:
+            service.jobs.complete = complete
+            raise RuntimeError("upstream error")
+
+        service.jobs.complete = fail_first
+        await service.enrich_company_data("acme.com")
+        await asyncio.sleep(0.01)
+
+        retry = await service.enrich_company_data("acme.com")
+        await asyncio.sleep(0.01)
+
+        assert service.jobs[retry].status == "complete"
+        assert service.stats()["inflight_domains"] == 0
+        await service.close()
+
+    @pytest.mark.asyncio
+    async def test_coalesced_jobs_do_not_need_queue_room(self):
+        """Test that joining an in-flight call works even with a full queue."""
+        service = EnrichmentService(workers=1, max_queue_size=1, duration=10)
+        await service.enrich_company_data("running.com")
+        await asyncio.sleep(0)
+        await service.enrich_company_data("queued.com")
+
+        joined = await service.enrich_company_data("queued.com")
+
+        assert service.jobs[joined].status == "pending"
+        assert service.stats()["queue_depth"] == 1
+        await service.close()
+
+    def test_normalize_domain(self):
+        """Test that case, whitespace and a trailing dot are ignored."""
+        assert normalize_domain(" Example.COM. ") == "example.com"
@@ -0,0 +1,137 @@
+"""Test cases for the enrichment job queue and worker pool."""
+
+import pytest
+import asyncio
+from fastapi import HTTPException
+from fastapi.testclient import TestClient
+from app.dependencies import get_enrichment_service
+from app.main import app
+from app.services.enrichment import EnrichmentService
+from app.services.job_store import JobStore
+
+
+class TestEnrichmentQueue:
+    """Test cases for queueing enrichment jobs."""
+
+    @pytest.mark.asyncio
+    async def test_workers_bound_concurrency(self):
+        """Test that no more jobs run at once than there are workers."""
+        service = EnrichmentService(workers=2, max_queue_size=10, duration=0.05)
+        job_ids = [await service.enrich_company_data(f"d{i}.com") for i in range(5)]
+
+        await asyncio.sleep(0.01)
+        stats = service.stats()
+        assert stats["busy_workers"] == 2
+        assert stats["worker_utilization"] == 1.0
+        assert stats["queue_depth"] == 3
+
+        await asyncio.sleep(0.2)
+        assert all(service.jobs[job_id].status == "complete" for job_id in job_ids)
+        assert service.stats()["completed"] == 5
+        assert service.stats()["busy_workers"] == 0
+        await service.close()
+
+    @pytest.mark.asyncio
+    async def test_full_queue_returns_503_with_retry_after(self):
+        """Test that jobs beyond the queue capacity are turned away."""
+        service = EnrichmentService(workers=1, max_queue_size=2, duration=10)
+        await service.enrich_company_data("running.com")
+        await asyncio.sleep(0)
+        for i in range(2):
+            await service.enrich_company_data(f"queued{i}.com")
+
+        with pytest.raises(HTTPException) as exc_info:
+            await service.enrich_company_data("overflow.com")
+
+        assert exc_info.value.status_code == 503
+        assert int(exc_info.value.headers["Retry-After"]) >= 1
+        assert len(service.jobs) == 3
+        await service.close()
+
+    @pytest.mark.asyncio
+    async def test_full_job_store_returns_503(self):
+        """Test that a job store full of pending jobs turns new jobs away."""
+        service = EnrichmentService(workers=1, duration=10, jobs=JobStore(max_jobs=1))
+        await service.enrich_company_data("first.com")
+
+        with pytest.raises(HTTPException) as exc_info:
+            await service.enrich_company_data("second.com")
+
+        assert exc_info.value.status_code == 503
+        assert service.stats()["queue_depth"] == 1
+        await service.close()
+
+    @pytest.mark.asyncio
+    async def test_failed_job_does_not_stop_worker(self):
+        """Test that a worker keeps serving after a job raises."""
+        service = EnrichmentService(workers=1, max_queue_size=10, duration=0)
+        complete = service.jobs.complete
+
+        def fail_first(job_id: str, **result) -> None:
+            service.jobs.complete = complete
+            raise RuntimeError("upstream error")
+
+        service.jobs.complete = fail_first
+        await service.enrich_company_data("first.com")
+        second = await service.enrich_company_data("second.com")
+
+        await asyncio.sleep(0.05)
+
+        assert service.stats()["failed"] == 1
+        assert service.jobs[second].status == "complete"
+        await service.close()
+
+    def test_queued_jobs_survive_an_event_loop_change(self):
+        """Test that jobs left on a closed loop are run by the pool on the next."""
+        service = EnrichmentService(workers=1, max_queue_size=10, duration=0.01)
+
+        async def start() -> list[str]:
+            job_ids = [await service.enrich_company_data(f"d{i}.com") for i in range(3)]
+            await asyncio.sleep(0)
+            return job_ids
+
+        async def finish() -> None:
+            service._ensure_workers()
+            await asyncio.sleep(0.1)
+            await service.close()
+
+        job_ids = asyncio.run(start())
+        asyncio.run(finish())
+
+        assert all(service.jobs[job_id].status == "complete" for job_id in job_ids)
+
+
+class TestEnrichmentQueueEndpoints:
+    """Test cases for the queue-related endpoints."""
+
+    def test_stats_endpoint(self, client: TestClient):
+        """Test that queue depth and worker utilization are exposed."""
+        response = client.get("/enrich/stats")
+
+        assert response.status_code == 200
+        assert {
+            "queue_depth",
+            "queue_capacity",
+            "workers",
+            "busy_workers",
+            "worker_utilization",
+        } <= set(response.json())
+
+    def test_post_enrich_returns_503_when_queue_is_full(self):
+        """Test that POST /enrich reports a full queue with Retry-After."""
+        service = EnrichmentService(workers=1, max_queue_size=1, duration=10)
+        app.dependency_overrides[get_enrichment_service] = lambda: service
+        try:
+            with TestClient(app) as client:
+                responses = [
+                    client.post("/enrich", params={"company_domain": f"d{i}.com"})
+                    for i in range(3)
+                ]
+                stats = client.get("/enrich/stats").json()
+        finally:
+            app.dependency_overrides.clear()
+
+        assert responses[0].status_code == 202
+        assert responses[-1].status_code == 503
+        assert responses[-1].headers["Retry-After"] == "10"
+        assert stats["queue_depth"] == 1
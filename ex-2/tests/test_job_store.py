@@ -0,0 +1,115 @@
+"""Test cases for the bounded job store."""
+
+import pytest
+from app.models.company import Company
+from app.models.job import Job
+from app.services.job_store import JobStore, JobStoreFullError
+
+
+class TestJobStore:
+    """Test cases for JobStore."""
+
+    def test_jobs_are_served_as_models(self):
+        """Test that records convert to Job models with company data."""
+        store = JobStore()
+        store.add("job-1", "example.com")
+
+        assert store["job-1"] == Job(job_id="job-1", status="pending", data=None)
+
+        store.complete("job-1", size=42, industry="Technology")
+
+        assert store["job-1"] == Job(
+            job_id="job-1",
+            status="complete",
+            data=Company(domain="example.com", size=42, industry="Technology"),
+        )
+        assert store.get("unknown") is None
+        assert "job-1" in store
+        assert len(store) == 1
+
+    def test_failed_job_keeps_its_error(self):
+        """Test that a failed job is finished and served with its error."""
+        store = JobStore()
+        store.add("job-1", "example.com")
+        store.fail("job-1", "upstream unavailable")
+
+        assert store["job-1"] == Job(
+            job_id="job-1", status="failed", data=None, error="upstream unavailable"
+        )
+        assert store.stats()["pending"] == 0
+        assert store.stats()["finished"] == 1
+
+    def test_finished_jobs_expire_after_ttl(self, clock):
+        """Test that a finished job is dropped ttl seconds after its last read."""
+        store = JobStore(ttl=10, clock=clock)
+        store.add("job-1", "example.com")
+        store.complete("job-1", size=1, industry="Technology")
+
+        clock.now += 8
+        assert store.get("job-1") is not None
+        clock.now += 8
+        assert store.get("job-1") is not None
+        clock.now += 11
+        assert store.get("job-1") is None
+        assert store.stats()["expired"] == 1
+        assert store.bytes == 0
+
+    def test_pending_jobs_never_expire(self, clock):
+        """Test that a job still running is kept whatever its age."""
+        store = JobStore(ttl=10, clock=clock)
+        store.add("job-1", "example.com")
+
+        clock.now += 1000
+        store.add("job-2", "example.com")
+
+        assert store["job-1"].status == "pending"
+
+    def test_least_recently_used_finished_job_is_evicted(self, clock):
+        """Test that the entry cap evicts the finished job read longest ago."""
+        store = JobStore(max_jobs=3, clock=clock)
+        for job_id in ("a", "b", "c"):
+            store.add(job_id, "example.com")
+            store.complete(job_id, size=1, industry="Technology")
+            clock.now += 1
+        store.get("a")
+
+        store.add("d", "example.com")
+
+        assert set(store) == {"a", "c", "d"}
+        assert store.stats()["evicted"] == 1
+
+    def test_byte_cap_evicts_finished_jobs(self):
+        """Test that the estimated memory never exceeds max_bytes."""
+        store = JobStore(max_bytes=2000)
+        for i in range(100):
+            store.add(f"job-{i}", "example.com")
+            store.complete(f"job-{i}", size=1, industry="Technology")
+
+        assert store.bytes <= 2000
+        assert 0 < len(store) < 100
+        assert "job-99" in store
+
+    def test_full_store_of_pending_jobs_refuses_new_jobs(self):
+        """Test that pending jobs are never evicted to make room."""
+        store = JobStore(max_jobs=2)
+        store.add("a", "example.com")
+        store.add("b", "example.com")
+
+        with pytest.raises(JobStoreFullError):
+            store.add("c", "example.com")
+        assert set(store) == {"a", "b"}
+
+    def test_delete(self):
+        """Test that deleted jobs release their bytes."""
+        store = JobStore()
+        store.add("a", "example.com")
+        store.add("b", "example.com")
+        store.complete("b", size=1, industry="Technology")
+
+        del store["a"]
+        del store["b"]
+
+        assert len(store) == 0
+        assert store.bytes == 0
+        with pytest.raises(KeyError):
+            store.complete("a", size=1, industry="Technology")
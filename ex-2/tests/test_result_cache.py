@@ -0,0 +1,146 @@
+"""Test cases for the enrichment result cache."""
+
+import pytest
+import asyncio
+import sqlite3
+from app.services.enrichment import EnrichmentService
+from app.services.result_cache import ResultCache
+
+
+def rows(path: str) -> int:
+    with sqlite3.connect(path) as db:
+        return db.execute("SELECT COUNT(*) FROM enrichment_cache").fetchone()[0]
+
+
+class TestResultCache:
+    """Test cases for ResultCache."""
+
+    def test_entries_go_fresh_then_stale_then_expire(self, clock):
+        """Test that an entry is fresh for ttl, then stale for stale_ttl."""
+        cache = ResultCache(ttl=10, stale_ttl=20, clock=clock)
+        cache.put("example.com", size=42, industry="Technology")
+
+        entry, stale = cache.get("example.com")
+        assert (entry.size, entry.industry, stale) == (42, "Technology", False)
+        clock.now += 15
+        assert cache.get("example.com")[1] is True
+        clock.now += 15
+        assert cache.get("example.com") is None
+        assert "example.com" not in cache
+        assert cache.stats()["hits"] == 1
+        assert cache.stats()["stale_hits"] == 1
+        assert cache.stats()["misses"] == 1
+
+    def test_least_recently_used_entry_is_evicted(self):
+        """Test that the size cap evicts the entry read longest ago."""
+        cache = ResultCache(max_entries=2)
+        cache.put("a.com", size=1, industry="Technology")
+        cache.put("b.com", size=2, industry="Technology")
+        cache.get("a.com")
+
+        cache.put("c.com", size=3, industry="Technology")
+
+        assert "a.com" in cache
+        assert "b.com" not in cache
+        assert cache.stats()["evicted"] == 1
+
+    def test_zero_size_disables_cache(self):
+        """Test that max_entries=0 stores nothing."""
+        cache = ResultCache(max_entries=0)
+        cache.put("a.com", size=1, industry="Technology")
+
+        assert cache.get("a.com") is None
+        assert len(cache) == 0
+
+    @pytest.mark.asyncio
+    async def test_sqlite_file_survives_restart(self, tmp_path, clock):
+        """Test that entries are loaded back from the SQLite file."""
+        path = str(tmp_path / "cache.db")
+        cache = ResultCache(ttl=10, stale_ttl=10, path=path, clock=clock)
+        await cache.open()
+        cache.put("old.com", size=1, industry="Technology")
+        clock.now += 15
+        cache.put("new.com", size=2, industry="Technology")
+        await cache.close()
+
+        clock.now += 10
+        reopened = ResultCache(ttl=10, stale_ttl=10, path=path, clock=clock)
+        await reopened.open()
+
+        assert reopened.get("new.com")[0].size == 2
+        assert "old.com" not in reopened
+        await reopened.close()
+
+    @pytest.mark.asyncio
+    async def test_file_is_written_behind(self, tmp_path):
+        """Test that stores only reach the file on flush, in one transaction."""
+        path = str(tmp_path / "cache.db")
+        cache = ResultCache(path=path, flush_interval=3600)
+        await cache.open()
+        for i in range(3):
+            cache.put(f"d{i}.com", size=i, industry="Technology")
+
+        assert rows(path) == 0
+        assert cache.stats()["unflushed"] == 3
+
+        await cache.flush()
+
+        assert rows(path) == 3
+        await cache.close()
+
+
+class TestEnrichmentServiceCache:
+    """Test cases for serving enrichment jobs from the result cache."""
+
+    @pytest.mark.asyncio
+    async def test_cache_hit_completes_job_immediately(self):
+        """Test that a cached domain needs no upstream call."""
+        service = EnrichmentService(workers=1, duration=0.01)
+        first = await service.enrich_company_data("acme.com")
+        await asyncio.sleep(0.05)
+
+        second = await service.enrich_company_data("ACME.com")
+
+        job = service.jobs[second]
+        assert job.status == "complete"
+        assert job.data.domain == "ACME.com"
+        assert job.data.size == service.jobs[first].data.size
+        assert service.stats()["completed"] == 1
+        assert service.stats()["queue_depth"] == 0
+        await service.close()
+
+    @pytest.mark.asyncio
+    async def test_stale_hit_is_served_and_refreshed_once(self, clock):
+        """Test that stale data completes jobs while one refresh runs."""
+        cache = ResultCache(ttl=10, stale_ttl=100, clock=clock)
+        cache.put("acme.com", size=42, industry="Technology")
+        clock.now += 20
+        service = EnrichmentService(workers=1, duration=0.02, cache=cache)
+
+        job_ids = [await service.enrich_company_data("acme.com") for _ in range(3)]
+
+        assert all(service.jobs[job_id].data.size == 42 for job_id in job_ids)
+        assert service.stats()["inflight_domains"] == 1
+        await asyncio.sleep(0.05)
+        entry, stale = cache.get("acme.com")
+        assert stale is False
+        assert service.stats()["completed"] == 1
+        assert service.stats()["inflight_domains"] == 0
+        await service.close()
+
+    @pytest.mark.asyncio
+    async def test_cache_hit_needs_no_queue_room(self):
+        """Test that cached domains are served while the queue is full."""
+        cache = ResultCache()
+        cache.put("cached.com", size=42, industry="Technology")
+        service = EnrichmentService(
+            workers=1, max_queue_size=1, duration=10, cache=cache
+        )
+        await service.enrich_company_data("running.com")
+        await asyncio.sleep(0)
+        await service.enrich_company_data("queued.com")
+
+        job_id = await service.enrich_company_data("cached.com")
+
+        assert service.jobs[job_id].status == "complete"
+        await service.close()
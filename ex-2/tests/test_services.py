@@ -6,6 +6,7 @@ from unittest.mock import patch
 from app.services.enrichment import EnrichmentService
 from app.models.company import Company
 from app.models.job import Job
+from app.services.job_store import JobStore
 from fastapi import HTTPException
 
 
@@ -19,7 +20,7 @@ class TestEnrichmentService:
 
     def test_service_initialization(self, service: EnrichmentService):
         """Test service initialization."""
-        assert isinstance(service.jobs, dict)
+        assert isinstance(service.jobs, JobStore)
         assert len(service.jobs) == 0
 
     @pytest.mark.asyncio
@@ -0,0 +1,253 @@
+"""Test cases for the SQLite-backed job store."""
+
+import pytest
+import pytest_asyncio
+import os
+import sqlite3
+import asyncio
+import subprocess
+from app.services.enrichment import EnrichmentService
+from app.services.result_cache import ResultCache
+from app.services.sqlite_job_store import SQLiteJobStore
+
+
+def rows(path: str) -> dict:
+    with sqlite3.connect(path) as db:
+        return {row[0]: row[1:5] for row in db.execute("SELECT * FROM jobs")}
+
+
+@pytest.fixture
+def path(tmp_path) -> str:
+    """Path of the SQLite file shared by the stores of a test."""
+    return str(tmp_path / "jobs.db")
+
+
+@pytest_asyncio.fixture
+async def new_store(path):
+    """Create stores on the test's file, all closed when the test ends."""
+    stores = []
+
+    def new_store(**kwargs) -> SQLiteJobStore:
+        stores.append(SQLiteJobStore(path, **kwargs))
+        return stores[-1]
+
+    yield new_store
+    for store in stores:
+        await store.close()
+
+
+class TestSQLiteJobStore:
+    """Test cases for SQLiteJobStore."""
+
+    @pytest.mark.asyncio
+    async def test_changes_are_written_behind_in_batches(self, path, new_store):
+        """Test that changes reach the file on flush, once per job."""
+        store = new_store(flush_interval=3600)
+        await store.open()
+        for i in range(100):
+            store.add(f"job-{i}", "example.com")
+            store.complete(f"job-{i}", size=i, industry="Technology")
+
+        assert rows(path) == {}
+        assert store.stats()["unflushed"] == 100
+
+        await store.flush()
+
+        assert len(rows(path)) == 100
+        assert rows(path)["job-7"][:3] == ("example.com", 7, "Technology")
+        assert store.stats()["flushes"] == 1
+        assert store.stats()["written"] == 100
+
+    @pytest.mark.asyncio
+    async def test_background_writer_flushes(self, path, new_store):
+        """Test that changes are written without an explicit flush."""
+        store = new_store(flush_interval=0.01)
+        await store.open()
+        store.add("job-1", "example.com")
+
+        await asyncio.sleep(0.1)
+
+        assert rows(path) == {"job-1": ("example.com", None, None, None)}
+
+    @pytest.mark.asyncio
+    async def test_jobs_are_recovered_after_restart(self, new_store):
+        """Test that a new store loads finished jobs and returns pending ones."""
+        store = new_store()
+        await store.open()
+        store.add("pending", "pending.com")
+        store.add("done", "done.com")
+        store.complete("done", size=42, industry="Technology")
+        store.add("failed", "failed.com")
+        store.fail("failed", "upstream unavailable")
+        await store.close()
+
+        restarted = new_store()
+        pending = await restarted.open()
+
+        assert pending == [("pending", "pending.com")]
+        assert restarted["pending"].status == "pending"
+        assert restarted["done"].data.size == 42
+        assert restarted["failed"].error == "upstream unavailable"
+        assert restarted.bytes == store.bytes
+
+    @pytest.mark.asyncio
+    async def test_unshared_store_takes_over_jobs_of_live_pids(self, path, new_store):
+        """Test that an unshared store reruns pending jobs of any owner pid."""
+        store = new_store()
+        await store.open()
+        await store.close()
+        with sqlite3.connect(path) as db:
+            db.execute(
+                "INSERT INTO jobs VALUES (?, ?, NULL, NULL, NULL, ?, NULL)",
+                ("reused", "reused.com", 1),
+            )
+
+        restarted = new_store()
+        pending = await restarted.open()
+
+        assert pending == [("reused", "reused.com")]
+        assert restarted.get("reused").status == "pending"
+
+    @pytest.mark.asyncio
+    async def test_removed_jobs_are_deleted_from_the_file(self, path, new_store):
+        """Test that evicted and deleted jobs do not come back on restart."""
+        store = new_store(max_jobs=2)
+        await store.open()
+        for job_id in ("a", "b", "c"):
+            store.add(job_id, "example.com")
+            store.complete(job_id, size=1, industry="Technology")
+        del store["c"]
+        await store.close()
+
+        assert set(rows(path)) == {"b"}
+
+    @pytest.mark.asyncio
+    async def test_failed_flush_keeps_changes(self, path, new_store):
+        """Test that a batch that could not be written is retried."""
+        store = new_store(flush_interval=3600)
+        await store.open()
+        store.add("job-1", "example.com")
+        executemany = store._db.executemany
+
+        async def fail_once(*args):
+            store._db.executemany = executemany
+            raise sqlite3.OperationalError("disk I/O error")
+
+        store._db.executemany = fail_once
+        with pytest.raises(sqlite3.OperationalError):
+            await store.flush()
+        store.complete("job-1", size=1, industry="Technology")
+        await store.flush()
+
+        assert rows(path)["job-1"][2] == "Technology"
+
+
+class TestSharedSQLiteJobStore:
+    """Test cases for sharing one SQLite job file between processes."""
+
+    @pytest.mark.asyncio
+    async def test_jobs_of_another_store_are_read_from_the_file(self, new_store):
+        """Test that a store serves jobs it does not hold from the file."""
+        owner = new_store(shared=True, flush_interval=3600)
+        other = new_store(shared=True, flush_interval=3600)
+        await owner.open()
+        await other.open()
+        owner.add("job-1", "example.com")
+
+        assert other.get("job-1") is None
+
+        await owner.sync()
+        assert other.get("job-1").status == "pending"
+
+        owner.complete("job-1", size=42, industry="Technology")
+        await owner.flush()
+        job = other.get("job-1")
+        assert job.status == "complete"
+        assert job.data.domain == "example.com"
+        assert job.data.size == 42
+        assert other.stats()["file_reads"] == 3
+        assert len(other) == 0
+
+    @pytest.mark.asyncio
+    async def test_only_jobs_of_exited_processes_are_taken_over(self, path, new_store):
+        """Test that a starting worker leaves running workers' jobs alone."""
+        process = subprocess.Popen(["true"])
+        process.wait()
+        store = new_store(shared=True)
+        await store.open()
+        await store.close()
+        with sqlite3.connect(path) as db:
+            db.executemany(
+                "INSERT INTO jobs VALUES (?, ?, NULL, NULL, NULL, ?, NULL)",
+                [
+                    ("orphan", "orphan.com", process.pid),
+                    ("live", "live.com", os.getppid()),
+                ],
+            )
+
+        restarted = new_store(shared=True)
+        pending = await restarted.open()
+
+        assert pending == [("orphan", "orphan.com")]
+        assert "live" not in restarted
+        assert restarted.get("live").status == "pending"
+
+    @pytest.mark.asyncio
+    async def test_new_job_is_visible_once_post_returns(self, new_store):
+        """Test that enrich_company_data publishes the job to other workers."""
+        service = EnrichmentService(
+            workers=1, duration=10, jobs=new_store(shared=True, flush_interval=3600)
+        )
+        other = new_store(shared=True)
+        await service.start()
+        await other.open()
+
+        job_id = await service.enrich_company_data("example.com")
+
+        assert other.get(job_id).status == "pending"
+        await service.close()
+
+    @pytest.mark.asyncio
+    async def test_concurrent_posts_share_one_commit(self, new_store):
+        """Test that jobs added together are made visible by a single flush."""
+        service = EnrichmentService(
+            workers=1, duration=10, jobs=new_store(shared=True, flush_interval=3600)
+        )
+        other = new_store(shared=True)
+        await service.start()
+        await other.open()
+
+        job_ids = await asyncio.gather(
+            *(service.enrich_company_data(f"d{i}.com") for i in range(20))
+        )
+
+        assert all(other.get(job_id).status == "pending" for job_id in job_ids)
+        assert service.jobs.stats()["flushes"] == 1
+        await service.close()
+
+
+class TestEnrichmentServiceRecovery:
+    """Test cases for rerunning jobs recovered from a SQLite job store."""
+
+    @pytest.mark.asyncio
+    async def test_start_reruns_pending_jobs(self, path, new_store):
+        """Test that jobs pending at shutdown complete after a restart."""
+        service = EnrichmentService(workers=1, duration=10, jobs=new_store())
+        await service.start()
+        job_ids = [await service.enrich_company_data(f"d{i}.com") for i in range(3)]
+        await service.close()
+        await service.jobs.close()
+
+        restarted = EnrichmentService(
+            workers=2,
+            duration=0.01,
+            jobs=new_store(),
+            cache=ResultCache(max_entries=0),
+        )
+        await restarted.start()
+        await asyncio.sleep(0.1)
+
+        assert all(restarted.jobs[job_id].status == "complete" for job_id in job_ids)
+        await restarted.close()
+        await restarted.jobs.close()
+        assert all(row[2] == "Technology" for row in rows(path).values())